@@ -1,126 +1,171 @@
-import json
+import os
+import sys
 import pandas as pd
-from collections import defaultdict
-
-# Carregar os arquivos
-with open('dados/raw/stats_raw.json', 'r', encoding='utf-8') as f:
-    stats_raw = json.load(f)
-
-with open('dados/raw/stats2_raw.json', 'r', encoding='utf-8') as f:
-    stats2_raw = json.load(f)
-
-stats_csv = pd.read_csv('dados/clean/stats.csv')
-
-# Criar dicionário para mapear player_id -> nome
-id_to_name = {}
-for _, row in stats_csv.iterrows():
-    if pd.notna(row['IdJogador']) and pd.notna(row['NomeJogador']):
-        id_to_name[row['IdJogador']] = row['NomeJogador']
-
-# Inicializar stats_clean
-stats_clean = {}
-
-# Processar stats_raw.json
-for player_id, player_data in stats_raw.items():
-    if player_id not in id_to_name:
-        continue
-    
-    player_name = id_to_name[player_id]
-    
-    # Inicializar dados do jogador
-    if player_name not in stats_clean:
-        stats_clean[player_name] = {
-            "player_id": player_id,
-            "name": player_name
-        }
-    
-    # Processar api_response
-    if 'api_response' in player_data:
-        api_resp = player_data['api_response']
-        
-        # Verificar se é uma lista de superfícies ou um único objeto
-        surfaces_data = api_resp if isinstance(api_resp, list) else [api_resp]
-        
-        for surface_data in surfaces_data:
-            if isinstance(surface_data, dict) and 'Surface' in surface_data:
-                surface = surface_data['Surface']
-                
-                # Adicionar ReturnRecordStats com sufixo da superfície
-                if 'ReturnRecordStats' in surface_data:
-                    key_name = f"ReturnRecordStats{surface}"
-                    stats_clean[player_name][key_name] = surface_data['ReturnRecordStats']
-                
-                # Adicionar ServiceRecordStats com sufixo da superfície
-                if 'ServiceRecordStats' in surface_data:
-                    key_name = f"ServiceRecordStats{surface}"
-                    stats_clean[player_name][key_name] = surface_data['ServiceRecordStats']
-
-# Função para normalizar nomes
-def normalize_name(name):
-    return name.lower().replace(' ', '').replace('-', '').replace('.', '')
-
-# Criar mapeamento de nomes normalizados
-name_mapping = {}
-for name in stats_clean.keys():
-    normalized = normalize_name(name)
-    name_mapping[normalized] = name
-
-# Processar stats2_raw.json
-for player_key, player_data in stats2_raw.items():
-    # Extrair nome do jogador (formato: "Nome_ID")
-    if '_' in player_key:
-        player_name_raw = player_key.split('_')[0].replace('_', ' ').strip()
-    else:
-        player_name_raw = player_key.strip()
-    
-    # Tentar encontrar match no stats_clean
-    normalized_search = normalize_name(player_name_raw)
-    matched_name = None
-    
-    # Busca exata
-    if normalized_search in name_mapping:
-        matched_name = name_mapping[normalized_search]
-    else:
-        # Busca parcial
-        for norm_name, real_name in name_mapping.items():
-            if normalized_search in norm_name or norm_name in normalized_search:
-                matched_name = real_name
-                break
-    
-    if matched_name:
-        # Processar surface_summary (apenas 2023+)
-        if 'surface_summary' in player_data:
-            surface_data = player_data['surface_summary']
-            
-            if 'data' in surface_data and isinstance(surface_data['data'], list):
-                surface_list = surface_data['data']
-                
-                # Filtrar itens de 2023+
-                filtered_items = []
-                
-                for item in surface_list:
-                    if isinstance(item, dict):
-                        # Procurar campo de ano
-                        year_found = None
-                        for key, value in item.items():
-                            if key.lower() in ['year', 'season', 'eventyear'] or 'year' in key.lower():
-                                try:
-                                    year_found = int(value)
-                                    break
-                                except (ValueError, TypeError):
-                                    continue
-                        
-                        # Se encontrou ano >= 2023, incluir
-                        if year_found and year_found >= 2023:
-                            filtered_items.append(item)
-                
-                if filtered_items:
-                    stats_clean[matched_name]['surface_summary'] = filtered_items
-        
-        # Processar past_matches
-        if 'past_matches' in player_data:
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.past_matches_sync import PastMatchesStore
+from api.player_ids import PlayerIdMap, update_from_sources
+from api.player_names import NameResolver, normalize_name
+
+STATS_RAW_PATH = 'dados/raw/stats_raw.json'
+STATS2_RAW_PATH = 'dados/raw/stats2_raw.json'
+STATS_CSV_PATH = 'dados/clean/stats.csv'
+STATS_CLEAN_PATH = 'dados/clean/stats_clean.json'
+MIN_SURFACE_SUMMARY_YEAR = 2023
+
+
+def build_id_to_name(stats_csv):
+    """Mapeamento IdJogador -> NomeJogador do stats.csv (linhas sem algum dos dois são ignoradas)"""
+    valid = stats_csv.dropna(subset=['IdJogador', 'NomeJogador'])
+    return dict(zip(valid['IdJogador'], valid['NomeJogador']))
+
+
+def _as_list(api_response):
+    """api_response pode ser uma lista de superfícies ou um único objeto"""
+    return api_response if isinstance(api_response, list) else [api_response]
+
+
+def surface_stats_frame(stats_raw, id_to_name):
+    """
+    Uma linha por (jogador, superfície) do stats_raw.json com ReturnRecordStats
+    e ServiceRecordStats, já com o nome do jogador, na ordem do arquivo.
+    """
+    players = pd.DataFrame({
+        'player_id': list(stats_raw.keys()),
+        'api_response': [_as_list(player_data.get('api_response')) for player_data in stats_raw.values()],
+    })
+    players['name'] = players['player_id'].map(id_to_name)
+    players = players[players['name'].notna()]
+
+    surfaces = players.explode('api_response', ignore_index=True)
+    is_surface = surfaces['api_response'].map(lambda item: isinstance(item, dict) and 'Surface' in item)
+    surfaces = surfaces[is_surface.astype(bool)].reset_index(drop=True)
+    if surfaces.empty:
+        return players[['player_id', 'name']], surfaces
+
+    records = pd.DataFrame.from_records(surfaces['api_response'].tolist())
+    for column in ('Surface', 'ReturnRecordStats', 'ServiceRecordStats'):
+        surfaces[column] = records[column] if column in records else None
+    return players[['player_id', 'name']], surfaces.drop(columns='api_response')
+
+
+def filter_surface_summaries(summaries, min_year=MIN_SURFACE_SUMMARY_YEAR):
+    """
+    Filtra os itens de vários surface_summary de uma vez ({chave: [itens]})
+    mantendo os de ano >= min_year. O ano é o primeiro campo com 'year' no
+    nome (year, season, eventyear...) que seja numérico. Chaves sem nenhum
+    item restante ficam de fora do resultado.
+    """
+    owners = [key for key, items in summaries.items() for _ in items]
+    items = [item for items in summaries.values() for item in items]
+    if not items:
+        return {}
+    frame = pd.DataFrame.from_records(items)
+    year_columns = [c for c in frame.columns
+                    if c.lower() in ['year', 'season', 'eventyear'] or 'year' in c.lower()]
+    if not year_columns:
+        return {}
+    years = frame[year_columns].apply(pd.to_numeric, errors='coerce').bfill(axis=1).iloc[:, 0]
+    filtered = {}
+    for owner, item, kept in zip(owners, items, (years >= min_year).tolist()):
+        if kept:
+            filtered.setdefault(owner, []).append(item)
+    return filtered
+
+
+def build_stats_clean(stats_raw, stats2_raw, stats_csv, past_matches_store=None, player_id_map=None):
+    """
+    Monta o stats_clean: estatísticas de saque/devolução por superfície do
+    stats_raw.json (nomes do stats.csv) mais surface_summary (2023+) e
+    past_matches do stats2_raw.json. Os jogadores do stats2 são casados
+    pelo ID da tennis-api na tabela de IDs (api/player_ids.py), quando
+    informada, e os que não estão nela pelo nome normalizado.
+    """
+    id_to_name = build_id_to_name(stats_csv)
+    players, surfaces = surface_stats_frame(stats_raw, id_to_name)
+
+    # Inicializar stats_clean (se dois IDs têm o mesmo nome, vale o primeiro)
+    stats_clean = {}
+    first_ids = players.drop_duplicates('name')
+    for player_id, player_name in zip(first_ids['player_id'], first_ids['name']):
+        stats_clean[player_name] = {"player_id": player_id, "name": player_name}
+
+    if not surfaces.empty:
+        for player_name, surface, return_stats, service_stats in zip(
+                surfaces['name'], surfaces['Surface'], surfaces['ReturnRecordStats'], surfaces['ServiceRecordStats']):
+            if isinstance(return_stats, dict):
+                stats_clean[player_name][f"ReturnRecordStats{surface}"] = return_stats
+            if isinstance(service_stats, dict):
+                stats_clean[player_name][f"ServiceRecordStats{surface}"] = service_stats
+
+    # Chaves do stats2 ("Nome_ID") -> nome no stats_clean. Nomes com a mesma chave
+    # normalizada: vale a posição do primeiro e o último nome, como no original
+    last_names = {normalize_name(name): name for name in stats_clean}
+    name_resolver = NameResolver({name: name for name in last_names.values()})
+    stats2 = pd.DataFrame({'player_key': list(stats2_raw.keys())})
+    stats2['matched_name'] = None
+    if player_id_map is not None:
+        atp_to_name = {player_data['player_id']: name for name, player_data in stats_clean.items()}
+        tennis_to_name = {tennis_api_id: atp_to_name[atp_id]
+                          for tennis_api_id, atp_id in player_id_map.mapping('tennis_api_id').items()
+                          if atp_id in atp_to_name}
+        tennis_api_ids = pd.Series([str((player_data.get('player_info') or {}).get('id'))
+                                    for player_data in stats2_raw.values()])
+        stats2['matched_name'] = tennis_api_ids.map(tennis_to_name)
+    unmatched = stats2['matched_name'].isna()
+    stats2_names = stats2.loc[unmatched, 'player_key'].str.split('_').str[0].str.strip()
+    stats2.loc[unmatched, 'matched_name'] = stats2_names.map(name_resolver.resolve_partial)
+    stats2 = stats2[stats2['matched_name'].notna()]
+
+    surface_summaries = {}
+    for player_key in stats2['player_key']:
+        surface_data = stats2_raw[player_key].get('surface_summary')
+        if isinstance(surface_data, dict) and isinstance(surface_data.get('data'), list):
+            surface_summaries[player_key] = [item for item in surface_data['data'] if isinstance(item, dict)]
+    # Processar surface_summary (apenas 2023+)
+    surface_summaries = filter_surface_summaries(surface_summaries)
+
+    for player_key, matched_name in zip(stats2['player_key'], stats2['matched_name']):
+        player_data = stats2_raw[player_key]
+        if player_key in surface_summaries:
+            stats_clean[matched_name]['surface_summary'] = surface_summaries[player_key]
+
+        # Processar past_matches (coletas incrementais deixam os jogos no store por jogador)
+        if player_data.get('past_matches_sync'):
+            if past_matches_store is None:
+                past_matches_store = PastMatchesStore()
+            player_id = player_data['player_info']['id']
+            stats_clean[matched_name]['past_matches'] = past_matches_store.load_payload(player_id)
+        elif 'past_matches' in player_data:
             stats_clean[matched_name]['past_matches'] = player_data['past_matches']
 
-# Criar o arquivo stats_clean.json
-with open('dados/clean/stats_clean.json', 'w', encoding='utf-8') as f:
-    json.dump(stats_clean, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+    return stats_clean
+
+
+def main():
+    # Carregar os arquivos
+    with open(STATS_RAW_PATH, 'r', encoding='utf-8') as f:
+        stats_raw = json_backend.load(f)
+
+    with open(STATS2_RAW_PATH, 'r', encoding='utf-8') as f:
+        stats2_raw = json_backend.load(f)
+
+    stats_csv = pd.read_csv(STATS_CSV_PATH)
+
+    # Jogadores novos entram na tabela de IDs antes do merge
+    player_id_map = PlayerIdMap()
+    update_from_sources(player_id_map, stats_csv=stats_csv, stats2_raw=stats2_raw)
+    player_id_map.save()
+
+    stats_clean = build_stats_clean(stats_raw, stats2_raw, stats_csv, player_id_map=player_id_map)
+
+    # Criar o arquivo stats_clean.json
+    with open(STATS_CLEAN_PATH, 'w', encoding='utf-8') as f:
+        json_backend.dump(stats_clean, f, indent=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.feature_store import (FEATURES_DIR, RAW_PATHS, SURFACES_PATH, collect_matches,
+                                   load_tournament_surfaces)
+
+ELO_STATE_PATH = os.getenv("ELO_STATE_PATH", os.path.join(FEATURES_DIR, "elo_state.npz"))
+INITIAL_RATING = 1500.0
+# K decrescente com a experiência do jogador: K = K_BASE / (jogos + K_OFFSET) ** K_SHAPE
+K_BASE = float(os.getenv("ELO_K_BASE", 250))
+K_OFFSET = float(os.getenv("ELO_K_OFFSET", 5))
+K_SHAPE = float(os.getenv("ELO_K_SHAPE", 0.4))
+# Superfícies com Elo próprio; jogos de superfície desconhecida só mexem no Elo geral
+SURFACES = ("Hard", "Clay", "Grass", "Carpet")
+
+
+def expected_score(rating, opponent_rating):
+    """Probabilidade de vitória pelo modelo de Elo (aceita escalares ou arrays)"""
+    return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
+
+
+def k_factor(matches_played):
+    return K_BASE / (matches_played + K_OFFSET) ** K_SHAPE
+
+
+class EloEngine:
+    """
+    Elo geral e por superfície de todos os jogadores vistos nos jogos.
+
+    O estado fica em arrays NumPy indexados por um índice denso de jogador
+    (a ordem em que cada ID apareceu): `ratings`/`matches` com uma posição
+    por jogador e `surface_ratings`/`surface_matches` com uma coluna por
+    superfície de SURFACES. Os arrays crescem por duplicação da capacidade.
+
+    update() processa só os jogos com match_id ainda não visto, em ordem de
+    data, continuando do estado salvo. Jogos que chegam depois com data
+    anterior à do último processado entram no fim da sequência (não há
+    replay do histórico).
+    """
+
+    def __init__(self, path=ELO_STATE_PATH, capacity=1024):
+        self.path = path
+        self.player_ids = []
+        self.player_index = {}
+        self.match_ids = set()
+        self.last_date = None
+        self._allocate(capacity)
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _allocate(self, capacity):
+        self.ratings = np.full(capacity, INITIAL_RATING)
+        self.matches = np.zeros(capacity, dtype=np.int32)
+        self.surface_ratings = np.full((capacity, len(SURFACES)), INITIAL_RATING)
+        self.surface_matches = np.zeros((capacity, len(SURFACES)), dtype=np.int32)
+
+    def _grow(self, needed):
+        capacity = len(self.ratings)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        old = (self.ratings, self.matches, self.surface_ratings, self.surface_matches)
+        self._allocate(capacity)
+        for new_array, old_array in zip((self.ratings, self.matches, self.surface_ratings, self.surface_matches), old):
+            new_array[:len(old_array)] = old_array
+
+    def _indices(self, player_ids):
+        """Índices densos dos IDs (jogadores novos ganham a próxima posição)"""
+        for player_id in pd.unique(player_ids):
+            if player_id not in self.player_index:
+                self.player_index[player_id] = len(self.player_ids)
+                self.player_ids.append(player_id)
+        self._grow(len(self.player_ids))
+        return np.fromiter((self.player_index[player_id] for player_id in player_ids),
+                           dtype=np.int64, count=len(player_ids))
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def update(self, matches, surfaces=None):
+        """
+        Incorpora os jogos novos de uma tabela de jogos (colunas de
+        parquet_store.match_rows) e retorna quantos foram processados.
+        """
+        if matches.empty:
+            return 0
+        matches = matches.drop_duplicates('match_id')
+        # Busca direta no set (Series.isin converte o set inteiro a cada chamada)
+        is_new = np.fromiter((match_id not in self.match_ids for match_id in matches['match_id'].astype(str)),
+                             dtype=bool, count=len(matches))
+        matches = matches[is_new
+                          & matches['winner_id'].notna()
+                          & matches['player1_id'].notna() & matches['player2_id'].notna()]
+        if matches.empty:
+            return 0
+        matches = matches.assign(date=pd.to_datetime(matches['date'], utc=True))
+        matches = matches.sort_values(['date', 'match_id'], kind='stable')
+
+        winner_ids = matches['winner_id'].astype('int64').to_numpy()
+        player1_ids = matches['player1_id'].astype('int64').to_numpy()
+        player2_ids = matches['player2_id'].astype('int64').to_numpy()
+        loser_ids = np.where(winner_ids == player1_ids, player2_ids, player1_ids)
+        surface_codes = {surface: code for code, surface in enumerate(SURFACES)}
+        surface_index = (matches['tournament_id'].map(surfaces or {}).map(surface_codes)
+                         .fillna(-1).astype(int).to_numpy())
+        self._replay(self._indices(winner_ids), self._indices(loser_ids), surface_index)
+
+        self.match_ids.update(matches['match_id'].astype(str))
+        last_date = matches['date'].max()
+        self.last_date = last_date if self.last_date is None else max(self.last_date, last_date)
+        return len(matches)
+
+    def _replay(self, winners, losers, surface_index):
+        """
+        Aplica os jogos em sequência (cada jogo depende do Elo deixado pelos
+        anteriores). O laço trabalha sobre listas, mais rápidas que arrays
+        NumPy no acesso a um elemento por vez; o resultado volta aos arrays.
+        """
+        n_surfaces = len(SURFACES)
+        ratings, played = self.ratings.tolist(), self.matches.tolist()
+        surface_ratings = self.surface_ratings.ravel().tolist()
+        surface_played = self.surface_matches.ravel().tolist()
+        for winner, loser, surface in zip(winners.tolist(), losers.tolist(), surface_index.tolist()):
+            delta = 1.0 - expected_score(ratings[winner], ratings[loser])
+            ratings[winner] += k_factor(played[winner]) * delta
+            ratings[loser] -= k_factor(played[loser]) * delta
+            played[winner] += 1
+            played[loser] += 1
+            if surface >= 0:
+                w, l = winner * n_surfaces + surface, loser * n_surfaces + surface
+                delta = 1.0 - expected_score(surface_ratings[w], surface_ratings[l])
+                surface_ratings[w] += k_factor(surface_played[w]) * delta
+                surface_ratings[l] -= k_factor(surface_played[l]) * delta
+                surface_played[w] += 1
+                surface_played[l] += 1
+        self.ratings[:] = ratings
+        self.matches[:] = played
+        self.surface_ratings[:] = np.reshape(surface_ratings, self.surface_ratings.shape)
+        self.surface_matches[:] = np.reshape(surface_played, self.surface_matches.shape)
+
+    def rating(self, player_id, surface=None):
+        """Elo geral (ou na superfície) do jogador; INITIAL_RATING se ele nunca jogou"""
+        position = self.player_index.get(int(player_id))
+        if position is None:
+            return INITIAL_RATING
+        if surface in SURFACES:
+            return float(self.surface_ratings[position, SURFACES.index(surface)])
+        return float(self.ratings[position])
+
+    def win_probability(self, player1_id, player2_id, surface=None):
+        """
+        Probabilidade de player1 vencer: pelo Elo geral ou, com a superfície
+        informada, pela média do Elo geral e do Elo da superfície
+        """
+        rating1, rating2 = self.rating(player1_id), self.rating(player2_id)
+        if surface in SURFACES:
+            rating1 = (rating1 + self.rating(player1_id, surface)) / 2
+            rating2 = (rating2 + self.rating(player2_id, surface)) / 2
+        return float(expected_score(rating1, rating2))
+
+    def ratings_frame(self):
+        """DataFrame com uma linha por jogador: elo, jogos e elo/jogos por superfície"""
+        n = len(self.player_ids)
+        frame = pd.DataFrame({
+            'player_id': pd.array(self.player_ids, dtype='Int64'),
+            'elo': self.ratings[:n],
+            'matches': self.matches[:n],
+        })
+        for code, surface in enumerate(SURFACES):
+            frame[f'elo_{surface.lower()}'] = self.surface_ratings[:n, code]
+            frame[f'matches_{surface.lower()}'] = self.surface_matches[:n, code]
+        return frame
+
+    def save(self):
+        """Grava o estado (arrays, IDs e jogos já vistos) em .npz"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        n = len(self.player_ids)
+        # np.savez acrescenta .npz a nomes sem a extensão
+        tmp_path = self.path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            player_ids=np.array(self.player_ids, dtype=np.int64),
+            ratings=self.ratings[:n],
+            matches=self.matches[:n],
+            surface_ratings=self.surface_ratings[:n],
+            surface_matches=self.surface_matches[:n],
+            match_ids=np.array(sorted(self.match_ids), dtype=str),
+            last_date=np.array([self.last_date.value if self.last_date is not None else -1], dtype=np.int64),
+        )
+        os.replace(tmp_path, self.path)
+
+    def _load(self, path):
+        with np.load(path) as state:
+            self.player_ids = state['player_ids'].tolist()
+            self.player_index = {player_id: position for position, player_id in enumerate(self.player_ids)}
+            self._allocate(max(len(self.player_ids), 1))
+            n = len(self.player_ids)
+            self.ratings[:n] = state['ratings']
+            self.matches[:n] = state['matches']
+            self.surface_ratings[:n] = state['surface_ratings']
+            self.surface_matches[:n] = state['surface_matches']
+            self.match_ids = set(state['match_ids'].tolist())
+            last_date = int(state['last_date'][0])
+            self.last_date = pd.Timestamp(last_date, tz="UTC") if last_date >= 0 else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula/atualiza o Elo geral e por superfície a partir dos past_matches")
+    parser.add_argument("--raw", nargs="*", default=RAW_PATHS, help="dumps com past_matches (stats2/stats3)")
+    parser.add_argument("--state", default=ELO_STATE_PATH)
+    parser.add_argument("--surfaces", default=SURFACES_PATH, help="CSV tournament_id,surface")
+    parser.add_argument("--top", type=int, default=10, help="quantos jogadores listar")
+    args = parser.parse_args()
+
+    engine = EloEngine(args.state)
+    processed = engine.update(collect_matches(args.raw), load_tournament_surfaces(args.surfaces))
+    engine.save()
+    print(f"✅ {processed} jogos novos processados; Elo de {len(engine)} jogadores em {args.state}")
+    print(engine.ratings_frame().nlargest(args.top, 'elo')[['player_id', 'elo', 'matches']].to_string(index=False))
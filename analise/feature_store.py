@@ -0,0 +1,287 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.parquet_store import match_rows
+from api.past_matches_sync import PastMatchesStore, SYNC_DIR
+from api.raw_dump import RawDump
+
+FEATURES_DIR = os.getenv("FEATURE_STORE_DIR", "dados/features")
+SURFACES_PATH = os.getenv("TOURNAMENT_SURFACES_PATH", "dados/clean/tournament_surfaces.csv")
+FORM_WINDOW = int(os.getenv("FEATURE_FORM_WINDOW", 10))
+RAW_PATHS = ['dados/raw/stats2_raw.json', 'dados/raw/stats3_raw.json']
+UNKNOWN_SURFACE = "Unknown"
+
+# Um set no formato "7-6(5)": games do vencedor do jogo, do adversário e,
+# no tie-break, os pontos de quem perdeu o tie-break
+_SET_PATTERN = r"(?P<games_w>\d+)-(?P<games_l>\d+)(?:\((?P<tb_points>\d+)\))?"
+
+
+def load_tournament_surfaces(path=SURFACES_PATH):
+    """Mapeamento tournamentId -> superfície (os jogos da API não trazem a superfície)"""
+    if not os.path.exists(path):
+        return {}
+    surfaces = pd.read_csv(path, dtype={'tournament_id': 'Int64', 'surface': str})
+    # Linhas ainda sem superfície (ver --missing-surfaces) ficam de fora
+    surfaces = surfaces.dropna(subset=['tournament_id', 'surface'])
+    return dict(zip(surfaces['tournament_id'], surfaces['surface']))
+
+
+def unmapped_tournaments(matches, surfaces=None):
+    """Jogos por tournament_id sem superfície no mapeamento, do torneio com mais jogos ao com menos"""
+    if matches.empty:
+        return pd.Series(dtype='int64')
+    matches = matches.drop_duplicates('match_id')
+    missing = matches[~matches['tournament_id'].isin(set(surfaces or {}))]
+    return missing['tournament_id'].value_counts()
+
+
+def parse_results(results):
+    """
+    Sets, games e tie-breaks de uma Series de placares ("6-1 6-7(5) 6-3",
+    "7-6(7) 2-1 ret."), sempre do ponto de vista do vencedor do jogo (player1).
+    Sets incompletos (jogo abandonado) contam nos games mas não nos sets.
+    """
+    sets = results.fillna("").str.extractall(_SET_PATTERN)
+    columns = ['sets_w', 'sets_l', 'games_w', 'games_l', 'tiebreaks_w', 'tiebreaks_l']
+    if sets.empty:
+        parsed = pd.DataFrame(0, index=results.index, columns=columns)
+    else:
+        games_w = sets['games_w'].astype(int)
+        games_l = sets['games_l'].astype(int)
+        high = games_w.where(games_w > games_l, games_l)
+        low = games_w.where(games_w < games_l, games_l)
+        tiebreak = (high == 7) & (low == 6)
+        complete = tiebreak | ((high >= 6) & (high - low >= 2))
+        per_set = pd.DataFrame({
+            'sets_w': complete & (games_w > games_l),
+            'sets_l': complete & (games_w < games_l),
+            'games_w': games_w,
+            'games_l': games_l,
+            'tiebreaks_w': tiebreak & (games_w > games_l),
+            'tiebreaks_l': tiebreak & (games_w < games_l),
+        }).astype(int)
+        parsed = per_set.groupby(level=0).sum().reindex(results.index, fill_value=0)
+    parsed['retired'] = results.fillna("").str.contains("ret", regex=False)
+    return parsed
+
+
+def player_match_frame(matches, surfaces=None):
+    """
+    Uma linha por (jogador, jogo) a partir da tabela de jogos: cada jogo
+    vira a linha do vencedor e a do perdedor, com sets/games/tie-breaks
+    do ponto de vista de cada um e a superfície do torneio.
+    """
+    matches = matches.drop_duplicates('match_id')
+    parsed = parse_results(matches['result'])
+    surface = matches['tournament_id'].map(surfaces or {}).fillna(UNKNOWN_SURFACE)
+    date = pd.to_datetime(matches['date'], utc=True)
+    winner_is_p1 = matches['winner_id'] == matches['player1_id']
+    winner_id = matches['winner_id']
+    loser_id = matches['player2_id'].where(winner_is_p1, matches['player1_id'])
+
+    def side(player_id, opponent_id, won, own, other):
+        return pd.DataFrame({
+            'player_id': player_id.astype('Int64'),
+            'opponent_id': opponent_id.astype('Int64'),
+            'match_id': matches['match_id'],
+            'date': date,
+            'tournament_id': matches['tournament_id'],
+            'surface': surface,
+            'won': won,
+            'sets_won': parsed[f'sets_{own}'],
+            'sets_lost': parsed[f'sets_{other}'],
+            'games_won': parsed[f'games_{own}'],
+            'games_lost': parsed[f'games_{other}'],
+            'tiebreaks_won': parsed[f'tiebreaks_{own}'],
+            'tiebreaks_lost': parsed[f'tiebreaks_{other}'],
+            'retired': parsed['retired'],
+        })
+
+    frame = pd.concat([side(winner_id, loser_id, 1, 'w', 'l'), side(loser_id, winner_id, 0, 'l', 'w')],
+                      ignore_index=True)
+    frame = frame[frame['player_id'].notna()]
+    return frame.sort_values(['player_id', 'date', 'match_id'], kind='stable').reset_index(drop=True)
+
+
+def add_rolling_form(player_matches, window=FORM_WINDOW):
+    """Coluna form_before: taxa de vitórias nos `window` jogos anteriores de cada jogador"""
+    player_matches = player_matches.sort_values(['player_id', 'date', 'match_id'], kind='stable')
+    player_matches['form_before'] = (
+        player_matches.groupby('player_id')['won']
+        .transform(lambda won: won.shift(1).rolling(window, min_periods=1).mean())
+    )
+    return player_matches.reset_index(drop=True)
+
+
+def _win_rates(player_matches, by):
+    grouped = player_matches.groupby(['player_id', by], observed=True)['won']
+    table = grouped.agg(matches='size', wins='sum').reset_index()
+    table['win_rate'] = table['wins'] / table['matches']
+    return table
+
+
+def _as_of_timestamp(as_of=None):
+    """Data de referência (UTC) para days_since_last_match; padrão: agora"""
+    as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now(tz="UTC")
+    return as_of.tz_localize("UTC") if as_of.tzinfo is None else as_of
+
+
+def compute_features(player_matches, as_of=None, window=FORM_WINDOW):
+    """
+    Tabelas de features a partir das linhas (jogador, jogo):
+    'players' (uma linha por jogador), 'by_surface' e 'by_year'.
+    """
+    as_of = _as_of_timestamp(as_of)
+    ordered = player_matches.sort_values(['player_id', 'date', 'match_id'], kind='stable')
+    grouped = ordered.groupby('player_id')
+    players = grouped.agg(
+        matches=('won', 'size'),
+        wins=('won', 'sum'),
+        sets_won=('sets_won', 'sum'),
+        sets_lost=('sets_lost', 'sum'),
+        games_won=('games_won', 'sum'),
+        games_lost=('games_lost', 'sum'),
+        tiebreaks_won=('tiebreaks_won', 'sum'),
+        tiebreaks_lost=('tiebreaks_lost', 'sum'),
+        last_match_date=('date', 'max'),
+    )
+    players['win_rate'] = players['wins'] / players['matches']
+    players['sets_won_ratio'] = players['sets_won'] / (players['sets_won'] + players['sets_lost'])
+    players['games_won_ratio'] = players['games_won'] / (players['games_won'] + players['games_lost'])
+    tiebreaks = players['tiebreaks_won'] + players['tiebreaks_lost']
+    players['tiebreak_win_rate'] = (players['tiebreaks_won'] / tiebreaks).where(tiebreaks > 0)
+    recent = grouped.tail(window).groupby('player_id')['won']
+    players['form_matches'] = recent.size()
+    players['form_win_rate'] = recent.mean()
+    players['days_since_last_match'] = (as_of - players['last_match_date']).dt.days
+
+    by_year = ordered.assign(year=ordered['date'].dt.year)
+    return {
+        'players': players.reset_index(),
+        'by_surface': _win_rates(ordered, 'surface'),
+        'by_year': _win_rates(by_year, 'year'),
+    }
+
+
+def collect_matches(raw_paths=RAW_PATHS, store_dir=SYNC_DIR):
+    """Tabela de jogos (sem repetição) dos dumps brutos e do store incremental de past-matches"""
+    rows = []
+    for path in raw_paths:
+        if not os.path.exists(path):
+            continue
+        # Só a seção past_matches de cada jogador é decodificada, um jogador por vez
+        with RawDump(path) as dump:
+            for _, player_data in dump.iter_players('past_matches'):
+                rows.extend(match_rows(player_data.get('past_matches')))
+    if store_dir and os.path.isdir(store_dir):
+        store = PastMatchesStore(store_dir)
+        for player_id in store.manifest:
+            rows.extend(match_rows(store.load_payload(player_id)))
+    matches = pd.DataFrame(rows)
+    if matches.empty:
+        return matches
+    return matches.drop_duplicates('match_id').reset_index(drop=True)
+
+
+class FeatureStore:
+    """
+    Features de jogadores derivadas dos past_matches, em Parquet.
+
+    player_matches.parquet guarda as linhas (jogador, jogo) já processadas.
+    Em update() só os jogos com match_id ainda não visto são processados,
+    e as features só dos jogadores envolvidos neles são recalculadas; as
+    linhas dos demais jogadores são mantidas como estavam.
+    """
+
+    TABLES = ('player_matches', 'players', 'by_surface', 'by_year')
+
+    def __init__(self, base_dir=FEATURES_DIR, window=FORM_WINDOW):
+        self.base_dir = base_dir
+        self.window = window
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.base_dir, f"{name}.parquet")
+
+    def read(self, name, columns=None, filters=None):
+        """Lê uma das tabelas (ver TABLES) como DataFrame, com projeção e filtros do pyarrow"""
+        if name not in self.TABLES:
+            raise ValueError(f"Tabela desconhecida: {name} (disponíveis: {', '.join(self.TABLES)})")
+        if not os.path.exists(self._path(name)):
+            return pd.DataFrame()
+        return pq.read_table(self._path(name), columns=columns, filters=filters).to_pandas()
+
+    def _write(self, name, df):
+        tmp_path = self._path(name) + ".tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression="zstd")
+        os.replace(tmp_path, self._path(name))
+
+    def update(self, matches, surfaces=None, as_of=None):
+        """Incorpora os jogos novos da tabela de jogos e retorna quantos eram novos"""
+        stored = self.read('player_matches')
+        if not matches.empty and not stored.empty:
+            matches = matches[~matches['match_id'].isin(set(stored['match_id']))]
+        if matches.empty:
+            return 0
+
+        new_rows = player_match_frame(matches, surfaces)
+        affected = set(new_rows['player_id'].dropna())
+        if stored.empty:
+            untouched, player_matches = stored, new_rows
+        else:
+            is_affected = stored['player_id'].isin(affected)
+            untouched = stored[~is_affected]
+            player_matches = pd.concat([stored[is_affected].drop(columns='form_before'), new_rows],
+                                       ignore_index=True)
+        as_of = _as_of_timestamp(as_of)
+        player_matches = add_rolling_form(player_matches, self.window)
+        features = compute_features(player_matches, as_of, self.window)
+
+        self._write('player_matches', pd.concat([untouched, player_matches], ignore_index=True)
+                    .sort_values(['player_id', 'date', 'match_id'], kind='stable'))
+        for name, table in features.items():
+            previous = self.read(name)
+            if not previous.empty:
+                table = pd.concat([previous[~previous['player_id'].isin(affected)], table], ignore_index=True)
+            if name == 'players':
+                # days_since_last_match muda com a data de referência, não só com jogos novos
+                table['days_since_last_match'] = (as_of - table['last_match_date']).dt.days
+            self._write(name, table.sort_values('player_id', kind='stable'))
+        return len(matches.drop_duplicates('match_id'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcula/atualiza as features dos jogadores a partir dos past_matches")
+    parser.add_argument("--raw", nargs="*", default=RAW_PATHS, help="dumps com past_matches (stats2/stats3)")
+    parser.add_argument("--store-dir", default=FEATURES_DIR)
+    parser.add_argument("--form-window", type=int, default=FORM_WINDOW)
+    parser.add_argument("--surfaces", default=SURFACES_PATH, help="CSV tournament_id,surface")
+    parser.add_argument("--missing-surfaces", default=None,
+                        help="grava neste CSV (no formato do --surfaces, do torneio com mais jogos ao com menos) "
+                             "os torneios sem superfície, para preencher")
+    args = parser.parse_args()
+
+    matches = collect_matches(args.raw)
+    surfaces = load_tournament_surfaces(args.surfaces)
+    missing = unmapped_tournaments(matches, surfaces)
+    if not missing.empty:
+        # Sem superfície o jogo fica como Unknown: não entra no by_surface nem no Elo por superfície
+        print(f"⚠️ {missing.sum()} de {len(matches)} jogos, em {len(missing)} torneios, sem superfície em "
+              f"{args.surfaces} (ficam como '{UNKNOWN_SURFACE}')")
+        if args.missing_surfaces:
+            pd.DataFrame({'tournament_id': missing.index, 'surface': None, 'name': None}).to_csv(
+                args.missing_surfaces, index=False)
+            print(f"Torneios sem superfície salvos em {args.missing_surfaces}")
+
+    feature_store = FeatureStore(args.store_dir, args.form_window)
+    new_matches = feature_store.update(matches, surfaces)
+    players = feature_store.read('players', columns=['player_id'])
+    print(f"✅ {new_matches} jogos novos processados; features de {len(players)} jogadores em {args.store_dir}")
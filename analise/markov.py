@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.parquet_store import ODDS_PATH
+from analise.simulation import simulate_events
+from analise.value_bets import DEFAULT_SURFACE
+
+# Casas decimais das probabilidades de ponto usadas como chave do cache
+# (estatísticas em percentual inteiro não precisam de mais que isso)
+PROBABILITY_DECIMALS = 6
+# Games por set no máximo (7-6) e por partida no máximo (5 sets de 13 games)
+MAX_SET_GAMES = 13
+MAX_MATCH_GAMES = 5 * MAX_SET_GAMES
+
+
+@lru_cache(maxsize=None)
+def _game_from(p, server_points, receiver_points):
+    if server_points >= 4 and server_points - receiver_points >= 2:
+        return 1.0
+    if receiver_points >= 4 and receiver_points - server_points >= 2:
+        return 0.0
+    if server_points == receiver_points >= 3:
+        # Iguais: ganhar dois pontos seguidos antes de perder dois seguidos
+        return p ** 2 / (p ** 2 + (1.0 - p) ** 2)
+    return p * _game_from(p, server_points + 1, receiver_points) + \
+        (1.0 - p) * _game_from(p, server_points, receiver_points + 1)
+
+
+def hold_probability(p):
+    """Probabilidade de confirmar o game de saque ganhando cada ponto com probabilidade p"""
+    return _game_from(round(float(p), PROBABILITY_DECIMALS), 0, 0)
+
+
+@lru_cache(maxsize=None)
+def _tiebreak_from(p_a, p_b, points_a, points_b):
+    if points_a >= 7 and points_a - points_b >= 2:
+        return 1.0
+    if points_b >= 7 and points_b - points_a >= 2:
+        return 0.0
+    if points_a == points_b >= 6:
+        # Daqui em diante cada par de pontos tem um saque de cada (A e depois B)
+        both = p_a * (1.0 - p_b)
+        return both / (both + (1.0 - p_a) * p_b)
+    played = points_a + points_b
+    point_a = p_a if ((played + 1) // 2) % 2 == 0 else 1.0 - p_b
+    return point_a * _tiebreak_from(p_a, p_b, points_a + 1, points_b) + \
+        (1.0 - point_a) * _tiebreak_from(p_a, p_b, points_a, points_b + 1)
+
+
+def tiebreak_probability(p_a, p_b):
+    """Probabilidade de A vencer o tie-break sacando o primeiro ponto"""
+    return _tiebreak_from(round(float(p_a), PROBABILITY_DECIMALS), round(float(p_b), PROBABILITY_DECIMALS), 0, 0)
+
+
+@lru_cache(maxsize=None)
+def _set_scores(p_a, p_b):
+    hold_a, hold_b = hold_probability(p_a), hold_probability(p_b)
+    # Tabela de probabilidade de cada placar, preenchida em ordem de games jogados
+    reach = {(0, 0): 1.0}
+    final = {}
+    for played in range(2 * 6):
+        game_a = hold_a if played % 2 == 0 else 1.0 - hold_b
+        for games_a in range(max(0, played - 6), min(played, 6) + 1):
+            prob = reach.pop((games_a, played - games_a), None)
+            if prob is None:
+                continue
+            for score, move in (((games_a + 1, played - games_a), game_a),
+                                ((games_a, played - games_a + 1), 1.0 - game_a)):
+                high, low = max(score), min(score)
+                target = final if high >= 6 and high - low >= 2 else reach
+                target[score] = target.get(score, 0.0) + prob * move
+    # Só sobra o 6-6, decidido no tie-break
+    tiebreak = tiebreak_probability(p_a, p_b)
+    final[(7, 6)] = reach[(6, 6)] * tiebreak
+    final[(6, 7)] = reach[(6, 6)] * (1.0 - tiebreak)
+    return final
+
+
+def set_score_distribution(p_a, p_b):
+    """
+    Distribuição exata do placar do set {(games de A, games de B): prob}
+    com A sacando o primeiro game, tie-break em 6-6
+    """
+    return dict(_set_scores(round(float(p_a), PROBABILITY_DECIMALS), round(float(p_b), PROBABILITY_DECIMALS)))
+
+
+def set_probability(p_a, p_b):
+    """Probabilidade de A vencer o set sacando o primeiro game"""
+    return sum(prob for (games_a, games_b), prob in set_score_distribution(p_a, p_b).items() if games_a > games_b)
+
+
+@lru_cache(maxsize=4096)
+def _match(p1, p2, best_of):
+    sets_to_win = best_of // 2 + 1
+    # Placar do set do ponto de vista de participant1, conforme quem saca primeiro
+    set_outcomes = {
+        0: list(_set_scores(p1, p2).items()),
+        1: [((games1, games2), prob) for (games2, games1), prob in _set_scores(p2, p1).items()],
+    }
+    # Estado: (sets de p1, sets de p2, quem saca o primeiro game do set) ->
+    # grade [total de games, saldo de games de p1 + MAX_MATCH_GAMES] de probabilidades
+    shape = (MAX_MATCH_GAMES + 1, 2 * MAX_MATCH_GAMES + 1)
+    states = {}
+    for server in (0, 1):
+        grid = np.zeros(shape)
+        grid[0, MAX_MATCH_GAMES] = 0.5  # sorteio de quem saca primeiro
+        states[(0, 0, server)] = grid
+    finished = {}
+    first_set_games = np.zeros(2 * MAX_SET_GAMES + 1)
+    first_set_scores = {}
+    first_set_win = 0.0
+    for _ in range(best_of):
+        next_states = {}
+        for (sets1, sets2, server), grid in states.items():
+            for (games1, games2), prob in set_outcomes[server]:
+                if sets1 + sets2 == 0:
+                    first_set_games[games1 + games2] += 0.5 * prob
+                    first_set_scores[f"{games1}-{games2}"] = first_set_scores.get(f"{games1}-{games2}", 0.0) + 0.5 * prob
+                    first_set_win += 0.5 * prob if games1 > games2 else 0.0
+                games, margin = games1 + games2, games1 - games2
+                shifted = np.zeros(shape)
+                if margin >= 0:
+                    shifted[games:, margin:] = grid[:shape[0] - games, :shape[1] - margin] * prob
+                else:
+                    shifted[games:, :margin] = grid[:shape[0] - games, -margin:] * prob
+                key = (sets1 + (games1 > games2), sets2 + (games2 > games1),
+                       server if games % 2 == 0 else 1 - server)
+                target = finished if max(key[:2]) == sets_to_win else next_states
+                target_key = key[:2] if target is finished else key
+                target[target_key] = target.get(target_key, 0.0) + shifted
+        states = next_states
+        if not states:
+            break
+
+    total = sum(finished.values())
+    margins = np.arange(-MAX_MATCH_GAMES, MAX_MATCH_GAMES + 1)
+    total_games = total.sum(axis=1)
+    game_margin = total.sum(axis=0)
+    return {
+        "match_win": float(sum(grid.sum() for (sets1, _), grid in finished.items() if sets1 == sets_to_win)),
+        "first_set_win": first_set_win,
+        "total_games": pd.Series(total_games[total_games > 0], index=np.flatnonzero(total_games > 0)),
+        "first_set_games": pd.Series(first_set_games[first_set_games > 0], index=np.flatnonzero(first_set_games > 0)),
+        "game_margin": pd.Series(game_margin[game_margin > 0], index=margins[game_margin > 0]),
+        "set_scores": pd.Series({f"{sets1}-{sets2}": float(grid.sum()) for (sets1, sets2), grid in sorted(finished.items())}),
+        "first_set_scores": pd.Series(first_set_scores).sort_index(),
+    }
+
+
+def match_distribution(p1_serve, p2_serve, best_of=3):
+    """
+    Resultado exato da partida pela cadeia de Markov ponto -> game -> set ->
+    partida, no mesmo formato de simulation.simulate_match: probabilidades
+    de participant1 vencer a partida e o primeiro set e as distribuições de
+    total de games, games do primeiro set, saldo de games, placar em sets e
+    placar do primeiro set. Quem saca primeiro é sorteado (média dos dois casos).
+
+    Games, tie-breaks, sets e partidas ficam em cache por probabilidades de
+    ponto, então eventos com os mesmos jogadores não são recalculados. O
+    resultado é uma cópia: alterá-lo não muda o que está no cache.
+    """
+    cached = _match(round(float(p1_serve), PROBABILITY_DECIMALS), round(float(p2_serve), PROBABILITY_DECIMALS),
+                    best_of)
+    return {key: value.copy() if isinstance(value, pd.Series) else value for key, value in cached.items()}
+
+
+def _load_json(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilidades exatas (cadeia de Markov) e preço das linhas de games")
+    parser.add_argument("--odds", default=ODDS_PATH, help="JSON de eventos com odds (api/odds.py)")
+    parser.add_argument("--players-table", default=None, help="tabela de features dos eventos compactos")
+    parser.add_argument("--surface", default=DEFAULT_SURFACE)
+    parser.add_argument("--p1-serve", type=float, default=None,
+                        help="calcula só uma partida com essas probabilidades de ponto no saque (0-1)")
+    parser.add_argument("--p2-serve", type=float, default=None)
+    parser.add_argument("--best-of", type=int, default=3, choices=(3, 5))
+    parser.add_argument("--output", default=None, help="grava as linhas precificadas neste CSV")
+    args = parser.parse_args()
+
+    if args.p1_serve is not None and args.p2_serve is not None:
+        result = match_distribution(args.p1_serve, args.p2_serve, args.best_of)
+        print(f"Hold: p1 {hold_probability(args.p1_serve):.4f}, p2 {hold_probability(args.p2_serve):.4f}")
+        print(f"Vitória de participant1: {result['match_win']:.4f} (primeiro set: {result['first_set_win']:.4f})")
+        print(f"Total de games esperado: {(result['total_games'].index * result['total_games']).sum():.2f}")
+        print("Placar em sets:\n" + result["set_scores"].round(4).to_string())
+    else:
+        priced = simulate_events(_load_json(args.odds) or [], _load_json(args.players_table), args.surface,
+                                 model=match_distribution)
+        if args.output:
+            priced.to_csv(args.output, index=False)
+            print(f"{len(priced)} linhas precificadas salvas em {args.output}")
+        if priced.empty:
+            print("Nenhum evento com estatísticas dos dois jogadores.")
+        else:
+            columns = ["event_id", "market", "handicap", "outcome", "odds", "model_prob", "ev"]
+            print(priced[columns].to_string(index=False))
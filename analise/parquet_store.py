@@ -0,0 +1,363 @@
+import argparse
+import json
+import os
+import re
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.schemas import PastMatches, PlayerRef, SchemaError, SurfaceSummary
+
+STORE_DIR = os.getenv("PARQUET_STORE_DIR", "dados/parquet")
+# Grupos de linhas pequenos o bastante para as estatísticas de min/max de
+# cada grupo permitirem pular partes do arquivo nos filtros
+ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", 2048))
+
+STATS_CLEAN_PATH = 'dados/clean/stats_clean.json'
+STATS_RAW_PATH = 'dados/raw/stats_raw.json'
+STATS2_RAW_PATH = 'dados/raw/stats2_raw.json'
+STATS3_RAW_PATH = 'dados/raw/stats3_raw.json'
+ODDS_PATH = 'dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json'
+
+# Tabela -> colunas usadas para ordenar antes de gravar (deixa os filtros
+# por essas colunas concentrados em poucos grupos de linhas)
+TABLES = {
+    "players": ["source", "player_id"],
+    "service_stats": ["surface", "player_id"],
+    "return_stats": ["surface", "player_id"],
+    "surface_summary": ["year", "court"],
+    "matches": ["date"],
+    "events": ["event_date", "event_id"],
+    "odds_lines": ["market", "event_id"],
+}
+
+_RECORD_STATS_KEY = re.compile(r"^(Service|Return)RecordStats(.+)$")
+
+
+def _load_json(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _surface_summary_rows(source, player_id, name, surface_summary):
+    """
+    Linhas (ano, quadra, vitórias, derrotas) de um surface_summary, em lista
+    ou em {'data': [...]}. Lê pelo esquema SurfaceSummary (api/schemas.py);
+    um payload fora dele cai na leitura campo a campo.
+    """
+    try:
+        records = SurfaceSummary.from_dict(surface_summary).records
+    except SchemaError:
+        return _surface_summary_rows_lenient(source, player_id, name, surface_summary)
+    return [{"source": source, "player_id": str(player_id), "name": name, "year": record.year,
+             "court_id": record.court_id, "court": record.court, "wins": record.wins, "losses": record.losses}
+            for record in records]
+
+
+def _surface_summary_rows_lenient(source, player_id, name, surface_summary):
+    if isinstance(surface_summary, dict):
+        surface_summary = surface_summary.get('data')
+    rows = []
+    for year_item in surface_summary or []:
+        if not isinstance(year_item, dict):
+            continue
+        for surface in year_item.get('surfaces') or []:
+            rows.append({
+                "source": source,
+                "player_id": str(player_id),
+                "name": name,
+                "year": year_item.get('year'),
+                "court_id": surface.get('courtId'),
+                "court": surface.get('court'),
+                "wins": surface.get('courtWins'),
+                "losses": surface.get('courtLosses'),
+            })
+    return rows
+
+
+def match_rows(past_matches):
+    """
+    Linhas da tabela de jogos a partir de uma resposta de past-matches. Lê
+    pelo esquema PastMatches (api/schemas.py); uma resposta fora dele cai
+    na leitura campo a campo.
+    """
+    if past_matches is None:
+        return []
+    try:
+        matches = PastMatches.from_dict(past_matches).matches
+    except SchemaError:
+        return _match_rows_lenient(past_matches)
+    rows = []
+    for match in matches:
+        player1 = match.player1 or PlayerRef(None, None)
+        player2 = match.player2 or PlayerRef(None, None)
+        rows.append({
+            "match_id": str(match.id),
+            "date": match.date,
+            "round_id": match.round_id,
+            "tournament_id": match.tournament_id,
+            "player1_id": match.player1_id,
+            "player2_id": match.player2_id,
+            "winner_id": match.winner_id,
+            "result": match.result,
+            "player1_name": player1.name,
+            "player2_name": player2.name,
+            "player1_country": player1.country,
+            "player2_country": player2.country,
+        })
+    return rows
+
+
+def _match_rows_lenient(past_matches):
+    matches = past_matches.get('data') if isinstance(past_matches, dict) else None
+    rows = []
+    for match in matches or []:
+        if not isinstance(match, dict) or match.get('id') is None:
+            continue
+        player1 = match.get('player1') or {}
+        player2 = match.get('player2') or {}
+        rows.append({
+            "match_id": str(match['id']),
+            "date": match.get('date'),
+            "round_id": match.get('roundId'),
+            "tournament_id": match.get('tournamentId'),
+            "player1_id": match.get('player1Id'),
+            "player2_id": match.get('player2Id'),
+            "winner_id": match.get('match_winner'),
+            "result": match.get('result'),
+            "player1_name": player1.get('name'),
+            "player2_name": player2.get('name'),
+            "player1_country": player1.get('countryAcr'),
+            "player2_country": player2.get('countryAcr'),
+        })
+    return rows
+
+
+def normalize_stats_clean(stats_clean):
+    """Separa o stats_clean.json em jogadores, estatísticas por superfície, surface_summary e jogos"""
+    players, service, returns, summary, matches = [], [], [], [], []
+    for name, player_data in stats_clean.items():
+        player_id = player_data.get('player_id')
+        players.append({"source": "stats_clean", "player_id": str(player_id), "name": name})
+        for key, value in player_data.items():
+            record_match = _RECORD_STATS_KEY.match(key)
+            if record_match and isinstance(value, dict):
+                kind, surface = record_match.groups()
+                row = {"player_id": player_id, "name": name, "surface": surface, **value}
+                (service if kind == "Service" else returns).append(row)
+        summary.extend(_surface_summary_rows("stats_clean", player_id, name, player_data.get('surface_summary')))
+        matches.extend(match_rows(player_data.get('past_matches')))
+    return {
+        "players": players,
+        "service_stats": service,
+        "return_stats": returns,
+        "surface_summary": summary,
+        "matches": matches,
+    }
+
+
+def normalize_stats_raw(stats_raw):
+    """
+    Separa o stats_raw.json (Ultimate Tennis) em jogadores e estatísticas de
+    saque/devolução por superfície. O stats_clean.json só guarda os jogadores
+    com nome no stats.csv; aqui entram todos, sem nome.
+    """
+    players, service, returns = [], [], []
+    for player_id, player_data in stats_raw.items():
+        if not isinstance(player_data, dict):
+            continue
+        players.append({"source": "stats", "player_id": str(player_id), "name": None})
+        api_response = player_data.get('api_response')
+        for item in api_response if isinstance(api_response, list) else [api_response]:
+            if not isinstance(item, dict) or 'Surface' not in item:
+                continue
+            for kind, rows in (("Service", service), ("Return", returns)):
+                value = item.get(f"{kind}RecordStats")
+                if isinstance(value, dict):
+                    rows.append({"player_id": player_id, "name": None, "surface": item['Surface'], **value})
+    return {"players": players, "service_stats": service, "return_stats": returns}
+
+
+def _normalize_player_dump(source, players_data):
+    """Jogadores, surface_summary e jogos de um dump da tennis-api ({chave: {player_info, ...}})"""
+    players, summary, matches = [], [], []
+    for player_data in players_data.values():
+        if not isinstance(player_data, dict):
+            continue
+        player_info = player_data.get('player_info') or {}
+        player_id = player_info.get('id')
+        if player_id is None:
+            continue
+        name = player_info.get('name')
+        players.append({"source": source, "player_id": str(player_id), "name": name})
+        summary.extend(_surface_summary_rows(source, player_id, name, player_data.get('surface_summary')))
+        matches.extend(match_rows(player_data.get('past_matches')))
+    return {"players": players, "surface_summary": summary, "matches": matches}
+
+
+def normalize_stats2_raw(stats2_raw):
+    """Separa o stats2_raw.json (top 50, surface_summary de todos os anos) em jogadores, surface_summary e jogos"""
+    return _normalize_player_dump("stats2", stats2_raw)
+
+
+def normalize_stats3_raw(stats3_raw):
+    """Separa o stats3_raw.json em jogadores, surface_summary e jogos"""
+    return _normalize_player_dump("stats3", stats3_raw.get('players') or {})
+
+
+def _participant_player_id(participant):
+    """player_id de um participante do JSON de eventos (em stats, ou direto no modo compacto)"""
+    # Jogador sem estatísticas encontradas vem com stats "N/A" (build_event_info)
+    stats = participant.get('stats')
+    stats = stats if isinstance(stats, dict) else {}
+    return stats.get('player_id', participant.get('player_id'))
+
+
+def normalize_odds(collected_events):
+    """Separa o JSON de eventos com odds em eventos (um por linha) e linhas de odds"""
+    events, odds_lines = [], []
+    for event in collected_events or []:
+        participant1 = event.get('participant1') or {}
+        participant2 = event.get('participant2') or {}
+        events.append({
+            "event_id": event.get('event_id'),
+            "tournament_id": event.get('tournament_id'),
+            "tournament_name": event.get('tournament_name'),
+            "tournament_category": event.get('tournament_category'),
+            "event_status": event.get('event_status'),
+            "event_date": event.get('event_date'),
+            "event_time": event.get('event_time'),
+            "start_time_unix": event.get('start_time_unix_event'),
+            "bookmaker_count": event.get('bookmaker_count_event'),
+            "participant1": participant1.get('name_api'),
+            "participant1_id": participant1.get('id_api'),
+            "participant1_player_id": _participant_player_id(participant1),
+            "participant2": participant2.get('name_api'),
+            "participant2_id": participant2.get('id_api'),
+            "participant2_player_id": _participant_player_id(participant2),
+        })
+        for line in event.get('odds_bet365') or []:
+            odds_lines.append({
+                "event_id": event.get('event_id'),
+                "bookmaker": "bet365",
+                "market": line.get('market'),
+                "short": line.get('short'),
+                "handicap": line.get('handicap'),
+                "odds_type": line.get('odds_type'),
+                "outcome": line.get('outcome'),
+                "odds": line.get('odds'),
+            })
+    return {"events": events, "odds_lines": odds_lines}
+
+
+def build_tables(stats_clean=None, stats3_raw=None, collected_events=None, stats_raw=None, stats2_raw=None):
+    """
+    Monta os DataFrames normalizados a partir dos JSONs já carregados.
+
+    Jogos presentes em mais de um arquivo (o mesmo jogo aparece na lista
+    dos dois jogadores) ficam uma vez só, pelo match_id. As estatísticas de
+    saque/devolução do stats_clean vêm do stats_raw: cada (jogador,
+    superfície) fica uma vez, com o nome do stats_clean quando ele existe.
+    """
+    rows = {name: [] for name in TABLES}
+    parts = []
+    if stats_clean:
+        parts.append(normalize_stats_clean(stats_clean))
+    if stats_raw:
+        parts.append(normalize_stats_raw(stats_raw))
+    if stats2_raw:
+        parts.append(normalize_stats2_raw(stats2_raw))
+    if stats3_raw:
+        parts.append(normalize_stats3_raw(stats3_raw))
+    if collected_events:
+        parts.append(normalize_odds(collected_events))
+    for part in parts:
+        for name, table_rows in part.items():
+            rows[name].extend(table_rows)
+
+    tables = {}
+    for name, sort_columns in TABLES.items():
+        df = pd.DataFrame(rows[name])
+        if df.empty:
+            continue
+        if name == "matches":
+            df = df.drop_duplicates("match_id")
+            df["date"] = pd.to_datetime(df["date"], utc=True)
+        elif name in ("service_stats", "return_stats"):
+            df = df.drop_duplicates(["player_id", "surface"])
+        df = df.sort_values(sort_columns, kind="stable").reset_index(drop=True)
+        tables[name] = df
+    return tables
+
+
+def write_store(tables, store_dir=STORE_DIR, row_group_size=ROW_GROUP_SIZE):
+    """Grava cada DataFrame como <store_dir>/<tabela>.parquet e retorna {tabela: linhas}"""
+    os.makedirs(store_dir, exist_ok=True)
+    counts = {}
+    for name, df in tables.items():
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = os.path.join(store_dir, f"{name}.parquet.tmp")
+        pq.write_table(table, tmp_path, row_group_size=row_group_size, compression="zstd")
+        os.replace(tmp_path, os.path.join(store_dir, f"{name}.parquet"))
+        counts[name] = table.num_rows
+    return counts
+
+
+def build_store(store_dir=STORE_DIR, stats_clean_path=STATS_CLEAN_PATH,
+                stats3_raw_path=STATS3_RAW_PATH, odds_path=ODDS_PATH,
+                stats_raw_path=STATS_RAW_PATH, stats2_raw_path=STATS2_RAW_PATH):
+    """Converte os JSONs de dados/ para o store Parquet (arquivos ausentes são ignorados)"""
+    tables = build_tables(
+        stats_clean=_load_json(stats_clean_path),
+        stats3_raw=_load_json(stats3_raw_path),
+        collected_events=_load_json(odds_path),
+        stats_raw=_load_json(stats_raw_path),
+        stats2_raw=_load_json(stats2_raw_path),
+    )
+    return write_store(tables, store_dir)
+
+
+def table_path(name, store_dir=STORE_DIR):
+    if name not in TABLES:
+        raise ValueError(f"Tabela desconhecida: {name} (disponíveis: {', '.join(TABLES)})")
+    return os.path.join(store_dir, f"{name}.parquet")
+
+
+def read_arrow(name, columns=None, filters=None, store_dir=STORE_DIR):
+    """
+    Lê uma tabela como pyarrow.Table.
+
+    `columns` lê só as colunas pedidas do disco; `filters` usa o formato do
+    pyarrow (ex.: [("surface", "==", "Clay"), ("year", ">=", 2024)]) e é
+    aplicado durante a leitura, pulando os grupos de linhas cujas
+    estatísticas de min/max não podem casar.
+    """
+    return pq.read_table(table_path(name, store_dir), columns=columns, filters=filters)
+
+
+def read_table(name, columns=None, filters=None, store_dir=STORE_DIR):
+    """Mesmo que read_arrow, já convertido para pandas.DataFrame"""
+    return read_arrow(name, columns, filters, store_dir).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte os JSONs de dados/ para tabelas Parquet")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--stats-clean", default=STATS_CLEAN_PATH)
+    parser.add_argument("--stats-raw", default=STATS_RAW_PATH)
+    parser.add_argument("--stats2-raw", default=STATS2_RAW_PATH)
+    parser.add_argument("--stats3-raw", default=STATS3_RAW_PATH)
+    parser.add_argument("--odds", default=ODDS_PATH)
+    args = parser.parse_args()
+
+    counts = build_store(args.store_dir, args.stats_clean, args.stats3_raw, args.odds,
+                         args.stats_raw, args.stats2_raw)
+    for name, count in counts.items():
+        print(f"✅ {name}: {count} linhas -> {table_path(name, args.store_dir)}")
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.parquet_store import ODDS_PATH, normalize_odds
+from analise.value_bets import (BEST_OF_FIVE_PATTERN, DEFAULT_SURFACE, hold_probability, player_features,
+                                serve_probabilities, tiebreak_probability)
+
+SIMULATIONS = int(os.getenv("SIMULATIONS", 100000))
+# Simulações por lote: cada lote tem sua própria semente derivada da semente
+# principal, então o resultado com uma semente não depende de quantos
+# processos foram usados
+SIMULATION_CHUNK_SIZE = int(os.getenv("SIMULATION_CHUNK_SIZE", 50000))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", 1))
+# Mercados de games precificados pela simulação -> distribuição usada
+GAME_MARKETS = {
+    "Total Games Over Under": "total_games",
+    "Total Games First Set": "first_set_games",
+    "Game Handicap": "game_margin",
+}
+
+
+def _simulate_chunk(task):
+    """
+    Simula um lote de partidas game a game, todas ao mesmo tempo (um array
+    por variável de estado). Com os pontos independentes, o game de saque é
+    vencido com a probabilidade de hold e o tie-break com a de
+    tiebreak_probability, o que dá a mesma distribuição de placares de
+    uma simulação ponto a ponto com bem menos sorteios.
+    """
+    p1_serve, p2_serve, best_of, n_sims, seed = task
+    rng = np.random.default_rng(seed)
+    one = np.array([p1_serve]), np.array([p2_serve])
+    hold1, hold2 = float(hold_probability(one[0])[0]), float(hold_probability(one[1])[0])
+    # Probabilidade de participant1 vencer o tie-break conforme quem saca primeiro
+    tiebreak_p1_first = float(tiebreak_probability(*one)[0])
+    tiebreak_p2_first = 1.0 - float(tiebreak_probability(one[1], one[0])[0])
+    sets_to_win = best_of // 2 + 1
+
+    # server == 0: participant1 saca o próximo game (sorteio no início)
+    server = rng.integers(0, 2, n_sims)
+    games1, games2 = np.zeros(n_sims, np.int64), np.zeros(n_sims, np.int64)
+    sets1, sets2 = np.zeros(n_sims, np.int64), np.zeros(n_sims, np.int64)
+    total1, total2 = np.zeros(n_sims, np.int64), np.zeros(n_sims, np.int64)
+    first_set1, first_set2 = np.zeros(n_sims, np.int64), np.zeros(n_sims, np.int64)
+    active = np.ones(n_sims, bool)
+    for _ in range(13 * best_of):
+        tiebreak = (games1 == 6) & (games2 == 6)
+        p1_game = np.where(server == 0, hold1, 1.0 - hold2)
+        p1_game = np.where(tiebreak, np.where(server == 0, tiebreak_p1_first, tiebreak_p2_first), p1_game)
+        p1_wins = rng.random(n_sims) < p1_game
+        games1 += p1_wins & active
+        games2 += ~p1_wins & active
+        total1 += p1_wins & active
+        total2 += ~p1_wins & active
+        # O tie-break conta como um game também na alternância do saque
+        server = np.where(active, 1 - server, server)
+
+        set_over = active & (((games1 >= 6) & (games1 - games2 >= 2)) | ((games2 >= 6) & (games2 - games1 >= 2))
+                             | (games1 == 7) | (games2 == 7))
+        first = set_over & (sets1 + sets2 == 0)
+        first_set1[first], first_set2[first] = games1[first], games2[first]
+        sets1 += set_over & (games1 > games2)
+        sets2 += set_over & (games2 > games1)
+        games1[set_over] = 0
+        games2[set_over] = 0
+        active &= (sets1 < sets_to_win) & (sets2 < sets_to_win)
+        if not active.any():
+            break
+
+    return {
+        "simulations": n_sims,
+        "match_wins": int((sets1 == sets_to_win).sum()),
+        "first_set_wins": int((first_set1 > first_set2).sum()),
+        "total_games": Counter((total1 + total2).tolist()),
+        "first_set_games": Counter((first_set1 + first_set2).tolist()),
+        "game_margin": Counter((total1 - total2).tolist()),
+        "set_scores": Counter((sets1 * 10 + sets2).tolist()),
+        "first_set_scores": Counter((first_set1 * 10 + first_set2).tolist()),
+    }
+
+
+def _distribution(counter, simulations, label=None):
+    series = pd.Series(counter, dtype=float).sort_index() / simulations
+    if label:
+        series.index = [label(value) for value in series.index]
+    return series
+
+
+def simulate_match(p1_serve, p2_serve, best_of=3, n_sims=SIMULATIONS, seed=None,
+                   workers=SIMULATION_WORKERS, chunk_size=SIMULATION_CHUNK_SIZE):
+    """
+    Monte Carlo de uma partida entre participant1 e participant2, dadas as
+    probabilidades de cada um ganhar um ponto no próprio saque.
+
+    Retorna as probabilidades de participant1 vencer a partida e o primeiro
+    set e as distribuições (pandas.Series de probabilidades) de total de
+    games, games do primeiro set, saldo de games de participant1, placar
+    em sets ("2-1") e placar do primeiro set ("7-6"). Com `seed` o
+    resultado é reproduzível; workers > 1 distribui os lotes em processos.
+    """
+    chunks = [chunk_size] * (n_sims // chunk_size) + ([n_sims % chunk_size] if n_sims % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(float(p1_serve), float(p2_serve), best_of, size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_simulate_chunk, tasks))
+    else:
+        parts = [_simulate_chunk(task) for task in tasks]
+
+    totals = {key: Counter() for key in GAME_MARKETS.values()}
+    totals.update(set_scores=Counter(), first_set_scores=Counter())
+    for part in parts:
+        for key, counter in totals.items():
+            counter.update(part[key])
+    score = lambda code: f"{code // 10}-{code % 10}"
+    return {
+        "simulations": n_sims,
+        "match_win": sum(part["match_wins"] for part in parts) / n_sims,
+        "first_set_win": sum(part["first_set_wins"] for part in parts) / n_sims,
+        "total_games": _distribution(totals["total_games"], n_sims),
+        "first_set_games": _distribution(totals["first_set_games"], n_sims),
+        "game_margin": _distribution(totals["game_margin"], n_sims),
+        "set_scores": _distribution(totals["set_scores"], n_sims, score),
+        "first_set_scores": _distribution(totals["first_set_scores"], n_sims, score),
+    }
+
+
+def line_probability(distribution, market, handicap, outcome):
+    """
+    Probabilidade de uma linha de games pela distribuição correspondente:
+    Over/Under no total, e no handicap o saldo de games de participant1
+    somado ao handicap (positivo cobre o '1', negativo cobre o '2')
+    """
+    values = distribution.index.to_numpy(float)
+    if market == "Game Handicap":
+        covered = values + handicap > 0 if outcome == "1" else values + handicap < 0
+    elif outcome == "Over":
+        covered = values > handicap
+    else:
+        covered = values < handicap
+    return float(distribution.to_numpy()[covered].sum())
+
+
+def price_game_lines(result, odds_lines):
+    """Probabilidade do modelo e EV de cada linha de GAME_MARKETS de um evento"""
+    rows = []
+    for line in odds_lines:
+        distribution = GAME_MARKETS.get(line.get("market"))
+        handicap = pd.to_numeric(line.get("handicap"), errors="coerce")
+        odds = pd.to_numeric(line.get("odds"), errors="coerce")
+        if distribution is None or pd.isna(handicap) or pd.isna(odds):
+            continue
+        model_prob = line_probability(result[distribution], line["market"], handicap, line.get("outcome"))
+        rows.append({**line, "model_prob": model_prob, "ev": model_prob * odds - 1.0})
+    return rows
+
+
+def simulate_events(events, players_table=None, surface=DEFAULT_SURFACE, model=None, **simulation_options):
+    """
+    Simula cada evento com estatísticas dos dois jogadores e precifica as
+    linhas de games dele. Retorna um DataFrame com uma linha por linha de odds.
+
+    `model(p1_serve, p2_serve, best_of)` substitui a simulação por outro
+    modelo com o mesmo formato de resultado (ex.: markov.match_distribution).
+    """
+    features = player_features(events, players_table)
+    serve_col, return_col = f"{surface}_service_points_won_pct", f"{surface}_return_points_won_pct"
+    if features.empty or serve_col not in features or return_col not in features:
+        return pd.DataFrame()
+    stats = features[[serve_col, return_col]].dropna() / 100.0
+    tables = normalize_odds(events)
+    lines_by_event = {}
+    for line in tables["odds_lines"]:
+        lines_by_event.setdefault(line["event_id"], []).append(line)
+
+    rows = []
+    for event in tables["events"]:
+        player1, player2 = event["participant1_player_id"], event["participant2_player_id"]
+        if player1 not in stats.index or player2 not in stats.index:
+            continue
+        p1_serve = serve_probabilities(stats.at[player1, serve_col], stats.at[player2, return_col])
+        p2_serve = serve_probabilities(stats.at[player2, serve_col], stats.at[player1, return_col])
+        best_of = 5 if re.search(BEST_OF_FIVE_PATTERN, event["tournament_name"] or "") else 3
+        if model is not None:
+            result = model(p1_serve, p2_serve, best_of)
+        else:
+            result = simulate_match(p1_serve, p2_serve, best_of, **simulation_options)
+        for row in price_game_lines(result, lines_by_event.get(event["event_id"], [])):
+            rows.append({"participant1": event["participant1"], "participant2": event["participant2"],
+                         "best_of": best_of, **row})
+    return pd.DataFrame(rows)
+
+
+def _load_json(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo de partidas e preço das linhas de games")
+    parser.add_argument("--odds", default=ODDS_PATH, help="JSON de eventos com odds (api/odds.py)")
+    parser.add_argument("--players-table", default=None, help="tabela de features dos eventos compactos")
+    parser.add_argument("--surface", default=DEFAULT_SURFACE)
+    parser.add_argument("--sims", type=int, default=SIMULATIONS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=SIMULATION_WORKERS)
+    parser.add_argument("--p1-serve", type=float, default=None,
+                        help="simula só uma partida com essas probabilidades de ponto no saque (0-1)")
+    parser.add_argument("--p2-serve", type=float, default=None)
+    parser.add_argument("--best-of", type=int, default=3, choices=(3, 5))
+    parser.add_argument("--output", default=None, help="grava as linhas precificadas neste CSV")
+    args = parser.parse_args()
+
+    options = {"n_sims": args.sims, "seed": args.seed, "workers": args.workers}
+    if args.p1_serve is not None and args.p2_serve is not None:
+        result = simulate_match(args.p1_serve, args.p2_serve, args.best_of, **options)
+        print(f"Vitória de participant1: {result['match_win']:.4f} (primeiro set: {result['first_set_win']:.4f})")
+        print(f"Total de games esperado: {(result['total_games'].index * result['total_games']).sum():.2f}")
+        print("Placar em sets:\n" + result["set_scores"].round(4).to_string())
+    else:
+        priced = simulate_events(_load_json(args.odds) or [], _load_json(args.players_table), args.surface, **options)
+        if args.output:
+            priced.to_csv(args.output, index=False)
+            print(f"{len(priced)} linhas precificadas salvas em {args.output}")
+        if priced.empty:
+            print("Nenhum evento com estatísticas dos dois jogadores.")
+        else:
+            columns = ["event_id", "market", "handicap", "outcome", "odds", "model_prob", "ev"]
+            print(priced[columns].to_string(index=False))
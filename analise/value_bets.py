@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.parquet_store import ODDS_PATH, normalize_odds
+from api.enrichment import PLAYERS_TABLE_FILENAME, player_feature_vector
+
+MARKETS = {"Winner": "match", "First Set Winner": "first_set"}
+# Superfície das estatísticas de saque/devolução usadas no modelo (o stats_clean
+# hoje só traz o saibro)
+DEFAULT_SURFACE = os.getenv("VALUE_BETS_SURFACE", "clay")
+# Percentual médio de pontos ganhos no saque no circuito (ajuste de Barnett-Clarke)
+TOUR_SERVE_POINTS_WON = float(os.getenv("TOUR_SERVE_POINTS_WON", 0.63))
+# EV mínimo (lucro esperado por unidade apostada) para marcar uma aposta de valor
+MIN_EV = float(os.getenv("VALUE_BETS_MIN_EV", 0.0))
+# Torneios em melhor de cinco sets (chaves masculinas dos Grand Slams)
+BEST_OF_FIVE_PATTERN = r"(?i)(?:australian open|french open|roland garros|wimbledon|us open).*\bmen\b"
+
+
+def serve_probabilities(serve_won, opponent_return_won, tour_serve_won=TOUR_SERVE_POINTS_WON):
+    """
+    Probabilidade de o sacador ganhar um ponto contra esse adversário: o seu
+    percentual no saque corrigido pelo quanto a devolução do adversário
+    está acima da média do circuito (percentuais em 0-1, arrays)
+    """
+    adjusted = serve_won - (opponent_return_won - (1.0 - tour_serve_won))
+    return np.clip(adjusted, 0.01, 0.99)
+
+
+def hold_probability(p):
+    """Probabilidade de confirmar o game de saque ganhando cada ponto com probabilidade p"""
+    q = 1.0 - p
+    deuce = p ** 2 / (p ** 2 + q ** 2)
+    return p ** 4 * (1 + 4 * q + 10 * q ** 2) + 20 * p ** 3 * q ** 3 * deuce
+
+
+def tiebreak_probability(p_a, p_b):
+    """
+    Probabilidade de A vencer o tie-break sacando o primeiro ponto, com A
+    ganhando p_a dos pontos no próprio saque e B ganhando p_b no dele.
+    O laço percorre os placares (fixos), não os jogos: cada estado é um
+    array com um valor por jogo.
+    """
+    states = {(0, 0): np.ones_like(p_a)}
+    win = np.zeros_like(p_a)
+    for total in range(12):
+        # Saque: A no ponto 0, depois dois pontos para cada um alternadamente
+        a_serves = ((total + 1) // 2) % 2 == 0
+        point_a = p_a if a_serves else 1.0 - p_b
+        for a in range(max(0, total - 6), min(total, 6) + 1):
+            prob = states.pop((a, total - a), None)
+            if prob is None:
+                continue
+            for next_state, move in (((a + 1, total - a), point_a), ((a, total - a + 1), 1.0 - point_a)):
+                if next_state[0] == 7:
+                    win = win + prob * move
+                elif next_state[1] < 7:
+                    states[next_state] = states.get(next_state, 0.0) + prob * move
+    # De 6-6 em diante cada par de pontos tem um saque de cada (A e depois B)
+    both = p_a * (1.0 - p_b)
+    split = p_a * p_b + (1.0 - p_a) * (1.0 - p_b)
+    return win + states.get((6, 6), 0.0) * both / (1.0 - split)
+
+
+def set_probability(p_a, p_b):
+    """Probabilidade de A vencer o set sacando o primeiro game (tie-break em 6-6)"""
+    hold_a, hold_b = hold_probability(p_a), hold_probability(p_b)
+    states = {(0, 0): np.ones_like(p_a)}
+    win = np.zeros_like(p_a)
+    for total in range(12):
+        game_a = hold_a if total % 2 == 0 else 1.0 - hold_b
+        for a in range(max(0, total - 6), min(total, 6) + 1):
+            b = total - a
+            prob = states.pop((a, b), None)
+            if prob is None:
+                continue
+            for (na, nb), move in (((a + 1, b), game_a), ((a, b + 1), 1.0 - game_a)):
+                if na >= 6 and na - nb >= 2:
+                    win = win + prob * move
+                elif not (nb >= 6 and nb - na >= 2):
+                    states[(na, nb)] = states.get((na, nb), 0.0) + prob * move
+    return win + states.get((6, 6), 0.0) * tiebreak_probability(p_a, p_b)
+
+
+def match_probability(set_a, best_of):
+    """Probabilidade de vencer a partida em melhor de 3 ou 5 sets, com sets independentes"""
+    set_b = 1.0 - set_a
+    best_of_three = set_a ** 2 * (1 + 2 * set_b)
+    best_of_five = set_a ** 3 * (1 + 3 * set_b + 6 * set_b ** 2)
+    return np.where(best_of == 5, best_of_five, best_of_three)
+
+
+def model_probabilities(p1_serve, p2_serve, best_of):
+    """
+    Probabilidades de participant1 vencer o primeiro set e a partida. Quem
+    saca primeiro não é conhecido antes do sorteio: usa a média dos dois casos.
+    """
+    first_set = (set_probability(p1_serve, p2_serve) + 1.0 - set_probability(p2_serve, p1_serve)) / 2
+    return first_set, match_probability(first_set, best_of)
+
+
+def player_features(events, players_table=None):
+    """
+    Features por player_id: da tabela de jogadores (modo compacto) ou das
+    estatísticas embutidas nos participantes dos eventos
+    """
+    if players_table is None:
+        players_table = {}
+        for event in events:
+            for participant_key in ("participant1", "participant2"):
+                stats = (event.get(participant_key) or {}).get("stats")
+                player_id = stats.get("player_id") if isinstance(stats, dict) else None
+                if player_id is not None and player_id not in players_table:
+                    players_table[player_id] = player_feature_vector(stats)
+    if not players_table:
+        return pd.DataFrame()
+    return pd.DataFrame.from_records(list(players_table.values())).set_index("player_id")
+
+
+def scan_value_bets(events, players_table=None, surface=DEFAULT_SURFACE, min_ev=MIN_EV):
+    """
+    Precifica todas as linhas "Winner" e "First Set Winner" dos eventos de
+    uma vez e retorna um DataFrame com, por linha: probabilidade implícita,
+    margem da casa (overround), probabilidade justa (implícita sem a margem),
+    probabilidade do modelo, EV e se é aposta de valor (EV > min_ev).
+
+    Eventos sem estatísticas de algum dos jogadores ficam com o modelo em
+    NaN e nunca são marcados.
+    """
+    tables = normalize_odds(events)
+    lines = pd.DataFrame(tables["odds_lines"])
+    if lines.empty:
+        return lines
+    lines = lines[lines["market"].isin(list(MARKETS)) & lines["outcome"].isin(["1", "2"])]
+    lines = lines.assign(odds=pd.to_numeric(lines["odds"], errors="coerce"))
+    lines = lines[lines["odds"] > 1.0]
+
+    priced = pd.DataFrame(tables["events"]).drop_duplicates("event_id")
+    features = player_features(events, players_table)
+    serve_col, return_col = f"{surface}_service_points_won_pct", f"{surface}_return_points_won_pct"
+    for side in ("participant1", "participant2"):
+        for column, name in ((serve_col, "serve_won"), (return_col, "return_won")):
+            values = features[column] / 100.0 if column in features else pd.Series(dtype=float)
+            priced[f"{side}_{name}"] = priced[f"{side}_player_id"].map(values)
+    p1_serve = serve_probabilities(priced["participant1_serve_won"].to_numpy(float),
+                                   priced["participant2_return_won"].to_numpy(float))
+    p2_serve = serve_probabilities(priced["participant2_serve_won"].to_numpy(float),
+                                   priced["participant1_return_won"].to_numpy(float))
+    best_of = np.where(priced["tournament_name"].fillna("").str.contains(BEST_OF_FIVE_PATTERN), 5, 3)
+    first_set, match = model_probabilities(p1_serve, p2_serve, best_of)
+    priced = priced.assign(best_of=best_of, model_first_set=first_set, model_match=match)
+
+    lines = lines.merge(priced[["event_id", "participant1", "participant2", "best_of",
+                                "model_first_set", "model_match"]], on="event_id", how="left")
+    lines["implied_prob"] = 1.0 / lines["odds"]
+    lines["overround"] = lines.groupby(["event_id", "market"])["implied_prob"].transform("sum")
+    lines["fair_prob"] = lines["implied_prob"] / lines["overround"]
+    participant1_prob = np.where(lines["market"].map(MARKETS) == "match",
+                                 lines["model_match"], lines["model_first_set"])
+    is_participant1 = lines["outcome"] == "1"
+    lines["selection"] = lines["participant1"].where(is_participant1, lines["participant2"])
+    lines["model_prob"] = np.where(is_participant1, participant1_prob, 1.0 - participant1_prob)
+    lines["ev"] = lines["model_prob"] * lines["odds"] - 1.0
+    lines["edge"] = lines["model_prob"] - lines["fair_prob"]
+    lines["value_bet"] = lines["ev"] > min_ev
+    return lines.drop(columns=["model_first_set", "model_match"]).reset_index(drop=True)
+
+
+def _load_json(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Procura apostas de valor nos mercados Winner e First Set Winner")
+    parser.add_argument("--odds", default=ODDS_PATH, help="JSON de eventos com odds (api/odds.py)")
+    parser.add_argument("--players-table", default=None,
+                        help=f"tabela de features dos eventos compactos (ex.: {PLAYERS_TABLE_FILENAME})")
+    parser.add_argument("--surface", default=DEFAULT_SURFACE)
+    parser.add_argument("--min-ev", type=float, default=MIN_EV)
+    parser.add_argument("--output", default=None, help="grava todas as linhas precificadas neste CSV")
+    args = parser.parse_args()
+
+    events = _load_json(args.odds) or []
+    priced = scan_value_bets(events, _load_json(args.players_table), args.surface, args.min_ev)
+    if args.output:
+        priced.to_csv(args.output, index=False)
+        print(f"{len(priced)} linhas precificadas salvas em {args.output}")
+    value_bets = priced[priced["value_bet"]] if not priced.empty else priced
+    print(f"✅ {len(value_bets)} apostas de valor em {priced['event_id'].nunique() if not priced.empty else 0} eventos")
+    if not value_bets.empty:
+        columns = ["event_id", "market", "selection", "odds", "fair_prob", "model_prob", "ev"]
+        print(value_bets.sort_values("ev", ascending=False)[columns].to_string(index=False))
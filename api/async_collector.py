@@ -0,0 +1,54 @@
+import asyncio
+
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_CONSECUTIVE_FAILURES = 5
+
+
+async def collect_players_async(player_ids, fetch_surface_summary, fetch_past_matches,
+                                max_concurrency=DEFAULT_MAX_CONCURRENCY, rate_limiter=None):
+    """
+    Busca surface summary e past matches de vários jogadores em paralelo.
+
+    Os dois endpoints de cada jogador são disparados ao mesmo tempo e no
+    máximo `max_concurrency` requisições ficam em andamento. O espaçamento
+    entre requisições é feito pelo token bucket do host em api/http_client.py
+    no lugar dos sleeps fixos da coleta sequencial; `rate_limiter` permite
+    somar um limite próprio a este lote.
+
+    Retorna um dicionário player_id -> (surface_summary, past_matches).
+    Se MAX_CONSECUTIVE_FAILURES jogadores seguidos falharem nos dois
+    endpoints, a coleta é interrompida e os jogadores restantes ficam de fora.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    abort = asyncio.Event()
+    consecutive_failures = 0
+    results = {}
+
+    async def fetch(fetch_func, player_id):
+        async with semaphore:
+            if abort.is_set():
+                return None
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async()
+            return await asyncio.to_thread(fetch_func, player_id)
+
+    async def collect_player(player_id):
+        nonlocal consecutive_failures
+        surface_summary, past_matches = await asyncio.gather(
+            fetch(fetch_surface_summary, player_id),
+            fetch(fetch_past_matches, player_id),
+        )
+        if abort.is_set():
+            return
+        if surface_summary is None and past_matches is None:
+            consecutive_failures += 1
+            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                print(f"\n🛑 ERRO: {MAX_CONSECUTIVE_FAILURES} falhas consecutivas detectadas!")
+                print(f"Parando execução - possível problema no código ou API")
+                abort.set()
+        else:
+            consecutive_failures = 0
+        results[player_id] = (surface_summary, past_matches)
+
+    await asyncio.gather(*(collect_player(player_id) for player_id in player_ids))
+    return results
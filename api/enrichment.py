@@ -0,0 +1,82 @@
+from collections import Counter
+
+FORM_WINDOW = 10
+PLAYERS_TABLE_FILENAME = "dados/clean/collected_tennis_players_features.json"
+
+# Campos do stats_clean -> nome da feature (percentuais, por superfície)
+SERVICE_FEATURES = {
+    "FirstServePercentage": "first_serve_pct",
+    "FirstServePointsWonPercentage": "first_serve_points_won_pct",
+    "SecondServePointsWonPercentage": "second_serve_points_won_pct",
+    "ServicePointsWonPercentage": "service_points_won_pct",
+    "ServiceGamesWonPercentage": "service_games_won_pct",
+    "BreakPointsSavedPercentage": "break_points_saved_pct",
+}
+RETURN_FEATURES = {
+    "FirstServeReturnPointsWonPercentage": "first_serve_return_points_won_pct",
+    "SecondServeReturnPointsWonPercentage": "second_serve_return_points_won_pct",
+    "ReturnPointsWonPercentage": "return_points_won_pct",
+    "ReturnGamesWonPercentage": "return_games_won_pct",
+    "BreakPointsConvertedPercentage": "break_points_converted_pct",
+}
+
+
+def _own_tennis_api_id(matches):
+    """ID da tennis-api do dono da lista: o único que aparece em todos os jogos"""
+    counts = Counter()
+    for match in matches:
+        counts[match.get('player1Id')] += 1
+        counts[match.get('player2Id')] += 1
+    counts.pop(None, None)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def recent_form(past_matches, window=FORM_WINDOW):
+    """Vitórias e derrotas nos últimos `window` jogos de uma resposta de past-matches"""
+    matches = past_matches.get('data') if isinstance(past_matches, dict) else None
+    matches = [m for m in matches or [] if isinstance(m, dict)]
+    own_id = _own_tennis_api_id(matches)
+    recent = sorted(matches, key=lambda m: m.get('date') or "", reverse=True)[:window]
+    wins = sum(1 for m in recent if own_id is not None and m.get('match_winner') == own_id)
+    return {
+        "form_matches": len(recent),
+        "form_wins": wins,
+        "form_losses": len(recent) - wins,
+        "last_match_date": recent[0].get('date') if recent else None,
+    }
+
+
+def player_feature_vector(player_data, form_window=FORM_WINDOW):
+    """
+    Vetor de features compacto (dict plano) de uma entrada do stats_clean:
+    percentuais de saque/devolução por superfície ('clay_service_games_won_pct',
+    ...) e a forma recente, no lugar do blob completo com past_matches.
+    """
+    features = {"player_id": player_data.get('player_id'), "name": player_data.get('name')}
+    for key, value in player_data.items():
+        if not isinstance(value, dict):
+            continue
+        for prefix, mapping in (("ServiceRecordStats", SERVICE_FEATURES), ("ReturnRecordStats", RETURN_FEATURES)):
+            if key.startswith(prefix):
+                surface = key[len(prefix):].lower()
+                for field, feature in mapping.items():
+                    if field in value:
+                        features[f"{surface}_{feature}"] = value[field]
+    features.update(recent_form(player_data.get('past_matches'), form_window))
+    return features
+
+
+def build_players_table(player_stats_map, player_ids, form_window=FORM_WINDOW):
+    """Tabela {player_id: features}, calculada uma vez por jogador referenciado nos eventos"""
+    return {player_id: player_feature_vector(player_stats_map[player_id], form_window)
+            for player_id in sorted(set(player_ids), key=str)
+            if player_id in player_stats_map}
+
+
+def referenced_player_ids(events):
+    """IDs de jogador referenciados pelos participantes de eventos compactos"""
+    for event in events:
+        for participant_key in ("participant1", "participant2"):
+            player_id = (event.get(participant_key) or {}).get("player_id")
+            if player_id is not None:
+                yield player_id
@@ -0,0 +1,128 @@
+import argparse
+import bisect
+import os
+import sys
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.past_matches_sync import PastMatchesStore, SYNC_DIR, extract_matches
+from api.raw_dump import RawDump
+
+H2H_INDEX_PATH = os.getenv("H2H_INDEX_PATH", "dados/clean/h2h_index.json")
+RAW_PATHS = ['dados/raw/stats2_raw.json', 'dados/raw/stats3_raw.json']
+RECENT_MEETINGS = 5
+
+
+def pair_key(player_a, player_b):
+    """Chave do confronto, igual para (a, b) e (b, a): IDs da tennis-api ordenados"""
+    a, b = sorted((int(player_a), int(player_b)))
+    return f"{a}-{b}"
+
+
+def _meeting(match):
+    return {
+        'id': str(match['id']),
+        'date': match.get('date') or "",
+        'tournament_id': match.get('tournamentId'),
+        'winner_id': match.get('match_winner'),
+        'result': match.get('result'),
+    }
+
+
+class H2HIndex:
+    """
+    Índice de confrontos diretos por par de jogadores (sem ordem).
+
+    Cada par guarda seus jogos em ordem de data e a contagem de vitórias
+    por jogador. Um jogo aparece na lista de past-matches dos dois
+    jogadores; o conjunto de IDs já indexados garante que ele conta uma
+    vez só, inclusive entre execuções (o índice é persistido em JSON).
+    """
+
+    def __init__(self, path=H2H_INDEX_PATH):
+        self.path = path
+        self.pairs = {}
+        self.match_ids = set()
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.pairs = json_backend.load(f)['pairs']
+            for pair in self.pairs.values():
+                self.match_ids.update(meeting['id'] for meeting in pair['meetings'])
+
+    def add_matches(self, matches):
+        """Indexa os jogos ainda não vistos e retorna quantos eram novos"""
+        added = 0
+        for match in matches:
+            match_id = str(match.get('id'))
+            player1_id, player2_id = match.get('player1Id'), match.get('player2Id')
+            if match_id in self.match_ids or player1_id is None or player2_id is None:
+                continue
+            self.match_ids.add(match_id)
+            pair = self.pairs.setdefault(pair_key(player1_id, player2_id), {'wins': {}, 'meetings': []})
+            meeting = _meeting(match)
+            dates = [m['date'] for m in pair['meetings']]
+            pair['meetings'].insert(bisect.bisect_right(dates, meeting['date']), meeting)
+            if meeting['winner_id'] is not None:
+                winner = str(meeting['winner_id'])
+                pair['wins'][winner] = pair['wins'].get(winner, 0) + 1
+            added += 1
+        if added:
+            self.dirty = True
+        return added
+
+    def lookup(self, player1_id, player2_id, recent=RECENT_MEETINGS):
+        """
+        Confronto direto do ponto de vista de player1: vitórias de cada um,
+        total e os `recent` jogos mais recentes (do mais novo ao mais antigo)
+        """
+        pair = self.pairs.get(pair_key(player1_id, player2_id)) or {'wins': {}, 'meetings': []}
+        return {
+            'player1_wins': pair['wins'].get(str(player1_id), 0),
+            'player2_wins': pair['wins'].get(str(player2_id), 0),
+            'total': len(pair['meetings']),
+            'recent_meetings': pair['meetings'][-recent:][::-1] if recent > 0 else [],
+        }
+
+    def save(self):
+        """Grava o índice se algo mudou desde a leitura"""
+        if not self.dirty:
+            return False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        json_backend.write_atomic(self.path, {'pairs': self.pairs})
+        self.dirty = False
+        return True
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def update_from_sources(index, raw_paths=RAW_PATHS, store_dir=SYNC_DIR):
+    """Indexa os past_matches dos dumps brutos e do store incremental; retorna quantos jogos eram novos"""
+    added = 0
+    for path in raw_paths:
+        if not os.path.exists(path):
+            continue
+        with RawDump(path) as dump:
+            for _, player_data in dump.iter_players('past_matches'):
+                added += index.add_matches(extract_matches(player_data.get('past_matches')))
+    if store_dir and os.path.isdir(store_dir):
+        store = PastMatchesStore(store_dir)
+        for player_id in store.manifest:
+            added += index.add_matches(store.load(player_id))
+    return added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualiza o índice de confrontos diretos a partir dos past_matches")
+    parser.add_argument("--raw", nargs="*", default=RAW_PATHS, help="dumps com past_matches (stats2/stats3)")
+    args = parser.parse_args()
+
+    h2h_index = H2HIndex()
+    added = update_from_sources(h2h_index, args.raw)
+    h2h_index.save()
+    print(f"✅ {added} jogos novos indexados; {len(h2h_index)} confrontos em {h2h_index.path}")
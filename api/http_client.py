@@ -0,0 +1,239 @@
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+from api.quota import QuotaExceeded, get_quota, priority_for_url
+from api.rate_limit import TokenBucket
+from api.response_cache import build_cached_response, cache_key, get_cache, ttl_for_url
+
+# Carregue as variáveis de ambiente do arquivo .env
+load_dotenv()
+
+TENNIS_API_HOST = "tennis-api-atp-wta-itf.p.rapidapi.com"
+ULTIMATE_TENNIS_HOST = "ultimate-tennis1.p.rapidapi.com"
+ODDS_API_HOST = os.getenv("RAPIDAPI_HOST")
+
+DEFAULT_TIMEOUT = 30
+POOL_MAXSIZE = 16
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Limite de requisições por host: requisições por segundo e rajada máxima.
+# Hosts fora da tabela não são limitados.
+HOST_RATE_LIMITS = {
+    TENNIS_API_HOST: {"rate": 5, "burst": 5},
+    ULTIMATE_TENNIS_HOST: {"rate": 2, "burst": 1},
+}
+if ODDS_API_HOST:
+    HOST_RATE_LIMITS[ODDS_API_HOST] = {"rate": 2, "burst": 1}
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _load_rate_limits_from_env():
+    """
+    Lê limites extras de RAPIDAPI_RATE_LIMITS no formato
+    "host=req_por_segundo/rajada;host2=req_por_segundo" (a rajada é opcional)
+    """
+    raw = os.getenv("RAPIDAPI_RATE_LIMITS", "")
+    for item in raw.split(";"):
+        if "=" not in item:
+            continue
+        host, limit = item.split("=", 1)
+        rate, _, burst = limit.partition("/")
+        try:
+            HOST_RATE_LIMITS[host.strip()] = {"rate": float(rate), "burst": int(burst or 1)}
+        except ValueError:
+            print(f"Aviso: limite inválido em RAPIDAPI_RATE_LIMITS: '{item}'")
+
+
+_load_rate_limits_from_env()
+
+
+def rapidapi_headers(api_key, host):
+    """Monta os headers padrão da RapidAPI"""
+    return {
+        "x-rapidapi-key": api_key,
+        "x-rapidapi-host": host
+    }
+
+
+def get_session():
+    """
+    Retorna a sessão HTTP compartilhada, criando-a na primeira chamada.
+
+    A sessão mantém um pool de conexões keep-alive por host e refaz
+    automaticamente requisições GET que voltam com 429/5xx, com backoff
+    exponencial e respeitando o header Retry-After.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=RETRY_TOTAL,
+                    backoff_factor=RETRY_BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=len(HOST_RATE_LIMITS) + 1,
+                                      pool_maxsize=POOL_MAXSIZE,
+                                      max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def set_rate_limit(host, rate, burst=1):
+    """Altera (ou remove, com rate=None) o limite de requisições de um host"""
+    with _rate_limiters_lock:
+        if rate is None:
+            HOST_RATE_LIMITS.pop(host, None)
+        else:
+            HOST_RATE_LIMITS[host] = {"rate": rate, "burst": burst}
+        _rate_limiters.pop(host, None)
+
+
+def get_rate_limiter(host):
+    """Retorna o token bucket do host, ou None se o host não tem limite configurado"""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None and host in HOST_RATE_LIMITS:
+            settings = HOST_RATE_LIMITS[host]
+            limiter = TokenBucket(settings["rate"], burst=settings.get("burst", 1))
+            _rate_limiters[host] = limiter
+        return limiter
+
+
+def get(url, headers=None, params=None, timeout=DEFAULT_TIMEOUT, use_cache=True, ttl=None, priority=None):
+    """
+    Faz um GET pela sessão compartilhada, respeitando o limite do host.
+
+    O host usado para o rate limit é o x-rapidapi-host dos headers (ou o
+    host da URL). Retorna o requests.Response; tratar status e JSON continua
+    sendo responsabilidade de quem chama, como antes com requests.get.
+
+    Endpoints com TTL em api/response_cache.py passam pelo cache em disco:
+    respostas ainda válidas voltam sem tocar a API, e as expiradas são
+    revalidadas com If-None-Match/If-Modified-Since. `ttl` substitui o TTL
+    padrão do endpoint e use_cache=False ignora o cache.
+
+    Toda requisição enviada é contada na cota de api/quota.py. `priority`
+    (padrão: a do endpoint) ordena a fila do host e decide quem ainda passa
+    perto do limite; uma requisição barrada recebe a resposta antiga do
+    cache, se houver, ou QuotaExceeded (um RequestException). Chamadas
+    iguais simultâneas fazem uma só requisição.
+    """
+    quota = get_quota()
+    priority = priority_for_url(url) if priority is None else priority
+    if quota is None:
+        return _get(url, headers, params, timeout, use_cache, ttl, priority)
+    host = _host(url, headers)
+    return quota.shared((host, cache_key(url, params), use_cache),
+                        lambda: _get(url, headers, params, timeout, use_cache, ttl, priority))
+
+
+def _get(url, headers, params, timeout, use_cache, ttl, priority):
+    cache = get_cache() if use_cache else None
+    ttl = ttl if ttl is not None else ttl_for_url(url)
+    if cache is None or not ttl:
+        return _send(url, headers, params, timeout, priority)
+
+    key = cache_key(url, params)
+    entry = cache.lookup(key)
+    if entry is not None and entry["fresh"]:
+        cache.hits += 1
+        cache.touch(key)
+        return build_cached_response(entry)
+
+    cache.misses += 1
+    conditional_headers = dict(headers or {})
+    if entry is not None:
+        if entry["etag"]:
+            conditional_headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            conditional_headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = _send(url, conditional_headers, params, timeout, priority)
+    except QuotaExceeded:
+        if entry is None:
+            raise
+        # Perto do limite da cota, a resposta antiga vale mais que nenhuma
+        get_quota().served_stale += 1
+        response = build_cached_response(entry)
+        response.stale = True
+        return response
+    if response.status_code == 304 and entry is not None:
+        cache.revalidated += 1
+        cache.touch(key, ttl)
+        response = build_cached_response(entry)
+        response.revalidated = True
+        return response
+    if response.status_code == 200:
+        cache.store(key, url, response, ttl)
+    return response
+
+
+def reached_network(response):
+    """
+    True se a resposta de get() veio da API (inclusive revalidações 304),
+    False se veio só do cache (fresca, ou antiga com a cota esgotada)
+    """
+    return not getattr(response, "from_cache", False) or getattr(response, "revalidated", False)
+
+
+def _host(url, headers):
+    return (headers or {}).get("x-rapidapi-host") or urlsplit(url).netloc
+
+
+def _send(url, headers, params, timeout, priority):
+    host = _host(url, headers)
+    limiter = get_rate_limiter(host)
+    quota = get_quota()
+    if quota is None:
+        if limiter is not None:
+            limiter.acquire()
+        return get_session().get(url, headers=headers, params=params, timeout=timeout)
+
+    api_key = (headers or {}).get("x-rapidapi-key")
+    # A fila por prioridade decide quem espera o token bucket primeiro; a
+    # cota é checada na vez da requisição, com o uso das que saíram antes
+    with quota.gate(host).slot(priority):
+        if not quota.allows(api_key, host, priority):
+            quota.rejected += 1
+            raise QuotaExceeded(f"Cota da API esgotada para {host} (prioridade {priority}): {url}")
+        if limiter is not None:
+            limiter.acquire()
+        quota.record(api_key, host)
+    response = get_session().get(url, headers=headers, params=params, timeout=timeout)
+    quota.observe(api_key, host, response.headers)
+    return response
+
+
+def cache_summary():
+    """Resumo de hits/misses do cache HTTP nesta execução (ou None se desabilitado)"""
+    cache = get_cache()
+    return cache.summary() if cache is not None else None
+
+
+def quota_summary():
+    """Resumo da cota da RapidAPI: requisições desta execução e uso do mês (ou None se desabilitada)"""
+    quota = get_quota()
+    if quota is None:
+        return None
+    quota.flush()
+    return quota.summary()
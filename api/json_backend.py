@@ -0,0 +1,80 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele tudo passa pelo json da biblioteca padrão
+    orjson = None
+
+# JSON_BACKEND=stdlib força o json da biblioteca padrão (para comparar ou depurar)
+BACKEND = "orjson" if orjson is not None and os.getenv("JSON_BACKEND", "orjson").lower() != "stdlib" else "stdlib"
+
+# Erro de decodificação dos dois backends (o do orjson é subclasse deste)
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj):
+    """Objetos com to_json() (ex.: OddsLines) são gravados no formato que esse método devolve"""
+    to_json = getattr(obj, "to_json", None)
+    if to_json is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_json()
+
+
+def loads(data):
+    """Decodifica JSON de str ou bytes (inclusive trechos de mmap)"""
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False):
+    """
+    JSON em texto, no mesmo formato do json.dumps com ensure_ascii=False:
+    compacto (separadores sem espaço) ou, com indent=True, indentado com 2
+    espaços. O orjson escreve o mesmo texto nos dados do projeto; o que ele
+    não serializa (inteiros acima de 64 bits, tipos não nativos) vai para o
+    json da biblioteca padrão. Objetos com to_json() são gravados como o
+    valor que ele devolve.
+    """
+    if BACKEND == "orjson":
+        try:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def load(f):
+    """Decodifica o conteúdo de um arquivo aberto (texto ou binário)"""
+    return loads(f.read())
+
+
+def dump(obj, f, indent=False):
+    """Grava obj num arquivo aberto em modo texto (ver dumps)"""
+    f.write(dumps(obj, indent=indent))
+
+
+def write_atomic(path, obj, indent=False):
+    """Grava o JSON num arquivo temporário e troca de uma vez, para não deixar arquivo pela metade"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        dump(obj, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def response_json(response):
+    """
+    Corpo JSON de uma resposta do requests. O orjson decodifica os bytes
+    direto; se o corpo não é UTF-8 válido, response.json() detecta a
+    codificação (e levanta o mesmo erro de antes se não for JSON).
+    """
+    if BACKEND == "orjson":
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
@@ -0,0 +1,150 @@
+import json
+import os
+
+from api import json_backend
+
+DEFAULT_FSYNC_EVERY = 10
+
+
+def _indent(text, spaces):
+    """Recuo extra nas linhas de um JSON já formatado, para aninhá-lo em outro"""
+    return text.replace("\n", "\n" + " " * spaces)
+
+
+def repair_ndjson(path):
+    """
+    Remove uma última linha incompleta (coleta interrompida no meio de uma
+    escrita), para que novos registros sejam anexados a partir de um ponto válido.
+    Retorna quantos bytes foram descartados.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        # Volta até o último '\n' completo
+        position = size - 1
+        chunk_size = 4096
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        f.truncate(position)
+        return size - position
+
+
+class NDJSONWriter:
+    """
+    Escreve um registro JSON por linha assim que ele fica pronto.
+
+    A cada `fsync_every` registros o arquivo é descarregado no disco
+    (flush + fsync), então uma queda perde no máximo os registros desde o
+    último checkpoint. O arquivo é aberto em modo append: uma coleta
+    retomada continua do último registro completo.
+    """
+
+    def __init__(self, path, fsync_every=DEFAULT_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.records_written = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        repair_ndjson(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json_backend.dumps(record) + "\n")
+        self.records_written += 1
+        if self.records_written % self.fsync_every == 0:
+            self.checkpoint()
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_ndjson(path):
+    """Lê os registros de um arquivo NDJSON, ignorando uma última linha incompleta"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            line = line.strip()
+            if line:
+                yield json_backend.loads(line)
+
+
+def completed_keys(path, key):
+    """Valores do campo `key` já gravados, para pular esses itens ao retomar"""
+    return {str(record[key]) for record in read_ndjson(path) if key in record}
+
+
+def write_json_array_from_ndjson(ndjson_path, output_path):
+    """
+    Gera o JSON de lista (mesmo formato de json.dump(lista, indent=2)) a
+    partir do NDJSON, um registro por vez, sem carregar tudo em memória.
+    Retorna quantos registros foram escritos.
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for record in read_ndjson(ndjson_path):
+            out.write("[\n  " if count == 0 else ",\n  ")
+            out.write(_indent(json_backend.dumps(record, indent=True), 2))
+            count += 1
+        out.write("\n]" if count else "[]")
+    return count
+
+
+def write_json_from_ndjson(ndjson_path, output_path, key_field="key", value_field="data",
+                           header=None, container_key=None):
+    """
+    Gera o JSON de dicionário (formato de json.dump(dict, indent=2)) a partir
+    de registros {key_field: chave, value_field: valor} do NDJSON.
+
+    Com container_key, os registros ficam dentro dessa chave e `header`
+    traz as demais chaves de nível superior (ex.: 'tournament_info' do
+    stats3_raw.json). Retorna quantos registros foram escritos.
+    """
+    level = 4 if container_key else 2
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        if container_key:
+            out.write("{\n")
+            for name, value in (header or {}).items():
+                out.write(f"  {json.dumps(name)}: {_indent(json_backend.dumps(value, indent=True), 2)},\n")
+            out.write(f"  {json.dumps(container_key)}: ")
+        for record in read_ndjson(ndjson_path):
+            out.write("{\n" if count == 0 else ",\n")
+            key = json.dumps(str(record[key_field]), ensure_ascii=False)
+            value = _indent(json_backend.dumps(record[value_field], indent=True), level)
+            out.write(f"{' ' * level}{key}: {value}")
+            count += 1
+        closing_indent = " " * (level - 2)
+        out.write(f"\n{closing_indent}}}" if count else "{}")
+        if container_key:
+            out.write("\n}")
+    return count
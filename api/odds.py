@@ -1,76 +1,94 @@
 # odds.py
 import requests
-import time
 import json
 import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_client, json_backend
+from api.http_client import rapidapi_headers
+from api.ndjson_stream import NDJSONWriter, completed_keys, read_ndjson, write_json_array_from_ndjson
+from api.enrichment import PLAYERS_TABLE_FILENAME, build_players_table, referenced_player_ids
+from api.player_ids import PlayerIdMap
+from api.h2h_index import H2H_INDEX_PATH, H2HIndex
+from api.odds_history import HISTORY_ENABLED, OddsHistory
+from api.odds_lines import OddsLines
+from api.player_names import normalize_name
+from api.quota import odds_priority
+from api.schemas import Event, EventOdds, OddsTournament, SchemaError, valid_items
+
 # Carregue as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 # --- Credenciais para API de Odds ---
 ODDS_RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
 ODDS_RAPIDAPI_HOST = os.getenv("RAPIDAPI_HOST")
+ODDS_API_BASE_URL = os.getenv("ODDS_API_BASE_URL")
+ODDS_PIPELINE_WORKERS = int(os.getenv("ODDS_PIPELINE_WORKERS", 4))
+# Buscas de odds em andamento (ou com resposta ainda não gravada) por worker no modo headless
+ODDS_PIPELINE_IN_FLIGHT = int(os.getenv("ODDS_PIPELINE_IN_FLIGHT", 4))
+OUTPUT_FILENAME = "dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json"
+DEFAULT_STREAM_PATH = "dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.ndjson"
 
 # Headers base para a API de Odds
 if ODDS_RAPIDAPI_KEY and ODDS_RAPIDAPI_HOST:
-    BASE_HEADERS_ODDS = {
-        "x-rapidapi-key": ODDS_RAPIDAPI_KEY,
-        "x-rapidapi-host": ODDS_RAPIDAPI_HOST
-    }
+    BASE_HEADERS_ODDS = rapidapi_headers(ODDS_RAPIDAPI_KEY, ODDS_RAPIDAPI_HOST)
 else:
     BASE_HEADERS_ODDS = None
 
 # --- Função para carregar dados de stats_clean.json ---
 def load_player_stats_from_clean():
-    """Carrega estatísticas dos jogadores do arquivo stats_clean.json"""
+    """
+    Carrega estatísticas dos jogadores do arquivo stats_clean.json.
+    Retorna (estatísticas por player_id, PlayerIdMap, requisições); a tabela
+    de IDs (api/player_ids.py) resolve os participantes das odds.
+    """
     try:
         with open('dados/clean/stats_clean.json', 'r', encoding='utf-8') as f:
-            stats_clean = json.load(f)
+            stats_clean = json_backend.load(f)
         
-        # Criar mapeamento nome normalizado -> dados do jogador
+        # Estatísticas por ID do jogador; jogadores novos entram na tabela de IDs
         player_stats_map = {}
+        player_id_map = PlayerIdMap()
         for player_name, player_data in stats_clean.items():
-            normalized_name = normalize_player_name(player_name)
-            player_stats_map[normalized_name] = player_data
+            player_id = player_data.get('player_id') or player_name
+            player_stats_map[player_id] = player_data
+            if player_id_map.find('atp_id', player_id) is None:
+                player_id_map.link(player_name, atp_id=player_id)
         
         print(f"Estatísticas de {len(player_stats_map)} jogadores carregadas de stats_clean.json")
-        return player_stats_map, 0  # 0 requisições pois é arquivo local
+        return player_stats_map, player_id_map, 0  # 0 requisições pois é arquivo local
     
     except FileNotFoundError:
         print("Erro: Arquivo stats_clean.json não encontrado.")
-        return {}, 0
+        return {}, PlayerIdMap(), 0
     except json.JSONDecodeError as e:
         print(f"Erro ao decodificar stats_clean.json: {e}")
-        return {}, 0
-
-def normalize_player_name(name):
-    """Normaliza nome do jogador para matching, lidando com formato 'Sobrenome, Nome'"""
-    if not name or name == "N/A":
-        return ""
-    
-    # Se o nome está no formato "Sobrenome, Nome", inverter para "Nome Sobrenome"
-    if ',' in name:
-        parts = name.split(',')
-        if len(parts) == 2:
-            surname = parts[0].strip()
-            first_name = parts[1].strip()
-            name = f"{first_name} {surname}"
-    
-    # Normalizar removendo espaços, hífens, pontos e aspas
-    return name.lower().replace(' ', '').replace('-', '').replace('.', '').replace("'", "")
+        return {}, PlayerIdMap(), 0
 
 # --- Funções da API de Odds ---
-def get_tournaments(sport="tennis", headers=None):
+def odds_api_url(headers, path):
+    """URL de um endpoint da API de Odds (ODDS_API_BASE_URL permite apontar para outro servidor)"""
+    base_url = ODDS_API_BASE_URL or f"https://{headers['x-rapidapi-host']}"
+    return f"{base_url}/{path}"
+
+def get_tournaments(sport="tennis", headers=None, use_cache=True):
     if not headers:
         print("Erro: Headers da API de Odds não configurados para get_tournaments.")
         return None, False
-    url = f"https://{headers['x-rapidapi-host']}/tournaments"
+    url = odds_api_url(headers, "tournaments")
     querystring = {"sport": sport}
     try:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = http_client.get(url, headers=headers, params=querystring, use_cache=use_cache)
         response.raise_for_status()
-        return response.json(), True
+        return json_backend.response_json(response), http_client.reached_network(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar torneios: {e}")
         return None, False
@@ -78,16 +96,16 @@ def get_tournaments(sport="tennis", headers=None):
         print(f"Erro ao decodificar JSON da resposta de torneios. Resposta: {response.text if 'response' in locals() else 'N/A'}")
         return None, False
 
-def get_events(tournament_id, headers=None, media="false"):
+def get_events(tournament_id, headers=None, media="false", use_cache=True):
     if not headers:
         print(f"Erro: Headers da API de Odds não configurados para get_events (torneio {tournament_id}).")
         return None, False
-    url = f"https://{headers['x-rapidapi-host']}/events"
+    url = odds_api_url(headers, "events")
     querystring = {"tournamentId": tournament_id, "media": media}
     try:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = http_client.get(url, headers=headers, params=querystring, use_cache=use_cache)
         response.raise_for_status()
-        return response.json(), True
+        return json_backend.response_json(response), http_client.reached_network(response)
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar eventos para o torneio {tournament_id}: {e}")
         return None, False
@@ -95,11 +113,16 @@ def get_events(tournament_id, headers=None, media="false"):
         print(f"Erro ao decodificar JSON da resposta de eventos (torneio {tournament_id}). Resposta: {response.text if 'response' in locals() else 'N/A'}")
         return None, False
 
-def get_odds(event_id, headers=None, bookmakers="bet365", odds_format="decimal", raw="false"):
+def get_odds(event_id, headers=None, bookmakers="bet365", odds_format="decimal", raw="false", priority=None,
+             use_cache=True):
+    """
+    Odds do evento e se a resposta veio da API (False quando veio só do
+    cache HTTP ou houve erro). use_cache=False sempre consulta a API.
+    """
     if not headers:
         print(f"Erro: Headers da API de Odds não configurados para get_odds (evento {event_id}).")
         return None, False
-    url = f"https://{headers['x-rapidapi-host']}/odds"
+    url = odds_api_url(headers, "odds")
     querystring = {
         "eventId": event_id,
         "bookmakers": bookmakers,
@@ -107,16 +130,17 @@ def get_odds(event_id, headers=None, bookmakers="bet365", odds_format="decimal",
         "raw": raw
     }
     try:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = http_client.get(url, headers=headers, params=querystring, priority=priority, use_cache=use_cache)
         response.raise_for_status()
-        data = response.json()
+        request_made = http_client.reached_network(response)
+        data = json_backend.response_json(response)
         if isinstance(data, dict) and 'markets' not in data and data.get('message'):
             print(f"    Mensagem da API de odds para o evento {event_id} (bookmaker: {bookmakers}): {data['message']}")
-            return None, True
+            return None, request_made
         elif isinstance(data, list) and not data:
             print(f"    API de odds retornou uma lista vazia para o evento {event_id} (bookmaker: {bookmakers}).")
-            return None, True
-        return data, True
+            return None, request_made
+        return data, request_made
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar odds para o evento {event_id}: {e}")
         return None, False
@@ -125,6 +149,33 @@ def get_odds(event_id, headers=None, bookmakers="bet365", odds_format="decimal",
         return None, True
 
 def process_odds_data(odds_api_response, event_id_for_log="N/A"):
+    """
+    Linhas de odds (bet365) de uma resposta de get_odds. O caminho normal
+    decodifica o payload no esquema tipado (api/schemas.py); um payload fora
+    do formato cai na leitura campo a campo, que pula só os itens com
+    problema e avisa quais foram.
+    """
+    if not odds_api_response:
+        return []
+    try:
+        return EventOdds.from_dict(odds_api_response).lines()
+    except SchemaError:
+        return _process_odds_data_lenient(odds_api_response, event_id_for_log)
+
+def process_odds_lines(odds_api_response, event_id_for_log="N/A"):
+    """
+    As linhas de process_odds_data no modelo compacto (api/odds_lines.py),
+    que é o que os pipelines guardam para todos os eventos. Exportado em
+    JSON, o resultado é a mesma lista de linhas.
+    """
+    if not odds_api_response:
+        return OddsLines()
+    try:
+        return OddsLines.from_markets(EventOdds.from_dict(odds_api_response).markets)
+    except SchemaError:
+        return OddsLines.from_dicts(_process_odds_data_lenient(odds_api_response, event_id_for_log))
+
+def _process_odds_data_lenient(odds_api_response, event_id_for_log="N/A"):
     processed_odds = []
     if not odds_api_response:
         return processed_odds
@@ -191,13 +242,159 @@ def process_odds_data(odds_api_response, event_id_for_log="N/A"):
             })
     return processed_odds
 
-def run_data_pipeline():
+def extract_tournaments_list(tournaments_data):
+    """Normaliza a resposta de torneios (dict ou lista) para uma lista"""
+    if isinstance(tournaments_data, dict):
+        return list(tournaments_data.values())
+    if isinstance(tournaments_data, list):
+        return tournaments_data
+    return None
+
+def filter_tournaments(tournaments, category="ATP", name_contains="Singles", tournament_filters=None):
+    """
+    Filtra torneios por categoria e parte do nome. tournament_filters é uma
+    lista opcional de IDs ou trechos de nome; o torneio precisa casar com um deles.
+    Os torneios são lidos pelo esquema OddsTournament (api/schemas.py); os que
+    estão fora dele ficam de fora. Retorna os dicionários originais.
+    """
+    filtered = []
+    for raw, tournament in valid_items(tournaments, OddsTournament, "tournaments"):
+        if not tournament.tournament_id:
+            continue
+        name = tournament.name or ""
+        if name_contains and name_contains not in name:
+            continue
+        if category and (tournament.category or "") != category:
+            continue
+        if tournament_filters:
+            tournament_id, name = str(tournament.tournament_id), name.lower()
+            if not any(str(f) == tournament_id or str(f).lower() in name for f in tournament_filters):
+                continue
+        filtered.append(raw)
+    return filtered
+
+def filter_pre_game_events(events_list):
+    """Eventos 'pre-game' de uma lista de eventos, lidos pelo esquema Event (os fora dele ficam de fora)"""
+    return [raw for raw, event in valid_items(events_list, Event, "events") if event.status == "pre-game"]
+
+def extract_pre_game_events(events_response_data):
+    """Lista de eventos 'pre-game' de uma resposta de get_events (ou None se o formato for inesperado)"""
+    events_payload = events_response_data.get('events')
+    if isinstance(events_payload, dict):
+        events_list = list(events_payload.values())
+    elif isinstance(events_payload, list):
+        events_list = events_payload
+    else:
+        return None
+    return filter_pre_game_events(events_list)
+
+def resolve_participant(player_id_map, participant_name, participant_id=None):
+    """
+    Linha do participante na tabela de IDs: pelo participantId e, se ele
+    ainda não estiver lá, pelo nome (ligando o participantId ao jogador
+    encontrado, para as próximas execuções)
+    """
+    row = player_id_map.find('odds_id', participant_id)
+    if row is None:
+        row = player_id_map.resolve_name(participant_name)
+        if row is not None and participant_id is not None:
+            known_ids = {source: row[source] for source in ('atp_id', 'tennis_api_id') if row.get(source)}
+            row = player_id_map.link(participant_name, odds_id=participant_id, **known_ids)
+    return row
+
+def lookup_participant_stats(player_stats_map, player_id_map, participant_name, participant_id=None):
+    """Busca as estatísticas de um participante pelo código ATP resolvido na tabela de IDs"""
+    if not player_stats_map:
+        return None
+    row = resolve_participant(player_id_map, participant_name, participant_id)
+    stats = player_stats_map.get(row.get('atp_id')) if row else None
+    if not stats:
+        print(f"    Aviso: Estatísticas não encontradas para {participant_name} (normalizado: '{normalize_name(participant_name)}')")
+    return stats
+
+def lookup_event_h2h(h2h_index, player_id_map, event_item):
+    """Confronto direto dos participantes do evento (None sem índice ou sem o ID da tennis-api de algum deles)"""
+    if h2h_index is None:
+        return None
+    tennis_api_ids = []
+    for n in (1, 2):
+        row = resolve_participant(player_id_map, event_item.get(f'participant{n}', 'N/A'),
+                                  event_item.get(f'participant{n}Id'))
+        if not row or not row.get('tennis_api_id'):
+            return None
+        tennis_api_ids.append(row['tennis_api_id'])
+    return h2h_index.lookup(*tennis_api_ids)
+
+def load_h2h_index():
+    """Índice de confrontos diretos (api/h2h_index.py), ou None se ainda não foi gerado"""
+    if not os.path.exists(H2H_INDEX_PATH):
+        print(f"Aviso: {H2H_INDEX_PATH} não encontrado (gere com python api/h2h_index.py). Eventos sem confronto direto.")
+        return None
+    return H2HIndex()
+
+def build_event_info(tournament, event_item, p1_stats, p2_stats, event_odds_processed, compact=False, h2h=None):
+    """
+    Monta o registro de saída de um evento com odds e estatísticas dos participantes.
+    Com compact=True os participantes trazem só o player_id; as features de
+    cada jogador ficam uma vez na tabela de jogadores (save_players_table).
+    """
+    if compact:
+        p1_ref = {"player_id": p1_stats.get("player_id") if p1_stats else None}
+        p2_ref = {"player_id": p2_stats.get("player_id") if p2_stats else None}
+    else:
+        p1_ref = {"stats": p1_stats if p1_stats else "N/A"}
+        p2_ref = {"stats": p2_stats if p2_stats else "N/A"}
+    return {
+        "tournament_id": tournament["tournamentId"],
+        "tournament_name": tournament["name"],
+        "tournament_category": tournament.get("categoryName", "N/A"),
+        "event_id": event_item.get("eventId"),
+        "event_status": event_item.get("eventStatus"),
+        "event_date": event_item.get("date"),
+        "event_time": event_item.get("time"),
+        "participant1": {
+            "name_api": event_item.get('participant1', 'N/A'),
+            "id_api": event_item.get("participant1Id"),
+            **p1_ref
+        },
+        "participant2": {
+            "name_api": event_item.get('participant2', 'N/A'),
+            "id_api": event_item.get("participant2Id"),
+            **p2_ref
+        },
+        "h2h": h2h if h2h else "N/A",
+        "bookmaker_count_event": event_item.get("bookmakerCount"),
+        "start_time_unix_event": event_item.get("startTime"),
+        "odds_bet365": event_odds_processed
+    }
+
+def percentile(values, q):
+    """Percentil q (0-100) com interpolação linear"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def save_players_table(events, output_filename=PLAYERS_TABLE_FILENAME):
+    """Grava a tabela de features dos jogadores referenciados pelos eventos compactos"""
+    player_stats_map, _, _ = load_player_stats_from_clean()
+    players_table = build_players_table(player_stats_map, referenced_player_ids(events))
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json_backend.dump(players_table, f, indent=True)
+    return len(players_table)
+
+def run_data_pipeline(compact=False):
     print("Iniciando pipeline de coleta de dados...")
     all_events_data = []
     total_api_requests = 0
 
     # --- INÍCIO: Carregar estatísticas dos jogadores do stats_clean.json ---
-    player_stats_map, stats_req_count = load_player_stats_from_clean()
+    player_stats_map, player_id_map, stats_req_count = load_player_stats_from_clean()
+    h2h_index = load_h2h_index()
+    odds_history = OddsHistory() if HISTORY_ENABLED else None
     total_api_requests += stats_req_count
     if not player_stats_map:
         print("Aviso: Não foi possível carregar as estatísticas dos jogadores. Os eventos não serão enriquecidos com elas.")
@@ -232,12 +429,7 @@ def run_data_pipeline():
         print(f"\nTotal de requisições à API feitas (incluindo stats): {total_api_requests}")
         return all_events_data, total_api_requests
 
-    filtered_tournaments = [
-        t for t in list_of_tournaments_from_api
-        if t.get("tournamentId") and \
-        "Singles" in t.get("name", "") and \
-        t.get("categoryName", "") == "ATP"
-    ]
+    filtered_tournaments = filter_tournaments(list_of_tournaments_from_api)
     print(f"Encontrados {len(filtered_tournaments)} torneios 'ATP Singles' após o filtro inicial.")
     if not filtered_tournaments:
         print("Nenhum torneio 'ATP Singles' encontrado após o filtro inicial.")
@@ -260,7 +452,6 @@ def run_data_pipeline():
             continue
 
         print(f"  Buscando eventos para o torneio '{tournament_name}'...")
-        time.sleep(1)
         events_response_data, req_made_events = get_events(tournament_id, headers=BASE_HEADERS_ODDS)
         if req_made_events: total_api_requests += 1
 
@@ -285,12 +476,7 @@ def run_data_pipeline():
             print(f"  Nenhum evento encontrado no payload para o torneio {tournament_name}.")
             continue
 
-        pre_game_events = []
-        for event_item_raw in actual_events_list_raw:
-            if not isinstance(event_item_raw, dict):
-                continue
-            if event_item_raw.get("eventStatus") == "pre-game":
-                pre_game_events.append(event_item_raw)
+        pre_game_events = filter_pre_game_events(actual_events_list_raw)
 
         print(f"  Encontrados {len(pre_game_events)} eventos 'pre-game' para o torneio {tournament_name}.")
 
@@ -319,49 +505,26 @@ def run_data_pipeline():
                 participant2_name = event_item.get('participant2', 'N/A')
                 print(f"    Processando evento ({processed_event_count_for_tournament_total}º pré-jogo do torneio): {participant1_name} vs {participant2_name} (ID: {event_id})")
 
-                p1_stats, p2_stats = None, None
-                if player_stats_map:
-                    norm_p1_name = normalize_player_name(participant1_name)
-                    norm_p2_name = normalize_player_name(participant2_name)
-                    p1_stats = player_stats_map.get(norm_p1_name)
-                    p2_stats = player_stats_map.get(norm_p2_name)
-                    if not p1_stats: print(f"    Aviso: Estatísticas não encontradas para {participant1_name} (normalizado: '{norm_p1_name}')")
-                    if not p2_stats: print(f"    Aviso: Estatísticas não encontradas para {participant2_name} (normalizado: '{norm_p2_name}')")
-
-                time.sleep(0.5)
+                p1_stats = lookup_participant_stats(player_stats_map, player_id_map, participant1_name,
+                                                    event_item.get('participant1Id'))
+                p2_stats = lookup_participant_stats(player_stats_map, player_id_map, participant2_name,
+                                                    event_item.get('participant2Id'))
 
                 odds_data_raw, req_made_odds = get_odds(event_id, headers=BASE_HEADERS_ODDS, bookmakers="bet365")
                 if req_made_odds: total_api_requests += 1
 
-                event_odds_processed = process_odds_data(odds_data_raw, event_id)
+                event_odds_processed = process_odds_lines(odds_data_raw, event_id)
 
                 if not event_odds_processed:
                     print(f"    Nenhuma odd da Bet365 encontrada ou processada para o evento {event_id}.")
                 else:
                     print(f"    Encontradas {len(event_odds_processed)} linhas de odds da Bet365 para o evento {event_id}.")
+                if odds_history:
+                    odds_history.record(event_id, event_odds_processed, start_time=event_item.get("startTime"))
 
-                event_info = {
-                    "tournament_id": tournament_id,
-                    "tournament_name": tournament_name,
-                    "tournament_category": tournament_category,
-                    "event_id": event_id,
-                    "event_status": event_item.get("eventStatus"),
-                    "event_date": event_item.get("date"),
-                    "event_time": event_item.get("time"),
-                    "participant1": {
-                        "name_api": participant1_name,
-                        "id_api": event_item.get("participant1Id"),
-                        "stats": p1_stats if p1_stats else "N/A"
-                    },
-                    "participant2": {
-                        "name_api": participant2_name,
-                        "id_api": event_item.get("participant2Id"),
-                        "stats": p2_stats if p2_stats else "N/A"
-                    },
-                    "bookmaker_count_event": event_item.get("bookmakerCount"),
-                    "start_time_unix_event": event_item.get("startTime"),
-                    "odds_bet365": event_odds_processed
-                }
+                h2h = lookup_event_h2h(h2h_index, player_id_map, event_item)
+                event_info = build_event_info(tournament, event_item, p1_stats, p2_stats, event_odds_processed,
+                                              compact=compact, h2h=h2h)
                 all_events_data.append(event_info)
 
             start_index += batch_size
@@ -385,30 +548,238 @@ def run_data_pipeline():
                 if not any(e.get("eventStatus") == "pre-game" for e in actual_events_list_raw):
                     print(f"  Nenhum evento 'pre-game' encontrado para o torneio {tournament_name} dentre os {len(actual_events_list_raw)} eventos brutos.")
 
+    player_id_map.save()
+    if odds_history:
+        odds_history.close()
     print("\nPipeline de coleta de dados concluído.")
     print(f"Total de requisições à API (Odds + Estatísticas): {total_api_requests}")
+    cache_summary = http_client.cache_summary()
+    if cache_summary:
+        print(cache_summary)
+    quota_summary = http_client.quota_summary()
+    if quota_summary:
+        print(quota_summary)
     return all_events_data, total_api_requests
 
+def run_headless_pipeline(category="ATP", name_contains="Singles", tournament_filters=None,
+                          max_workers=ODDS_PIPELINE_WORKERS, stream_path=None, compact=False):
+    """
+    Versão não interativa do pipeline, para rodar agendada (ex.: cron).
+
+    Os torneios são escolhidos pelos filtros em vez de input(); as odds de
+    todos os eventos 'pre-game' são buscadas por um pool de max_workers
+    threads, e o rate limit do host em api/http_client.py controla o ritmo.
+
+    Com stream_path, cada evento é gravado em NDJSON assim que fica pronto
+    (e não acumulado em memória); eventos já presentes no arquivo, de uma
+    execução interrompida, são pulados. compact tem o mesmo efeito que em
+    build_event_info.
+    Retorna (eventos, total de requisições, resumo de throughput).
+    """
+    print("Iniciando pipeline de coleta de dados (modo headless)...")
+    pipeline_start = time.perf_counter()
+    all_events_data = []
+    total_api_requests = 0
+
+    player_stats_map, player_id_map, _ = load_player_stats_from_clean()
+    h2h_index = load_h2h_index()
+    odds_history = OddsHistory() if HISTORY_ENABLED else None
+    if not player_stats_map:
+        print("Aviso: Não foi possível carregar as estatísticas dos jogadores. Os eventos não serão enriquecidos com elas.")
+
+    if not BASE_HEADERS_ODDS:
+        print("Erro Crítico: RAPIDAPI_KEY ou RAPIDAPI_HOST para a API de Odds não foram encontradas no arquivo .env.")
+        return [], total_api_requests, {}
+
+    tournaments_data, req_made_tournaments = get_tournaments(sport="tennis", headers=BASE_HEADERS_ODDS)
+    if req_made_tournaments: total_api_requests += 1
+    tournaments = extract_tournaments_list(tournaments_data) if tournaments_data else None
+    if not tournaments:
+        print("Não foi possível buscar torneios ou resposta vazia.")
+        return all_events_data, total_api_requests, {}
+
+    filtered_tournaments = filter_tournaments(tournaments, category, name_contains, tournament_filters)
+    print(f"Encontrados {len(filtered_tournaments)} torneios (categoria: {category}, tipo: {name_contains}, filtros: {tournament_filters or 'nenhum'}).")
+
+    pending_events = []
+    for tournament in filtered_tournaments:
+        events_response_data, req_made_events = get_events(tournament["tournamentId"], headers=BASE_HEADERS_ODDS)
+        if req_made_events: total_api_requests += 1
+        if not events_response_data:
+            print(f"  Não foi possível buscar eventos para o torneio {tournament['name']} ou resposta vazia.")
+            continue
+        pre_game_events = extract_pre_game_events(events_response_data)
+        if pre_game_events is None:
+            print(f"  Formato inesperado para o payload 'events' do torneio {tournament['name']}.")
+            continue
+        print(f"  {tournament['name']}: {len(pre_game_events)} eventos 'pre-game'.")
+        pending_events.extend((tournament, e) for e in pre_game_events if e.get("eventId"))
+
+    stream_writer = None
+    if stream_path:
+        done_event_ids = completed_keys(stream_path, "event_id")
+        if done_event_ids:
+            pending_events = [(t, e) for t, e in pending_events if str(e["eventId"]) not in done_event_ids]
+            print(f"Retomando {stream_path}: {len(done_event_ids)} eventos já gravados serão pulados.")
+        stream_writer = NDJSONWriter(stream_path)
+
+    def fetch_event_odds(event_item):
+        start = time.perf_counter()
+        odds_data_raw, req_made_odds = get_odds(event_item["eventId"], headers=BASE_HEADERS_ODDS, bookmakers="bet365",
+                                                priority=odds_priority(event_item.get("startTime")))
+        return odds_data_raw, req_made_odds, time.perf_counter() - start
+
+    def handle_event(tournament, event_item, future):
+        nonlocal total_api_requests, events_done
+        odds_data_raw, req_made_odds, latency = future.result()
+        if req_made_odds: total_api_requests += 1
+        latencies.append(latency)
+
+        p1_stats = lookup_participant_stats(player_stats_map, player_id_map, event_item.get('participant1', 'N/A'),
+                                            event_item.get('participant1Id'))
+        p2_stats = lookup_participant_stats(player_stats_map, player_id_map, event_item.get('participant2', 'N/A'),
+                                            event_item.get('participant2Id'))
+        event_odds_processed = process_odds_lines(odds_data_raw, event_item["eventId"])
+        if odds_history:
+            odds_history.record(event_item["eventId"], event_odds_processed,
+                                start_time=event_item.get("startTime"))
+        h2h = lookup_event_h2h(h2h_index, player_id_map, event_item)
+        event_info = build_event_info(tournament, event_item, p1_stats, p2_stats, event_odds_processed,
+                                      compact=compact, h2h=h2h)
+        if stream_writer:
+            stream_writer.write(event_info)
+        else:
+            all_events_data.append(event_info)
+        events_done += 1
+
+    print(f"Buscando odds de {len(pending_events)} eventos com {max_workers} workers...")
+    odds_start = time.perf_counter()
+    latencies = []
+    events_done = 0
+    # No máximo ODDS_PIPELINE_IN_FLIGHT buscas por worker submetidas de uma vez: cada resposta é
+    # gravada (com stream_path) logo que a fila chega nela, sem guardar as de todos os eventos.
+    # A fila é consumida na ordem dos eventos, então a saída tem a mesma ordem de antes.
+    max_in_flight = max(1, max_workers * ODDS_PIPELINE_IN_FLIGHT)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            for tournament, event_item in pending_events:
+                in_flight.append((tournament, event_item, executor.submit(fetch_event_odds, event_item)))
+                if len(in_flight) >= max_in_flight:
+                    handle_event(*in_flight.popleft())
+            while in_flight:
+                handle_event(*in_flight.popleft())
+    finally:
+        if stream_writer:
+            stream_writer.close()
+        player_id_map.save()
+        if odds_history:
+            odds_history.close()
+    odds_elapsed = time.perf_counter() - odds_start
+
+    summary = {
+        "events": events_done,
+        "api_calls": total_api_requests,
+        "elapsed_s": round(time.perf_counter() - pipeline_start, 3),
+        "events_per_sec": round(events_done / odds_elapsed, 2) if odds_elapsed > 0 else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "latency_max_ms": round(max(latencies, default=0) * 1000, 1)
+    }
+    print("\nPipeline de coleta de dados concluído (modo headless).")
+    print(f"Eventos: {summary['events']} | Requisições à API: {summary['api_calls']} | Tempo total: {summary['elapsed_s']} s")
+    print(f"Throughput: {summary['events_per_sec']} eventos/s")
+    print(f"Latência get_odds (inclui espera do rate limit): p50 {summary['latency_p50_ms']} ms | "
+          f"p90 {summary['latency_p90_ms']} ms | p99 {summary['latency_p99_ms']} ms | máx {summary['latency_max_ms']} ms")
+    cache_summary = http_client.cache_summary()
+    if cache_summary:
+        print(cache_summary)
+    quota_summary = http_client.quota_summary()
+    if quota_summary:
+        print(quota_summary)
+    return all_events_data, total_api_requests, summary
+
+def parse_args():
+    """
+    Argumentos de linha de comando. Um arquivo --config (JSON com as chaves
+    headless, category, type, tournaments, workers, stream, compact) define
+    os valores padrão, que as flags explícitas sobrescrevem (--no-headless e
+    --no-compact desligam o que o config ligou).
+    """
+    config_parser = argparse.ArgumentParser(add_help=False)
+    config_parser.add_argument("--config")
+    config_args, _ = config_parser.parse_known_args()
+    config = {}
+    if config_args.config:
+        with open(config_args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Coleta odds de eventos 'pre-game' com estatísticas dos jogadores",
+                                     parents=[config_parser])
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=config.get("headless", False),
+                        help="roda sem perguntas, usando os filtros abaixo")
+    parser.add_argument("--category", default=config.get("category", os.getenv("ODDS_CATEGORY", "ATP")),
+                        help="categoria do torneio (padrão: ATP)")
+    parser.add_argument("--type", dest="name_contains",
+                        default=config.get("type", os.getenv("ODDS_TOURNAMENT_TYPE", "Singles")),
+                        help="trecho obrigatório no nome do torneio (padrão: Singles)")
+    # Sem default: as flags substituem a lista do config em vez de somar a ela
+    parser.add_argument("--tournament", dest="tournaments", action="append",
+                        help="ID ou parte do nome de um torneio a coletar (pode repetir)")
+    parser.add_argument("--workers", type=int, default=config.get("workers", ODDS_PIPELINE_WORKERS),
+                        help="threads buscando odds em paralelo no modo headless")
+    parser.add_argument("--stream", nargs="?", const=DEFAULT_STREAM_PATH, default=config.get("stream"),
+                        help="grava cada evento em NDJSON durante a coleta e retoma de lá se interrompida "
+                             "(modo headless)")
+    parser.add_argument("--compact", action=argparse.BooleanOptionalAction, default=config.get("compact", False),
+                        help="eventos referenciam os jogadores por player_id e as features de cada jogador "
+                             f"vão uma vez para {PLAYERS_TABLE_FILENAME}")
+    args = parser.parse_args()
+    args.tournaments = args.tournaments or config.get("tournaments")
+    return args
+
 if __name__ == "__main__":
-    collected_data, total_requests_made = run_data_pipeline()
+    args = parse_args()
+    if args.headless:
+        collected_data, total_requests_made, _ = run_headless_pipeline(
+            category=args.category,
+            name_contains=args.name_contains,
+            tournament_filters=args.tournaments,
+            max_workers=args.workers,
+            stream_path=args.stream,
+            compact=args.compact
+        )
+    else:
+        collected_data, total_requests_made = run_data_pipeline(compact=args.compact)
 
     print(f"\n--- Resumo da Execução ---")
     print(f"Total de requisições à API: {total_requests_made}")
 
-    if collected_data:
+    if args.headless and args.stream and os.path.exists(args.stream):
+        # Os eventos já estão no NDJSON; gera o JSON final sem carregá-los todos em memória
+        events_count = write_json_array_from_ndjson(args.stream, OUTPUT_FILENAME)
+        if args.compact:
+            players_count = save_players_table(read_ndjson(args.stream))
+            print(f"Features de {players_count} jogadores salvas em {PLAYERS_TABLE_FILENAME}")
+        os.remove(args.stream)
+        print(f"{events_count} eventos do stream {args.stream} salvos em {OUTPUT_FILENAME}")
+    elif collected_data:
         print(f"Total de eventos ATP Singles 'pre-game' coletados com suas odds e estatísticas: {len(collected_data)}")
-        if collected_data:
+        if collected_data and not args.headless:
             print("\nExemplo do primeiro evento ATP Singles 'pre-game' coletado (se houver):")
             try:
-                print(json.dumps(collected_data[0], indent=2, ensure_ascii=False))
+                print(json_backend.dumps(collected_data[0], indent=True))
             except IndexError:
                 print("Nenhum evento coletado para exibir como exemplo.")
 
         try:
-            output_filename = "dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json"
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump(collected_data, f, indent=2, ensure_ascii=False)
-            print(f"\nDados salvos em {output_filename}")
+            with open(OUTPUT_FILENAME, "w", encoding="utf-8") as f:
+                json_backend.dump(collected_data, f, indent=True)
+            print(f"\nDados salvos em {OUTPUT_FILENAME}")
+            if args.compact:
+                players_count = save_players_table(collected_data)
+                print(f"Features de {players_count} jogadores salvas em {PLAYERS_TABLE_FILENAME}")
         except IOError as e:
             print(f"Erro ao salvar o arquivo JSON: {e}")
     else:
@@ -0,0 +1,252 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from itertools import groupby
+
+import pandas as pd
+
+HISTORY_PATH = os.getenv("ODDS_HISTORY_PATH", "dados/history/odds_history.sqlite")
+HISTORY_ENABLED = os.getenv("ODDS_HISTORY", "1").lower() not in ("0", "false", "no", "nao", "não")
+# Eventos que começaram há mais que isso saem do histórico na compactação
+RETENTION_DAYS = float(os.getenv("ODDS_HISTORY_RETENTION_DAYS", 30))
+COMPACTION_INTERVAL = float(os.getenv("ODDS_HISTORY_COMPACTION_INTERVAL", 300))
+
+# Uma linha por mudança de preço (odds NULL = linha retirada do mercado).
+# A chave primária agrupa fisicamente as linhas de cada evento, em ordem de
+# mercado/linha/tempo, então as consultas por evento leem um trecho contíguo.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    event_id TEXT NOT NULL,
+    market TEXT NOT NULL,
+    handicap TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    odds REAL,
+    PRIMARY KEY (event_id, market, handicap, outcome, seen_at)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    start_time REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    polls INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_start_time ON events (start_time);
+"""
+
+LINE_KEY = ["market", "handicap", "outcome"]
+
+
+def line_key(line):
+    """Chave (mercado, handicap, outcome) de uma linha de process_odds_data"""
+    handicap = line.get("handicap")
+    return (str(line.get("market")), "" if handicap is None else str(handicap), str(line.get("outcome")))
+
+
+class OddsHistory:
+    """
+    Histórico das odds de cada evento a cada coleta, em SQLite.
+
+    A gravação só acrescenta linhas, e só para o que mudou: cada linha
+    (mercado, handicap, outcome) tem um registro quando aparece e outro a
+    cada mudança de preço; coletas em que o preço se repete só atualizam
+    last_seen/polls do evento. Assim, coletar a cada minuto um torneio
+    inteiro cresce com o número de mudanças de preço, não de coletas. A
+    compactação (compact(), ou em segundo plano com
+    start_background_compaction) remove os eventos fora da retenção e
+    devolve ao disco o espaço do log (WAL).
+    """
+
+    def __init__(self, path=HISTORY_PATH, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self.rows_written = 0
+        self.lines_seen = 0
+        self._last_prices = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compaction_thread = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # auto_vacuum só vale se definido antes de o arquivo ganhar páginas
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _current_prices(self, event_id):
+        """Último preço de cada linha do evento (do cache em memória ou do banco)"""
+        if event_id not in self._last_prices:
+            rows = self._conn.execute(
+                "SELECT market, handicap, outcome, odds FROM prices WHERE event_id = ? ORDER BY seen_at",
+                (event_id,)
+            ).fetchall()
+            self._last_prices[event_id] = {(market, handicap, outcome): odds
+                                           for market, handicap, outcome, odds in rows}
+        return self._last_prices[event_id]
+
+    def record(self, event_id, odds_lines, seen_at=None, start_time=None):
+        """
+        Registra uma coleta das odds do evento (linhas de process_odds_data)
+        e retorna quantas mudanças foram gravadas
+        """
+        event_id = str(event_id)
+        seen_at = time.time() if seen_at is None else float(seen_at)
+        current = {line_key(line): line.get("odds") for line in odds_lines or []}
+        with self._lock:
+            last = self._current_prices(event_id)
+            changes = [(key, odds) for key, odds in current.items() if key not in last or last[key] != odds]
+            # Linhas que sumiram do mercado ganham um registro sem preço
+            changes.extend((key, None) for key, odds in last.items() if key not in current and odds is not None)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prices (event_id, market, handicap, outcome, seen_at, odds) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(event_id, *key, seen_at, odds) for key, odds in changes]
+            )
+            self._conn.execute(
+                """INSERT INTO events (event_id, start_time, first_seen, last_seen, polls) VALUES (?, ?, ?, ?, 1)
+                   ON CONFLICT(event_id) DO UPDATE SET
+                       start_time = COALESCE(excluded.start_time, start_time),
+                       first_seen = MIN(first_seen, excluded.first_seen),
+                       last_seen = MAX(last_seen, excluded.last_seen),
+                       polls = polls + 1""",
+                (event_id, start_time, seen_at, seen_at)
+            )
+            self._conn.commit()
+            last.update(changes)
+            self.rows_written += len(changes)
+            self.lines_seen += len(current)
+        return len(changes)
+
+    def history(self, event_id, market=None):
+        """Todas as mudanças de preço do evento (opcionalmente de um mercado), em ordem de tempo"""
+        query = "SELECT market, handicap, outcome, seen_at, odds FROM prices WHERE event_id = ?"
+        params = [str(event_id)]
+        if market is not None:
+            query += " AND market = ?"
+            params.append(market)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY market, handicap, outcome, seen_at", params).fetchall()
+        return pd.DataFrame(rows, columns=LINE_KEY + ["seen_at", "odds"])
+
+    def event_info(self, event_id):
+        """start_time, first_seen, last_seen e polls do evento (ou None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start_time, first_seen, last_seen, polls FROM events WHERE event_id = ?", (str(event_id),)
+            ).fetchone()
+        return dict(zip(("start_time", "first_seen", "last_seen", "polls"), row)) if row else None
+
+    def events(self):
+        """Eventos do histórico (start_time, first_seen, last_seen, polls), os que começam por último primeiro"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT event_id, start_time, first_seen, last_seen, polls FROM events "
+                "ORDER BY COALESCE(start_time, last_seen) DESC"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["event_id", "start_time", "first_seen", "last_seen", "polls"])
+
+    def line_movement(self, event_id, market=None):
+        """
+        Resumo por linha do evento: preço de abertura e de fechamento (último
+        preço antes do início do evento, se o início é conhecido), quando
+        cada um foi visto, menor/maior preço, número de mudanças e o
+        movimento (no preço e na probabilidade implícita)
+        """
+        query = "SELECT market, handicap, outcome, seen_at, odds FROM prices WHERE event_id = ? AND odds IS NOT NULL"
+        params = [str(event_id)]
+        if market is not None:
+            query += " AND market = ?"
+            params.append(market)
+        info = self.event_info(event_id) or {}
+        if info.get("start_time") is not None:
+            query += " AND seen_at <= ?"
+            params.append(info["start_time"])
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY market, handicap, outcome, seen_at", params).fetchall()
+
+        # As linhas vêm agrupadas por (mercado, handicap, outcome) e em ordem de tempo
+        summary = []
+        for key, prices in groupby(rows, key=lambda row: row[:3]):
+            prices = list(prices)
+            odds = [row[4] for row in prices]
+            opening, closing = prices[0], prices[-1]
+            summary.append((*key, opening[4], opening[3], closing[4], closing[3], min(odds), max(odds),
+                            len(prices) - 1, closing[4] - opening[4], 1.0 / closing[4] - 1.0 / opening[4]))
+        return pd.DataFrame(summary, columns=LINE_KEY + ["opening_odds", "opened_at", "closing_odds", "closed_at",
+                                                         "min_odds", "max_odds", "changes", "movement",
+                                                         "implied_movement"])
+
+    def compact(self, now=None):
+        """
+        Remove os eventos que começaram (ou foram vistos pela última vez, se
+        o início não é conhecido) antes da janela de retenção e devolve o
+        espaço ao disco. Retorna quantos eventos saíram.
+        """
+        cutoff = (time.time() if now is None else now) - self.retention_days * 24 * 60 * 60
+        with self._lock:
+            expired = [event_id for (event_id,) in self._conn.execute(
+                "SELECT event_id FROM events WHERE COALESCE(start_time, last_seen) < ?", (cutoff,)
+            )]
+            self._conn.executemany("DELETE FROM prices WHERE event_id = ?", [(e,) for e in expired])
+            self._conn.executemany("DELETE FROM events WHERE event_id = ?", [(e,) for e in expired])
+            self._conn.commit()
+            for event_id in expired:
+                self._last_prices.pop(event_id, None)
+            # incremental_vacuum libera uma página por passo: executescript roda até o fim
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return len(expired)
+
+    def start_background_compaction(self, interval=COMPACTION_INTERVAL):
+        """Roda compact() a cada `interval` segundos numa thread daemon, até close()"""
+        if self._compaction_thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.compact()
+                except sqlite3.Error as e:
+                    print(f"Aviso: falha na compactação do histórico de odds: {e}")
+
+        self._compaction_thread = threading.Thread(target=loop, name="odds-history-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+            events, polls = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(polls), 0) FROM events").fetchone()
+        size = sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal")
+                   if os.path.exists(self.path + suffix))
+        return {"events": events, "polls": polls, "price_rows": rows, "bytes": size}
+
+    def close(self):
+        self._stop.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o histórico de odds (abertura, fechamento e movimento)")
+    parser.add_argument("event_id", nargs="?", help="evento a consultar; sem ele mostra o resumo do histórico")
+    parser.add_argument("--market", default=None)
+    parser.add_argument("--path", default=HISTORY_PATH)
+    parser.add_argument("--compact", action="store_true", help="aplica a retenção e compacta o arquivo")
+    args = parser.parse_args()
+
+    odds_history = OddsHistory(args.path)
+    if args.compact:
+        print(f"{odds_history.compact()} eventos removidos pela retenção de {odds_history.retention_days:g} dias")
+    if args.event_id:
+        movement = odds_history.line_movement(args.event_id, args.market)
+        print(movement.to_string(index=False) if not movement.empty else "Nenhuma odd registrada para o evento.")
+    else:
+        print(odds_history.stats())
+    odds_history.close()
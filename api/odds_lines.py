@@ -0,0 +1,238 @@
+import threading
+
+import numpy as np
+
+# Colunas de texto de uma linha de odds (mesma ordem das chaves de process_odds_data)
+COLUMNS = ("market", "short", "handicap", "odds_type", "outcome")
+COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+MAX_CODES = np.iinfo(np.uint16).max + 1
+# Algarismos significativos que um preço em float32 reproduz sem perda (FLT_DIG)
+PRICE_DIGITS = 6
+
+
+class Vocabulary:
+    """
+    Valores distintos de uma coluna, cada um com um código (uint16). Os
+    códigos valem para todas as linhas do processo, então linhas de eventos
+    diferentes são comparadas e agrupadas pelo código.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(value):
+        # "1", 1 e 1.0 (e True) seriam a mesma chave num dict: o tipo entra na chave
+        return value if type(value) is str else (type(value), value)
+
+    def find(self, value):
+        """Código de um valor já visto, ou None"""
+        try:
+            return self._codes.get(self._key(value))
+        except TypeError:
+            return self._codes.get((type(value), repr(value)))
+
+    def code(self, value):
+        """Código do valor, registrando-o se for novo"""
+        if type(value) is str:
+            code = self._codes.get(value)
+            if code is not None:
+                return code
+        key = self._key(value)
+        try:
+            code = self._codes.get(key)
+        except TypeError:
+            # Valor não hashable (só na leitura campo a campo de payloads estranhos)
+            key = (type(value), repr(value))
+            code = self._codes.get(key)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(key)
+                if code is None:
+                    if len(self.values) >= MAX_CODES:
+                        raise OverflowError(f"Mais de {MAX_CODES} valores distintos numa coluna de odds")
+                    code = len(self.values)
+                    self.values.append(value)
+                    self._codes[key] = code
+        return code
+
+
+VOCABULARIES = {name: Vocabulary() for name in COLUMNS}
+
+
+def restore_prices(odds):
+    """
+    Preços (float64) a partir dos float32: arredonda para PRICE_DIGITS
+    algarismos significativos, o que devolve o mesmo float que o decimal
+    original (1.02, não 1.0199999809265137)
+    """
+    odds = odds.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = PRICE_DIGITS - 1 - np.floor(np.log10(np.abs(odds)))
+    exponent[~np.isfinite(exponent)] = 0
+    # Divisão de inteiros exatos por potência de 10: o float mais próximo do decimal
+    up = exponent >= 0
+    scale = 10.0 ** np.abs(exponent)
+    return np.where(up, np.round(odds * scale) / scale, np.round(odds / scale) * scale)
+
+
+def _pack_prices(prices):
+    """(float32 com NaN para None, preços que o float32 não reproduz {posição: valor original})"""
+    floats = np.array([price if type(price) is float else np.nan for price in prices], dtype=np.float64)
+    odds = floats.astype(np.float32)
+    lossy = ~((restore_prices(odds) == floats) | np.isnan(floats))
+    exact = {int(i): prices[i] for i in np.flatnonzero(lossy)}
+    # Inteiros, textos e outros tipos (leitura campo a campo) ficam como vieram
+    exact.update((i, price) for i, price in enumerate(prices) if price is not None and type(price) is not float)
+    if exact:
+        odds[list(exact)] = np.nan
+    return odds, exact or None
+
+
+class OddsLines:
+    """
+    Linhas de odds de um evento em formato compacto: uma matriz (5, n)
+    uint16 com os códigos de mercado, nome curto, handicap, tipo e outcome
+    (uma coluna contígua por campo) e os preços em float32. Ocupa ~14 bytes
+    por linha, contra um dict de 6 chaves por linha em process_odds_data.
+
+    A exportação (to_dicts, e o JSON via json_backend) devolve exatamente
+    as linhas de process_odds_data: os preços voltam ao decimal original, e
+    o que o float32 não reproduz fica à parte com o valor original. Filtros
+    e agrupamentos trabalham direto nos códigos, com numpy.
+    """
+
+    __slots__ = ("codes", "odds", "_exact")
+
+    def __init__(self, codes=None, odds=None, exact=None):
+        self.codes = np.empty((len(COLUMNS), 0), dtype=np.uint16) if codes is None else codes
+        self.odds = np.empty(0, dtype=np.float32) if odds is None else odds
+        self._exact = exact
+
+    @classmethod
+    def _build(cls, rows, prices):
+        if not rows:
+            return cls()
+        odds, exact = _pack_prices(prices)
+        return cls(np.ascontiguousarray(np.array(rows, dtype=np.uint16).T), odds, exact)
+
+    @classmethod
+    def from_markets(cls, markets, bookmaker="bet365"):
+        """Linhas dos mercados de um EventOdds (api/schemas.py)"""
+        market_codes, short_codes, handicap_codes, type_codes, outcome_codes = (
+            VOCABULARIES[name].code for name in COLUMNS)
+        rows, prices = [], []
+        for market in markets:
+            prefix = (market_codes(market.name), short_codes(market.short_name),
+                      handicap_codes(market.handicap), type_codes(market.odds_type))
+            for outcome in market.outcomes:
+                rows.append((*prefix, outcome_codes(outcome.name)))
+                prices.append(outcome.prices.get(bookmaker))
+        return cls._build(rows, prices)
+
+    @classmethod
+    def from_dicts(cls, lines):
+        """Linhas no formato de process_odds_data"""
+        vocabularies = [VOCABULARIES[name] for name in COLUMNS]
+        rows = [tuple(vocabulary.code(line.get(name)) for name, vocabulary in zip(COLUMNS, vocabularies))
+                for line in lines]
+        return cls._build(rows, [line.get("odds") for line in lines])
+
+    @classmethod
+    def concat(cls, parts):
+        """Junta as linhas de vários eventos (os códigos são os mesmos em todos)"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls()
+        exact, offset = {}, 0
+        for part in parts:
+            if part._exact:
+                exact.update((offset + i, value) for i, value in part._exact.items())
+            offset += len(part)
+        return cls(np.concatenate([part.codes for part in parts], axis=1),
+                   np.concatenate([part.odds for part in parts]), exact or None)
+
+    def __len__(self):
+        return self.odds.shape[0]
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __repr__(self):
+        return f"OddsLines({len(self)} linhas)"
+
+    def column(self, name):
+        """Valores de uma coluna de texto (market, short, handicap, odds_type, outcome), linha a linha"""
+        values = VOCABULARIES[name].values
+        return [values[code] for code in self.codes[COLUMN_INDEX[name]].tolist()]
+
+    def prices(self):
+        """Preços em float64 (NaN onde não há preço numérico)"""
+        prices = restore_prices(self.odds)
+        for i, value in (self._exact or {}).items():
+            prices[i] = value if type(value) in (int, float) else np.nan
+        return prices
+
+    def to_dicts(self):
+        """Linhas no formato de process_odds_data"""
+        prices = [None if price != price else price for price in restore_prices(self.odds).tolist()]
+        for i, value in (self._exact or {}).items():
+            prices[i] = value
+        columns = [self.column(name) for name in COLUMNS]
+        return [{"market": market, "short": short, "handicap": handicap, "odds_type": odds_type,
+                 "outcome": outcome, "odds": price}
+                for market, short, handicap, odds_type, outcome, price in zip(*columns, prices)]
+
+    def to_json(self):
+        """Usado por api/json_backend.py para exportar no formato de lista de linhas"""
+        return self.to_dicts()
+
+    def take(self, positions):
+        """Subconjunto das linhas nas posições dadas (array de índices)"""
+        exact = None
+        if self._exact:
+            new_position = {int(old): new for new, old in enumerate(positions)}
+            exact = {new_position[i]: value for i, value in self._exact.items() if i in new_position} or None
+        return OddsLines(np.ascontiguousarray(self.codes[:, positions]), self.odds[positions], exact)
+
+    def filter(self, market=None, outcome=None, odds_type=None, min_odds=None, max_odds=None):
+        """Linhas do mercado/outcome/tipo pedidos e com o preço no intervalo (limites inclusivos)"""
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in (("market", market), ("outcome", outcome), ("odds_type", odds_type)):
+            if value is None:
+                continue
+            code = VOCABULARIES[name].find(value)
+            if code is None:
+                return OddsLines()
+            mask &= self.codes[COLUMN_INDEX[name]] == code
+        if min_odds is not None or max_odds is not None:
+            prices = self.prices()
+            if min_odds is not None:
+                mask &= prices >= min_odds
+            if max_odds is not None:
+                mask &= prices <= max_odds
+        return self.take(np.flatnonzero(mask))
+
+    def best_prices(self, by=("market", "handicap", "outcome")):
+        """Maior preço por combinação das colunas em `by` (até 4): {(valores...): preço}"""
+        if not 1 <= len(by) <= 4:
+            raise ValueError("best_prices agrupa por 1 a 4 colunas")
+        prices = self.prices()
+        valid = ~np.isnan(prices)
+        key = np.zeros(int(valid.sum()), dtype=np.uint64)
+        for name in by:
+            key = (key << np.uint64(16)) | self.codes[COLUMN_INDEX[name], valid].astype(np.uint64)
+        groups, inverse = np.unique(key, return_inverse=True)
+        best = np.full(len(groups), -np.inf)
+        np.maximum.at(best, inverse, prices[valid])
+
+        result = {}
+        for group, price in zip(groups.tolist(), best.tolist()):
+            codes = []
+            for _ in by:
+                codes.append(group & 0xFFFF)
+                group >>= 16
+            result[tuple(VOCABULARIES[name].values[code] for name, code in zip(by, reversed(codes)))] = price
+        return result
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import odds
+from api.odds_history import COMPACTION_INTERVAL, OddsHistory
+from api.quota import odds_priority
+
+# (segundos até o início, intervalo entre coletas das odds): vale a primeira
+# faixa em que o evento couber, então a coleta acelera perto do início
+POLL_SCHEDULE = [
+    (15 * 60, 60),
+    (60 * 60, 5 * 60),
+    (6 * 60 * 60, 15 * 60),
+    (24 * 60 * 60, 60 * 60),
+    (float("inf"), 6 * 60 * 60),
+]
+EVENTS_REFRESH_INTERVAL = int(os.getenv("ODDS_SCHEDULER_EVENTS_INTERVAL", 30 * 60))
+TOURNAMENTS_REFRESH_INTERVAL = int(os.getenv("ODDS_SCHEDULER_TOURNAMENTS_INTERVAL", 6 * 60 * 60))
+# Máximo de requisições (torneios + eventos + odds) em qualquer janela de uma hora
+REQUEST_BUDGET_PER_HOUR = int(os.getenv("ODDS_SCHEDULER_BUDGET_PER_HOUR", 500))
+MAX_SLEEP = 60
+# Base de comparação das métricas: todos os eventos coletados no menor intervalo
+UNIFORM_INTERVAL = POLL_SCHEDULE[0][1]
+
+
+def poll_interval(seconds_to_start):
+    """Intervalo entre coletas das odds de um evento que começa daqui a `seconds_to_start` segundos"""
+    for limit, interval in POLL_SCHEDULE:
+        if seconds_to_start <= limit:
+            return interval
+    return POLL_SCHEDULE[-1][1]
+
+
+class OddsScheduler:
+    """
+    Agenda as coletas de odds pelos horários de início dos eventos.
+
+    A cada tick: a lista de torneios é atualizada a cada
+    TOURNAMENTS_REFRESH_INTERVAL, os eventos de cada torneio a cada
+    EVENTS_REFRESH_INTERVAL, e as odds de cada evento 'pre-game' no
+    intervalo de POLL_SCHEDULE para o tempo que falta até o início. Um
+    evento sai da agenda quando deixa de ser 'pre-game' (ao vivo,
+    encerrado) ou quando passa do horário de início.
+
+    Todas as requisições passam pelo orçamento de requisições por hora;
+    sem orçamento, as coletas mais próximas do início vão primeiro e as
+    demais ficam para o próximo tick. As buscas padrão ignoram o cache
+    HTTP, e as métricas contam só as requisições que chegaram à API. As
+    funções de busca, o callback com as odds processadas e o relógio podem
+    ser trocados (ex.: simulação).
+    """
+
+    def __init__(self, category="ATP", name_contains="Singles", tournament_filters=None,
+                 budget_per_hour=REQUEST_BUDGET_PER_HOUR, on_odds=None, clock=time.time,
+                 get_tournaments=None, get_events=None, get_odds=None):
+        self.category = category
+        self.name_contains = name_contains
+        self.tournament_filters = tournament_filters
+        self.budget_per_hour = budget_per_hour
+        self.on_odds = on_odds
+        self.clock = clock
+        headers = odds.BASE_HEADERS_ODDS
+        # O agendador decide quando consultar a API: o TTL do cache HTTP (contado a partir
+        # da resposta) faria a coleta seguinte cair dentro dele e devolver o corpo antigo
+        self.get_tournaments = get_tournaments or (lambda: odds.get_tournaments(
+            sport="tennis", headers=headers, use_cache=False))
+        self.get_events = get_events or (lambda tournament_id: odds.get_events(
+            tournament_id, headers=headers, use_cache=False))
+        self.get_odds = get_odds or (lambda event_id: odds.get_odds(
+            event_id, headers=headers, bookmakers="bet365",
+            priority=odds_priority(self.events[event_id]["start_time"], self.clock()), use_cache=False))
+
+        self.tournaments = {}
+        self.next_tournaments_refresh = 0.0
+        self.events = {}
+        self._requests = deque()
+        self.metrics = {
+            "tournaments_calls": 0,
+            "events_calls": 0,
+            "odds_calls": 0,
+            "deferred_by_budget": 0,
+            "events_tracked": 0,
+            "events_finished": 0,
+        }
+        # Coletas que o agendamento uniforme teria feito nos eventos que já saíram da agenda
+        self._uniform_finished = 0
+
+    def _spend(self, now):
+        """Consome uma requisição do orçamento da última hora (False se esgotado)"""
+        while self._requests and self._requests[0] <= now - 3600:
+            self._requests.popleft()
+        if len(self._requests) >= self.budget_per_hour:
+            self.metrics["deferred_by_budget"] += 1
+            return False
+        self._requests.append(now)
+        return True
+
+    def _uniform_calls(self, event, until):
+        return int((until - event["first_tracked"]) // UNIFORM_INTERVAL) + 1
+
+    def _finish(self, event_id, now):
+        event = self.events.pop(event_id)
+        self._uniform_finished += self._uniform_calls(event, min(now, event["start_time"] or now))
+        self.metrics["events_finished"] += 1
+
+    def _refresh_tournaments(self, now):
+        if not self._spend(now):
+            return
+        data, request_made = self.get_tournaments()
+        self.metrics["tournaments_calls"] += int(bool(request_made))
+        self.next_tournaments_refresh = now + TOURNAMENTS_REFRESH_INTERVAL
+        tournaments = odds.extract_tournaments_list(data) if data else None
+        if not tournaments:
+            return
+        selected = odds.filter_tournaments(tournaments, self.category, self.name_contains, self.tournament_filters)
+        for tournament in selected:
+            entry = self.tournaments.setdefault(tournament["tournamentId"], {"next_refresh": now})
+            entry["tournament"] = tournament
+
+    def _refresh_events(self, tournament_id, now):
+        entry = self.tournaments[tournament_id]
+        if not self._spend(now):
+            return
+        data, request_made = self.get_events(tournament_id)
+        self.metrics["events_calls"] += int(bool(request_made))
+        entry["next_refresh"] = now + EVENTS_REFRESH_INTERVAL
+        pre_game = odds.extract_pre_game_events(data) if data else None
+        if pre_game is None:
+            return
+        pre_game_ids = set()
+        for event_item in pre_game:
+            event_id = event_item.get("eventId")
+            start_time = event_item.get("startTime")
+            if not event_id or (start_time is not None and start_time <= now):
+                continue
+            pre_game_ids.add(event_id)
+            event = self.events.get(event_id)
+            if event is None:
+                self.events[event_id] = {"item": event_item, "tournament": entry["tournament"],
+                                         "start_time": start_time, "next_poll": now,
+                                         "first_tracked": now, "polls": 0}
+                self.metrics["events_tracked"] += 1
+            else:
+                event["item"], event["start_time"] = event_item, start_time
+        # Eventos do torneio que não estão mais 'pre-game' começaram ou foram encerrados
+        for event_id in [e for e, event in self.events.items()
+                         if event["tournament"]["tournamentId"] == tournament_id and e not in pre_game_ids]:
+            self._finish(event_id, now)
+
+    def _poll_odds(self, event_id, now):
+        event = self.events[event_id]
+        if not self._spend(now):
+            return False
+        data, request_made = self.get_odds(event_id)
+        self.metrics["odds_calls"] += int(bool(request_made))
+        event["polls"] += 1
+        seconds_to_start = (event["start_time"] - now) if event["start_time"] is not None else float("inf")
+        event["next_poll"] = now + poll_interval(seconds_to_start)
+        if self.on_odds:
+            self.on_odds(event["tournament"], event["item"], odds.process_odds_data(data, event_id), now)
+        return True
+
+    def tick(self):
+        """Faz as requisições vencidas e retorna quantas foram feitas"""
+        now = self.clock()
+        before = self._spent_requests()
+        if now >= self.next_tournaments_refresh:
+            self._refresh_tournaments(now)
+        for tournament_id, entry in list(self.tournaments.items()):
+            if "tournament" in entry and now >= entry["next_refresh"]:
+                self._refresh_events(tournament_id, now)
+
+        for event_id in [e for e, event in self.events.items()
+                         if event["start_time"] is not None and event["start_time"] <= now]:
+            self._finish(event_id, now)
+        due = sorted((event["start_time"] or float("inf"), event_id)
+                     for event_id, event in self.events.items() if event["next_poll"] <= now)
+        for _, event_id in due:
+            if not self._poll_odds(event_id, now):
+                break
+        return self._spent_requests() - before
+
+    def _spent_requests(self):
+        return self.metrics["tournaments_calls"] + self.metrics["events_calls"] + self.metrics["odds_calls"]
+
+    def next_wakeup(self):
+        """Instante da próxima requisição agendada"""
+        candidates = [self.next_tournaments_refresh]
+        candidates += [entry["next_refresh"] for entry in self.tournaments.values() if "tournament" in entry]
+        candidates += [event["next_poll"] for event in self.events.values()]
+        return min(candidates)
+
+    def summary(self):
+        """Métricas: requisições por tipo e coletas de odds economizadas contra o agendamento uniforme"""
+        now = self.clock()
+        uniform = self._uniform_finished + sum(self._uniform_calls(event, now) for event in self.events.values())
+        saved = uniform - self.metrics["odds_calls"]
+        return {
+            **self.metrics,
+            "events_active": len(self.events),
+            "uniform_odds_calls": uniform,
+            "odds_calls_saved": saved,
+            "saved_pct": round(100 * saved / uniform, 1) if uniform else 0.0,
+        }
+
+    def run(self, duration=None, sleep=time.sleep):
+        """Roda até `duration` segundos (ou para sempre), dormindo até a próxima coleta agendada"""
+        deadline = None if duration is None else self.clock() + duration
+        while deadline is None or self.clock() < deadline:
+            self.tick()
+            wait = min(MAX_SLEEP, max(0.0, self.next_wakeup() - self.clock()))
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - self.clock()))
+            sleep(wait if wait > 0 else 1.0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta as odds dos eventos 'pre-game' conforme o horário de início")
+    parser.add_argument("--category", default="ATP")
+    parser.add_argument("--name-contains", default="Singles")
+    parser.add_argument("--tournaments", nargs="*", default=None, help="IDs ou trechos de nome dos torneios")
+    parser.add_argument("--budget-per-hour", type=int, default=REQUEST_BUDGET_PER_HOUR)
+    parser.add_argument("--duration", type=float, default=None, help="segundos até parar (padrão: até Ctrl+C)")
+    args = parser.parse_args()
+
+    if not odds.BASE_HEADERS_ODDS:
+        print("Erro Crítico: RAPIDAPI_KEY ou RAPIDAPI_HOST para a API de Odds não foram encontradas no arquivo .env.")
+        sys.exit(1)
+
+    odds_history = OddsHistory()
+    odds_history.start_background_compaction(COMPACTION_INTERVAL)
+
+    def record_odds(tournament, event_item, odds_lines, seen_at):
+        changes = odds_history.record(event_item["eventId"], odds_lines, seen_at=seen_at,
+                                      start_time=event_item.get("startTime"))
+        print(f"  {event_item.get('participant1')} vs {event_item.get('participant2')}: "
+              f"{len(odds_lines)} linhas, {changes} mudanças")
+
+    scheduler = OddsScheduler(args.category, args.name_contains, args.tournaments, args.budget_per_hour,
+                              on_odds=record_odds)
+    try:
+        scheduler.run(args.duration)
+    except KeyboardInterrupt:
+        print("\nInterrompido.")
+    finally:
+        odds_history.close()
+        print(json.dumps(scheduler.summary(), indent=2))
@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.raw_dump import RawDump
+from api.schemas import Match, valid_items
+
+SYNC_DIR = os.getenv("PAST_MATCHES_SYNC_DIR", "dados/sync/past_matches")
+SYNC_MAX_AGE_HOURS = float(os.getenv("PAST_MATCHES_MAX_AGE_HOURS", 12))
+
+
+def extract_matches(past_matches_payload):
+    """
+    Lista de jogos de uma resposta do endpoint past-matches (aceita 'data'
+    como lista ou dict). Os jogos são lidos pelo esquema Match
+    (api/schemas.py): os sem id ou com campos fora do formato ficam de fora.
+    """
+    if not isinstance(past_matches_payload, dict):
+        return []
+    matches_data = past_matches_payload.get('data')
+    if isinstance(matches_data, dict):
+        matches_data = matches_data.get('matches')
+    if not isinstance(matches_data, list):
+        return []
+    return [raw for raw, _ in valid_items(matches_data, Match, "matches")]
+
+
+class PastMatchesStore:
+    """
+    Armazenamento persistente dos jogos passados, um arquivo por jogador.
+
+    O manifest.json guarda, para cada jogador, a data e o id do jogo mais
+    recente já armazenado, quantos jogos existem e quando foi a última
+    sincronização. Só o arquivo dos jogadores que ganharam jogos novos é
+    reescrito.
+    """
+
+    def __init__(self, base_dir=SYNC_DIR):
+        self.base_dir = base_dir
+        self.manifest_path = os.path.join(base_dir, "manifest.json")
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json_backend.load(f)
+
+    def _player_path(self, player_id):
+        return os.path.join(self.base_dir, f"{player_id}.json")
+
+    def state(self, player_id):
+        """Estado de sincronização do jogador (ou None se nunca sincronizado)"""
+        return self.manifest.get(str(player_id))
+
+    def is_fresh(self, player_id, max_age_hours=SYNC_MAX_AGE_HOURS):
+        state = self.state(player_id)
+        if not state:
+            return False
+        return time.time() - state['synced_at'] < max_age_hours * 3600
+
+    def load(self, player_id):
+        """Todos os jogos armazenados do jogador, do mais recente para o mais antigo"""
+        path = self._player_path(player_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json_backend.load(f)['matches']
+
+    def load_payload(self, player_id):
+        """Jogos armazenados no mesmo formato da resposta da API ({'data': [...]})"""
+        return {'data': self.load(player_id)}
+
+    def merge(self, player_id, matches, full=False):
+        """
+        Junta jogos recém-baixados aos armazenados e retorna quantos eram novos.
+
+        Os jogos vêm do mais recente para o mais antigo; a varredura para no
+        primeiro jogo mais antigo que o último armazenado e já conhecido
+        (full=True percorre a lista inteira, útil para importar dumps).
+        """
+        player_id = str(player_id)
+        with self._lock:
+            state = self.manifest.get(player_id) or {}
+            newest_date = state.get('newest_date') or ""
+            stored = self.load(player_id) if state else []
+            known_ids = {m['id'] for m in stored}
+
+            new_matches = []
+            for match in matches:
+                if match['id'] in known_ids:
+                    if not full and (match.get('date') or "") <= newest_date:
+                        break
+                    continue
+                new_matches.append(match)
+                known_ids.add(match['id'])
+
+            if new_matches or not state:
+                stored = sorted(new_matches + stored, key=lambda m: m.get('date') or "", reverse=True)
+                json_backend.write_atomic(self._player_path(player_id), {'player_id': player_id, 'matches': stored})
+
+            newest = stored[0] if stored else {}
+            self.manifest[player_id] = {
+                'newest_date': newest.get('date'),
+                'newest_id': newest.get('id'),
+                'count': len(stored),
+                'synced_at': time.time()
+            }
+            json_backend.write_atomic(self.manifest_path, self.manifest)
+            return len(new_matches)
+
+
+def sync_player_past_matches(player_id, fetch_func, store, max_age_hours=SYNC_MAX_AGE_HOURS):
+    """
+    Sincroniza os jogos passados de um jogador no store.
+
+    Jogadores sincronizados há menos de max_age_hours são pulados sem
+    nenhuma requisição. fetch_func deve ignorar o cache HTTP (use_cache=False):
+    o TTL de past-matches (24 h) é maior que a janela da sincronização, e
+    uma resposta do cache marcaria como atualizado um jogador com dados
+    antigos. Retorna um resumo da sincronização, ou None se a busca na API
+    falhou.
+    """
+    if store.is_fresh(player_id, max_age_hours):
+        state = store.state(player_id)
+        return {
+            'new_matches': 0,
+            'total_matches': state['count'],
+            'newest_date': state['newest_date'],
+            'skipped': True
+        }
+
+    payload = fetch_func(player_id)
+    if payload is None:
+        return None
+
+    new_count = store.merge(player_id, extract_matches(payload))
+    state = store.state(player_id)
+    return {
+        'new_matches': new_count,
+        'total_matches': state['count'],
+        'newest_date': state['newest_date'],
+        'skipped': False
+    }
+
+
+def seed_from_raw(raw_path, store):
+    """
+    Popula o store a partir de um dump já coletado (stats2_raw.json ou
+    stats3_raw.json), para que a próxima coleta incremental só traga o que mudou
+    """
+    seeded = 0
+    with RawDump(raw_path) as dump:
+        for _, player_data in dump.iter_players('player_info', 'past_matches'):
+            player_id = (player_data.get('player_info') or {}).get('id')
+            matches = extract_matches(player_data.get('past_matches'))
+            if player_id is None or not matches:
+                continue
+            store.merge(player_id, matches, full=True)
+            seeded += 1
+    return seeded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store incremental de jogos passados")
+    parser.add_argument("--seed", nargs="+", metavar="RAW_JSON",
+                        help="popula o store a partir de dumps existentes (ex.: dados/raw/stats3_raw.json)")
+    args = parser.parse_args()
+
+    past_matches_store = PastMatchesStore()
+    for raw_path in args.seed or []:
+        count = seed_from_raw(raw_path, past_matches_store)
+        print(f"✅ {count} jogadores importados de {raw_path}")
+    print(f"📦 Store com {len(past_matches_store.manifest)} jogadores em {past_matches_store.base_dir}")
@@ -0,0 +1,187 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.player_names import NameResolver
+
+ID_MAP_PATH = os.getenv("PLAYER_ID_MAP_PATH", "dados/clean/player_id_map.json")
+# Fontes de ID de um mesmo jogador: código ATP (stats.csv / Ultimate Tennis),
+# ID numérico da tennis-api (stats2/stats3) e participantId da API de odds
+ID_SOURCES = ("atp_id", "tennis_api_id", "odds_id")
+
+
+class PlayerIdMap:
+    """
+    Tabela persistente que liga os IDs de um mesmo jogador nas três fontes.
+
+    Cada linha tem o nome e os IDs conhecidos (como string). Em memória
+    ficam um dict por fonte (ID -> linha) e um NameResolver, usado só
+    quando um ID ainda não está na tabela; depois de ligado, o ID é
+    encontrado direto pelo dict nas próximas execuções.
+    """
+
+    def __init__(self, path=ID_MAP_PATH):
+        self.path = path
+        self.players = []
+        self.index = {source: {} for source in ID_SOURCES}
+        self.names = NameResolver()
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for row in json_backend.load(f)['players']:
+                    self._append(row)
+
+    def _append(self, row):
+        position = len(self.players)
+        self.players.append(row)
+        self._index_row(position)
+        return row
+
+    def _index_row(self, position):
+        row = self.players[position]
+        for source in ID_SOURCES:
+            if row.get(source) is not None:
+                self.index[source].setdefault(row[source], position)
+        if row.get('name'):
+            self.names.add(row['name'], position)
+
+    def find(self, source, value):
+        """Linha do jogador com esse ID na fonte, ou None"""
+        if value is None:
+            return None
+        position = self.index[source].get(str(value))
+        return None if position is None else self.players[position]
+
+    def lookup(self, source, value, target="atp_id"):
+        """ID do jogador na fonte `target` a partir do ID em `source` (ou None)"""
+        row = self.find(source, value)
+        return row.get(target) if row else None
+
+    def mapping(self, source, target="atp_id"):
+        """Dict {ID em source: ID em target} com todos os jogadores que têm os dois"""
+        return {value: self.players[position][target]
+                for value, position in self.index[source].items()
+                if self.players[position].get(target) is not None}
+
+    def resolve_name(self, name, fuzzy=True):
+        """Linha do jogador com esse nome (ver NameResolver), ou None"""
+        position = self.names.resolve(name, fuzzy=fuzzy)
+        return None if position is None else self.players[position]
+
+    def link(self, name, fuzzy=False, **ids):
+        """
+        Registra que os IDs informados (atp_id=..., tennis_api_id=..., odds_id=...)
+        são do jogador `name` e retorna a linha dele.
+
+        A linha é procurada primeiro pelos IDs e depois pelo nome; IDs que a
+        linha ainda não tinha são preenchidos, e um ID já preenchido com
+        outro valor não é sobrescrito. Sem linha encontrada, uma nova é criada.
+        """
+        ids = {source: str(value) for source, value in ids.items() if value is not None}
+        position = next((self.index[source][value] for source, value in ids.items()
+                         if value in self.index[source]), None)
+        if position is None and name:
+            position = self.names.resolve(name, fuzzy=fuzzy)
+            # Um nome parecido que já tem outro ID da mesma fonte é outro jogador
+            if position is not None and any(self.players[position].get(source) not in (None, value)
+                                            for source, value in ids.items()):
+                position = None
+        if position is None:
+            self.dirty = True
+            return self._append({'name': name, **{source: ids.get(source) for source in ID_SOURCES}})
+
+        row = self.players[position]
+        for source, value in ids.items():
+            if row.get(source) is None:
+                row[source] = value
+                self.index[source].setdefault(value, position)
+                self.dirty = True
+        return row
+
+    def save(self):
+        """Grava a tabela se algo mudou desde a leitura"""
+        if not self.dirty:
+            return False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        json_backend.write_atomic(self.path, {'players': self.players})
+        self.dirty = False
+        return True
+
+    def __len__(self):
+        return len(self.players)
+
+
+def update_from_sources(id_map, stats_csv=None, stats2_raw=None, stats3_raw=None, collected_events=None):
+    """
+    Acrescenta à tabela os jogadores das fontes informadas: códigos ATP do
+    stats.csv, IDs da tennis-api do stats2/stats3 e participantes da API
+    de odds. IDs já presentes não passam pela busca por nome. Retorna
+    quantos jogadores a tabela ganhou.
+    """
+    before = len(id_map)
+    if stats_csv is not None:
+        valid = stats_csv.dropna(subset=['IdJogador', 'NomeJogador'])
+        for atp_id, name in zip(valid['IdJogador'], valid['NomeJogador']):
+            if id_map.find('atp_id', atp_id) is None:
+                id_map.link(name, atp_id=atp_id)
+
+    tennis_players = []
+    for raw in (stats2_raw or {}, (stats3_raw or {}).get('players') or {}):
+        for player_data in raw.values():
+            player_info = player_data.get('player_info') or {}
+            tennis_players.append((player_info.get('id'), player_info.get('name')))
+    for tennis_api_id, name in tennis_players:
+        # Duplas ("Nome/Nome") não têm código ATP individual
+        if tennis_api_id is None or not name or '/' in name:
+            continue
+        if id_map.find('tennis_api_id', tennis_api_id) is None:
+            id_map.link(name, tennis_api_id=tennis_api_id)
+
+    for event in collected_events or []:
+        for participant_key in ('participant1', 'participant2'):
+            participant = event.get(participant_key) or {}
+            odds_id = participant.get('id_api')
+            if odds_id is None or id_map.find('odds_id', odds_id) is not None:
+                continue
+            # Jogador sem estatísticas vem com stats "N/A" (build_event_info)
+            stats = participant.get('stats')
+            atp_id = stats.get('player_id') if isinstance(stats, dict) else None
+            id_map.link(participant.get('name_api'), atp_id=atp_id, odds_id=odds_id)
+    return len(id_map) - before
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json_backend.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualiza a tabela de IDs dos jogadores entre ATP, tennis-api e odds")
+    parser.add_argument("--stats-csv", default="dados/clean/stats.csv")
+    parser.add_argument("--stats2-raw", default="dados/raw/stats2_raw.json")
+    parser.add_argument("--stats3-raw", default="dados/raw/stats3_raw.json")
+    parser.add_argument("--odds", default="dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json")
+    args = parser.parse_args()
+
+    player_id_map = PlayerIdMap()
+    added = update_from_sources(
+        player_id_map,
+        stats_csv=pd.read_csv(args.stats_csv) if os.path.exists(args.stats_csv) else None,
+        stats2_raw=_load_json(args.stats2_raw),
+        stats3_raw=_load_json(args.stats3_raw),
+        collected_events=_load_json(args.odds),
+    )
+    player_id_map.save()
+    linked = {source: len(player_id_map.index[source]) for source in ID_SOURCES}
+    print(f"✅ {added} jogadores novos; {len(player_id_map)} no total em {player_id_map.path}")
+    print(f"   IDs conhecidos: {linked}")
@@ -0,0 +1,161 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Similaridade mínima (coeficiente de Dice entre trigramas) para aceitar um
+# nome pela busca aproximada
+DEFAULT_MIN_SIMILARITY = 0.7
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def fold_accents(text):
+    """Remove acentos e outras marcas ('Cerúndolo' -> 'Cerundolo')"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _name_tokens(name):
+    if not name or name == "N/A":
+        return []
+    # Se o nome está no formato "Sobrenome, Nome", inverter para "Nome Sobrenome"
+    if ',' in name:
+        parts = name.split(',')
+        if len(parts) == 2:
+            name = f"{parts[1].strip()} {parts[0].strip()}"
+    return [token for token in _NON_ALNUM.split(fold_accents(name).lower()) if token]
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name):
+    """
+    Chave compacta do nome: sem acentos, minúsculas, sem espaços/hífens/
+    pontos/aspas, com "Sobrenome, Nome" invertido ('Sinner, Jannik' e
+    'Jannik Sinner' -> 'janniksinner')
+    """
+    return "".join(_name_tokens(name))
+
+
+@lru_cache(maxsize=65536)
+def token_key(name):
+    """Chave com as partes do nome em ordem alfabética, para nomes com a ordem trocada"""
+    return " ".join(sorted(_name_tokens(name)))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameResolver:
+    """
+    Resolve nomes vindos das APIs para o ID canônico do jogador.
+
+    Na construção são pré-calculadas a chave compacta e a chave por tokens
+    de cada nome conhecido, além de um índice invertido de trigramas. A
+    busca tenta as chaves exatas e só então a aproximada, que olha apenas
+    os nomes que compartilham trigramas com o buscado. Cada nome resolvido
+    (inclusive os não encontrados) fica em cache, então o mesmo
+    participante em eventos seguintes sai de um único acesso a dict.
+    """
+
+    def __init__(self, names=None, min_similarity=DEFAULT_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self.by_key = {}
+        self.by_tokens = {}
+        self.trigram_index = {}
+        self.trigram_counts = {}
+        # Posição de cada chave na ordem de registro e comprimentos das chaves (busca parcial)
+        self._order = {}
+        self._lengths = set()
+        self._resolved = {}
+        self.cache_hits = 0
+        self.fuzzy_matches = 0
+        for name, player_id in (names or {}).items():
+            self.add(name, player_id)
+
+    def add(self, name, player_id):
+        """Registra um nome conhecido (o primeiro ID registrado para a mesma chave vale)"""
+        key = normalize_name(name)
+        if not key:
+            return
+        self.by_key.setdefault(key, player_id)
+        self.by_tokens.setdefault(token_key(name), player_id)
+        if key not in self.trigram_counts:
+            self._order[key] = len(self._order)
+            self._lengths.add(len(key))
+            grams = trigrams(key)
+            self.trigram_counts[key] = len(grams)
+            for gram in grams:
+                self.trigram_index.setdefault(gram, []).append(key)
+        self._resolved.clear()
+
+    def _fuzzy(self, key):
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in self.trigram_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        best_key, best_score = None, 0.0
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + self.trigram_counts[candidate])
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_key is not None and best_score >= self.min_similarity:
+            return self.by_key[best_key]
+        return None
+
+    def resolve(self, name, fuzzy=True):
+        """ID canônico do nome, ou None se nenhum nome conhecido casar"""
+        cache_key = (name, fuzzy)
+        if cache_key in self._resolved:
+            self.cache_hits += 1
+            return self._resolved[cache_key]
+
+        key = normalize_name(name)
+        player_id = self.by_key.get(key) if key else None
+        if player_id is None and key:
+            player_id = self.by_tokens.get(token_key(name))
+        if player_id is None and key and fuzzy:
+            player_id = self._fuzzy(key)
+            if player_id is not None:
+                self.fuzzy_matches += 1
+
+        self._resolved[cache_key] = player_id
+        return player_id
+
+    def _partial(self, key):
+        # Chaves que contêm a buscada: todas estão na lista de cada trigrama
+        # interno dela, então basta conferir a menor lista
+        if len(key) >= 3:
+            postings = [self.trigram_index.get(key[i:i + 3], ()) for i in range(len(key) - 2)]
+            candidates = [c for c in min(postings, key=len) if key in c]
+        else:
+            candidates = [c for c in self.by_key if key in c]
+        # Chaves contidas na buscada: substrings dela com o comprimento de alguma chave
+        candidates += [key[i:i + length] for length in self._lengths if length <= len(key)
+                       for i in range(len(key) - length + 1) if key[i:i + length] in self.by_key]
+        if not candidates:
+            return None
+        return self.by_key[min(candidates, key=self._order.__getitem__)]
+
+    def resolve_partial(self, name):
+        """
+        ID pela busca parcial do analise_dados original: a chave exata ou, se
+        não houver, a primeira chave registrada que contém a buscada ou está
+        contida nela ('Player Jr' -> 'Player'). Sem chaves por tokens nem
+        busca aproximada.
+        """
+        cache_key = (name, "partial")
+        if cache_key in self._resolved:
+            self.cache_hits += 1
+            return self._resolved[cache_key]
+        key = normalize_name(name)
+        player_id = self.by_key.get(key)
+        if player_id is None:
+            player_id = self._partial(key)
+        self._resolved[cache_key] = player_id
+        return player_id
+
+    def __len__(self):
+        return len(self.by_key)
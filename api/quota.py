@@ -0,0 +1,381 @@
+import argparse
+import atexit
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+
+QUOTA_PATH = os.getenv("RAPIDAPI_QUOTA_PATH", "dados/cache/api_quota.json")
+QUOTA_ENABLED = os.getenv("RAPIDAPI_QUOTA", "1").lower() not in ("0", "false", "no", "nao", "não")
+# Fração final da cota reservada às requisições de prioridade alta: a partir
+# daí as demais passam a receber a resposta antiga do cache (ou QuotaExceeded)
+QUOTA_RESERVE = float(os.getenv("RAPIDAPI_QUOTA_RESERVE", 0.1))
+# Intervalo máximo (segundos) entre gravações do arquivo de uso
+FLUSH_INTERVAL = float(os.getenv("RAPIDAPI_QUOTA_FLUSH_INTERVAL", 5))
+DAYS_KEPT = 40
+MONTHS_KEPT = 13
+
+# Quanto menor, mais urgente: na fila de cada host e perto do limite da cota
+PRIORITY_CRITICAL = 0   # odds de eventos que começam em breve
+PRIORITY_HIGH = 1       # odds e eventos em geral
+PRIORITY_NORMAL = 2     # torneios, ranking, resultados
+PRIORITY_LOW = 3        # recargas de histórico (past-matches, surface-summary, estatísticas)
+CRITICAL_WINDOW = 60 * 60
+
+# Prioridade padrão por endpoint, casada pelo caminho da URL como os TTLs de
+# api/response_cache.py; endpoints sem regra ficam com PRIORITY_NORMAL
+ENDPOINT_PRIORITIES = [
+    (re.compile(r"/odds$"), PRIORITY_HIGH),
+    (re.compile(r"/events$"), PRIORITY_HIGH),
+    (re.compile(r"/player/past-matches/"), PRIORITY_LOW),
+    (re.compile(r"/player/surface-summary/"), PRIORITY_LOW),
+    (re.compile(r"/player_stats/"), PRIORITY_LOW),
+]
+
+# Cota por host: requisições por dia e por mês (None = sem limite local).
+# Os limites informados pela RapidAPI nos headers x-ratelimit-requests-*
+# também valem, mesmo para hosts fora da tabela.
+HOST_QUOTAS = {}
+
+
+def _load_quotas_from_env():
+    """
+    Lê as cotas de RAPIDAPI_QUOTAS no formato "host=por_dia/por_mês;host2=/por_mês"
+    (qualquer um dos dois limites pode ficar vazio)
+    """
+    raw = os.getenv("RAPIDAPI_QUOTAS", "")
+    for item in raw.split(";"):
+        if "=" not in item:
+            continue
+        host, limit = item.split("=", 1)
+        day, _, month = limit.partition("/")
+        try:
+            HOST_QUOTAS[host.strip()] = {"day": int(day) if day.strip() else None,
+                                         "month": int(month) if month.strip() else None}
+        except ValueError:
+            print(f"Aviso: cota inválida em RAPIDAPI_QUOTAS: '{item}'")
+
+
+_load_quotas_from_env()
+
+
+class QuotaExceeded(requests.exceptions.RequestException):
+    """A requisição foi barrada pela cota e não havia resposta no cache para servir"""
+
+
+def priority_for_url(url):
+    """Prioridade padrão do endpoint da URL"""
+    path = urlsplit(url).path.rstrip("/")
+    for pattern, priority in ENDPOINT_PRIORITIES:
+        if pattern.search(path):
+            return priority
+    return PRIORITY_NORMAL
+
+
+def odds_priority(start_time, now=None):
+    """Prioridade da coleta das odds de um evento que começa em `start_time` (unix)"""
+    if start_time is None:
+        return PRIORITY_HIGH
+    now = time.time() if now is None else now
+    return PRIORITY_CRITICAL if start_time - now <= CRITICAL_WINDOW else PRIORITY_HIGH
+
+
+def key_id(api_key):
+    """Identificador da chave da API no arquivo de uso (a chave em si não é gravada)"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+class PriorityGate:
+    """
+    Fila de espera por prioridade de um host.
+
+    Só uma requisição por vez passa pelo trecho protegido (a checagem da
+    cota e a espera no token bucket); as que estão esperando saem em ordem
+    de prioridade e, dentro da mesma prioridade, de chegada.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._busy = False
+        self._seq = itertools.count()
+
+    @contextmanager
+    def slot(self, priority):
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._heap, entry)
+            while self._busy or self._heap[0] != entry:
+                self._cond.wait()
+            heapq.heappop(self._heap)
+            self._busy = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QuotaManager:
+    """
+    Contabilidade e controle de cota de todas as requisições à RapidAPI.
+
+    O uso é contado por chave da API e host, por dia e por mês (UTC), num
+    arquivo JSON persistente: a cada FLUSH_INTERVAL segundos com uso novo
+    (e ao fim do processo) o arquivo é relido e recebe os incrementos desta execução,
+    então execuções diferentes somam no mesmo arquivo. O restante da cota
+    informado pela RapidAPI nos headers de resposta também é guardado.
+
+    Perto do limite (a última fração QUOTA_RESERVE da cota) só passam
+    requisições de prioridade PRIORITY_HIGH ou mais urgentes; no limite,
+    nenhuma. As barradas recebem QuotaExceeded, que api/http_client.py
+    troca pela resposta antiga do cache quando existe. Requisições iguais
+    em andamento ao mesmo tempo viram uma só (shared).
+    """
+
+    def __init__(self, path=QUOTA_PATH, limits=None, reserve=QUOTA_RESERVE, flush_interval=FLUSH_INTERVAL,
+                 clock=time.time):
+        self.path = path
+        self.limits = HOST_QUOTAS if limits is None else limits
+        self.reserve = reserve
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.sent = 0
+        self.deduplicated = 0
+        self.served_stale = 0
+        self.rejected = 0
+        self._usage = self._read()
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._gates = {}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            print(f"Aviso: arquivo de uso da cota inválido ({self.path}): {e}. Recomeçando a contagem.")
+            return {}
+
+    def _periods(self, now=None):
+        moment = time.gmtime(self.clock() if now is None else now)
+        month = f"{moment.tm_year:04d}-{moment.tm_mon:02d}"
+        return f"{month}-{moment.tm_mday:02d}", month
+
+    @staticmethod
+    def _entry(usage, api_key_id, host):
+        return usage.setdefault(api_key_id, {}).setdefault(host, {"days": {}, "months": {}})
+
+    def usage(self, api_key, host):
+        """Uso da chave no host hoje e no mês, com os limites locais e o restante informado pela API"""
+        day, month = self._periods()
+        with self._lock:
+            entry = self._usage.get(key_id(api_key), {}).get(host, {})
+            limits = self.limits.get(host, {})
+            return {
+                "day": entry.get("days", {}).get(day, 0),
+                "month": entry.get("months", {}).get(month, 0),
+                "day_limit": limits.get("day"),
+                "month_limit": limits.get("month"),
+                "api_limit": entry.get("api_limit"),
+                "api_remaining": entry.get("api_remaining"),
+            }
+
+    def used_fraction(self, api_key, host):
+        """Maior fração já usada entre as cotas do host (0 se nenhuma é conhecida)"""
+        usage = self.usage(api_key, host)
+        fractions = [0.0]
+        for used, limit in ((usage["day"], usage["day_limit"]), (usage["month"], usage["month_limit"])):
+            if limit:
+                fractions.append(used / limit)
+        if usage["api_limit"] and usage["api_remaining"] is not None:
+            fractions.append(1 - usage["api_remaining"] / usage["api_limit"])
+        return max(fractions)
+
+    def allows(self, api_key, host, priority=PRIORITY_NORMAL):
+        """True se a cota ainda comporta uma requisição com essa prioridade"""
+        used = self.used_fraction(api_key, host)
+        if used >= 1:
+            return False
+        return used < 1 - self.reserve or priority <= PRIORITY_HIGH
+
+    def gate(self, host):
+        """Fila por prioridade do host"""
+        with self._lock:
+            return self._gates.setdefault(host, PriorityGate())
+
+    def record(self, api_key, host):
+        """Conta uma requisição enviada pela chave ao host"""
+        day, month = self._periods()
+        api_key_id = key_id(api_key)
+        with self._lock:
+            for usage in (self._usage, self._pending):
+                entry = self._entry(usage, api_key_id, host)
+                entry["days"][day] = entry["days"].get(day, 0) + 1
+                entry["months"][month] = entry["months"].get(month, 0) + 1
+            # Até a próxima resposta com headers, o restante informado pela API é estimado
+            current = self._usage[api_key_id][host]
+            if current.get("api_remaining"):
+                current["api_remaining"] -= 1
+            self.sent += 1
+            should_flush = time.monotonic() - self._flushed_at >= self.flush_interval
+        if should_flush:
+            self.flush()
+
+    def observe(self, api_key, host, response_headers):
+        """Guarda o limite e o restante da cota dos headers x-ratelimit-requests-* da RapidAPI"""
+        try:
+            api_limit = int(response_headers.get("x-ratelimit-requests-limit"))
+            api_remaining = int(response_headers.get("x-ratelimit-requests-remaining"))
+        except (TypeError, ValueError):
+            return
+        api_key_id = key_id(api_key)
+        with self._lock:
+            for usage in (self._usage, self._pending):
+                entry = self._entry(usage, api_key_id, host)
+                entry["api_limit"], entry["api_remaining"] = api_limit, api_remaining
+                entry["observed_at"] = self.clock()
+
+    def flush(self):
+        """Soma os incrementos pendentes ao arquivo de uso (relido do disco) e o regrava"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending, self._flushed_at = self._pending, {}, time.monotonic()
+            usage = self._read()
+            for api_key_id, hosts in pending.items():
+                for host, delta in hosts.items():
+                    entry = self._entry(usage, api_key_id, host)
+                    for period in ("days", "months"):
+                        for name, count in delta[period].items():
+                            entry[period][name] = entry[period].get(name, 0) + count
+                    if "api_remaining" in delta and delta.get("observed_at", 0) >= entry.get("observed_at", 0):
+                        entry.update({k: delta[k] for k in ("api_limit", "api_remaining", "observed_at")})
+                    entry["days"] = dict(sorted(entry["days"].items())[-DAYS_KEPT:])
+                    entry["months"] = dict(sorted(entry["months"].items())[-MONTHS_KEPT:])
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            json_backend.write_atomic(self.path, usage)
+            self._usage = usage
+
+    def shared(self, key, func):
+        """
+        Executa func() para a chave, ou, se uma chamada com a mesma chave já
+        está em andamento, espera por ela e devolve uma cópia do resultado
+        """
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            owner = call is None
+            if owner:
+                call = self._inflight[key] = _InFlight()
+            else:
+                self.deduplicated += 1
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def report(self):
+        """Uso de hoje e do mês por chave e host, como está no arquivo mais os incrementos pendentes"""
+        day, month = self._periods()
+        with self._lock:
+            rows = []
+            for api_key_id, hosts in self._usage.items():
+                for host, entry in hosts.items():
+                    limits = self.limits.get(host, {})
+                    rows.append({
+                        "key": api_key_id,
+                        "host": host,
+                        "day": entry["days"].get(day, 0),
+                        "day_limit": limits.get("day"),
+                        "month": entry["months"].get(month, 0),
+                        "month_limit": limits.get("month"),
+                        "api_remaining": entry.get("api_remaining"),
+                        "api_limit": entry.get("api_limit"),
+                    })
+            return rows
+
+    def summary(self):
+        """Resumo desta execução e do uso do mês por host"""
+        lines = [f"Cota RapidAPI: {self.sent} requisições enviadas, {self.deduplicated} deduplicadas, "
+                 f"{self.rejected} barradas pela cota ({self.served_stale} servidas com a resposta antiga do cache)"]
+        for row in self.report():
+            limit = f"/{row['month_limit']}" if row["month_limit"] else ""
+            remaining = (f", restante pela API {row['api_remaining']}/{row['api_limit']}"
+                         if row["api_remaining"] is not None else "")
+            lines.append(f"  {row['host']} (chave {row['key'][:6]}): hoje {row['day']}, "
+                         f"mês {row['month']}{limit}{remaining}")
+        return "\n".join(lines)
+
+
+_quota = None
+_quota_lock = threading.Lock()
+
+
+def get_quota():
+    """Retorna o gerenciador de cota compartilhado (None se desabilitado com RAPIDAPI_QUOTA=0)"""
+    global _quota
+    if not QUOTA_ENABLED:
+        return None
+    if _quota is None:
+        with _quota_lock:
+            if _quota is None:
+                _quota = QuotaManager()
+                atexit.register(_quota.flush)
+    return _quota
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra o uso da cota da RapidAPI por chave e host")
+    parser.add_argument("--path", default=QUOTA_PATH)
+    args = parser.parse_args()
+
+    rows = QuotaManager(args.path).report()
+    if not rows:
+        print(f"Nenhum uso registrado em {args.path}.")
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Rate limiter do tipo token bucket, seguro para threads e para asyncio.
+
+    `rate` é a quantidade de requisições liberadas por segundo e `burst` o
+    máximo de requisições que podem sair de uma vez após um período ocioso.
+    Cada chamada reserva um token e devolve quanto tempo precisa esperar,
+    então chamadas concorrentes ficam espaçadas sem disputar o lock.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Reserva um token e retorna quantos segundos esperar antes de usá-lo"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Bloqueia a thread atual até haver um token disponível"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Versão assíncrona de acquire(), não bloqueia o event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,328 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+# Níveis de chaves indexados: 3 cobre players -> jogador -> seção (stats3_raw)
+# e tournament_info -> tournament_raw_data -> data
+INDEX_DEPTH = 3
+
+# Strings JSON (com escapes) e a pontuação estrutural; o que está dentro de
+# uma string nunca é confundido com chaves/colchetes
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]:,]')
+# Próximo colchete/chave fora de strings: pula os valores abaixo da
+# profundidade do índice sem passar pelo laço em Python a cada string
+_BRACKET = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]])')
+_NON_SPACE = re.compile(rb"\S")
+_QUOTE, _COLON, _COMMA = ord('"'), ord(":"), ord(",")
+_OPEN = (ord("{"), ord("["))
+_OBJECT = ord("{")
+_SPACES = b" \t\r\n"
+
+
+def _scalar_end(data, position):
+    """Fim de um valor escalar que termina antes do separador em `position` (sem o espaço em branco)"""
+    while data[position - 1] in _SPACES:
+        position -= 1
+    return position
+
+
+def _container_end(data, start):
+    """Posição logo depois do fim do objeto/lista que começa em `start`"""
+    level = 0
+    for match in _BRACKET.finditer(data, start):
+        level += 1 if data[match.start(1)] in _OPEN else -1
+        if level == 0:
+            return match.end(1)
+    raise ValueError("Documento JSON incompleto: objeto ou lista sem fechamento")
+
+
+def build_index(data, depth=INDEX_DEPTH):
+    """
+    Índice de posições (em bytes) de um documento JSON: para cada chave dos
+    primeiros `depth` níveis de objetos, o trecho [início, fim) do valor.
+
+    Retorna o nó raiz {"span": [início, fim], "keys": {chave: nó}}; nós de
+    objetos até `depth` níveis têm "keys". O documento é percorrido só na
+    estrutura (strings e pontuação), sem montar os valores, e os valores
+    mais fundos que o índice são pulados direto até o fechamento.
+    """
+    root = {"keys": {}}
+    # Cada nível aberto: [é objeto, nó, chave atual, início do valor, início do contêiner]
+    stack = []
+    position = 0
+    while True:
+        match = _TOKEN.search(data, position)
+        if match is None:
+            raise ValueError("Documento JSON incompleto: o objeto de nível superior não foi fechado")
+        start, position = match.start(), match.end()
+        char = data[start]
+        if char == _QUOTE:
+            top = stack[-1] if stack else None
+            if top is not None and top[0] and top[2] is None:
+                top[2] = json.loads(match.group())
+            continue
+        if char in _OPEN:
+            if not stack:
+                stack.append([char == _OBJECT, root, None, None, start])
+                continue
+            parent = stack[-1]
+            if len(stack) < depth and parent[0] and char == _OBJECT:
+                stack.append([True, {"keys": {}}, None, None, start])
+                continue
+            # Lista ou objeto abaixo da profundidade do índice: só o trecho inteiro
+            position = _container_end(data, start)
+            if parent[0] and parent[2] is not None:
+                parent[1]["keys"][parent[2]] = {"span": [start, position]}
+                parent[2] = None
+            continue
+
+        top = stack[-1]
+        if char == _COLON:
+            top[3] = _NON_SPACE.search(data, position).start()
+        elif char == _COMMA:
+            if top[0] and top[2] is not None:
+                top[1]["keys"][top[2]] = {"span": [top[3], _scalar_end(data, start)]}
+                top[2] = None
+        else:
+            # Fecha o objeto: último valor escalar, e o próprio objeto como valor do pai
+            if top[0] and top[2] is not None:
+                top[1]["keys"][top[2]] = {"span": [top[3], _scalar_end(data, start)]}
+            stack.pop()
+            top[1]["span"] = [top[4], position]
+            if not stack:
+                return root
+            parent = stack[-1]
+            parent[1]["keys"][parent[2]] = top[1]
+            parent[2] = None
+
+
+def _players_path(root):
+    """Onde ficam os jogadores: em 'players' (stats3_raw) ou no nível superior (stats2_raw)"""
+    return ("players",) if "keys" in root["keys"].get("players", {}) else ()
+
+
+def save_index(root, index_path, size, mtime_ns):
+    """
+    Grava o índice: uma linha de cabeçalho (JSON) com a versão, o tamanho e
+    o mtime do dump e a árvore sem os jogadores, e depois uma linha por
+    jogador, "<chave JSON>\t<nó JSON>", em ordem de chave, para a busca
+    binária no arquivo mapeado
+    """
+    players_path = _players_path(root)
+    players = root
+    for key in players_path:
+        players = players["keys"][key]
+    players = players["keys"]
+    # A árvore do cabeçalho fica sem as chaves dos jogadores (o trecho do contêiner continua)
+    header_root = {"span": root["span"]} if not players_path else \
+        {"span": root["span"], "keys": {**root["keys"], "players": {"span": root["keys"]["players"]["span"]}}}
+    header = {"version": INDEX_VERSION, "size": size, "mtime_ns": mtime_ns,
+              "players_path": list(players_path), "root": header_root}
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for key in sorted(players):
+            f.write(f"{json.dumps(key)}\t{json.dumps(players[key], separators=(',', ':'))}\n")
+    os.replace(tmp_path, index_path)
+
+
+class RawDump:
+    """
+    Leitura sob demanda de um dump bruto (stats3_raw.json, stats2_raw.json...).
+
+    O arquivo JSON continua o mesmo; ao lado dele fica um índice
+    (<arquivo>.idx) com a posição em bytes do valor de cada chave dos
+    primeiros níveis: cada jogador e cada seção dele (player_info,
+    surface_summary, past_matches...), e o bloco do torneio. O dump e o
+    índice são abertos com mmap: a entrada de um jogador é achada por busca
+    binária nas linhas do índice e só o trecho pedido do dump é
+    decodificado, então ler um jogador custa o tamanho dele, não o do
+    arquivo nem o número de jogadores. O índice é refeito quando o tamanho
+    ou o mtime do dump não batem mais.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Arquivo vazio: {path}")
+        self._index_file = None
+        self._load_index()
+
+    def _load_index(self):
+        stat = os.stat(self.path)
+        expected = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+        if self._open_index(expected):
+            return
+        root = build_index(self._data)
+        try:
+            save_index(root, self.index_path, stat.st_size, stat.st_mtime_ns)
+            if self._open_index(expected):
+                return
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o índice {self.index_path}: {e}")
+        # Sem índice em disco: fica com a árvore inteira em memória
+        self._players = None
+        self.index = root
+        self.players_path = _players_path(root)
+
+    def _open_index(self, expected):
+        """Abre o índice em disco se ele corresponde ao dump (versão, tamanho, mtime)"""
+        try:
+            index_file = open(self.index_path, "rb")
+        except OSError:
+            return False
+        try:
+            players = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            header_end = players.find(b"\n") + 1
+            header = json.loads(players[:header_end])
+            if (header.get("version"), header.get("size"), header.get("mtime_ns")) != expected:
+                raise ValueError("índice desatualizado")
+        except (OSError, ValueError):
+            index_file.close()
+            return False
+        self._index_file, self._players, self._players_start = index_file, players, header_end
+        self.index = header["root"]
+        self.players_path = tuple(header["players_path"])
+        return True
+
+    def _player_entry(self, key):
+        """Nó do índice de um jogador (busca binária nas linhas ordenadas) ou None"""
+        if self._players is None:
+            return self._tree_node(*self.players_path).get("keys", {}).get(key)
+        players = self._players
+        low, high = self._players_start, len(players)
+        while low < high:
+            middle = (low + high) // 2
+            start = players.rfind(b"\n", low, middle) + 1 or low
+            end = players.find(b"\n", middle)
+            line_key, node = players[start:end].split(b"\t", 1)
+            line_key = json.loads(line_key)
+            if line_key == key:
+                return json.loads(node)
+            if line_key < key:
+                low = end + 1
+            else:
+                high = start
+        return None
+
+    def _tree_node(self, *path):
+        node = self.index
+        for key in path:
+            node = node["keys"][key]
+        return node
+
+    def _node(self, *path):
+        try:
+            depth = len(self.players_path)
+            if len(path) > depth and path[:depth] == self.players_path:
+                node = self._player_entry(path[depth])
+                if node is None:
+                    raise KeyError(path[depth])
+                for key in path[depth + 1:]:
+                    node = node["keys"][key]
+                return node
+            return self._tree_node(*path)
+        except KeyError:
+            raise KeyError(f"{'/'.join(map(str, path))} não está no índice de {self.path}") from None
+
+    def __contains__(self, path):
+        try:
+            self._node(*((path,) if isinstance(path, str) else path))
+            return True
+        except KeyError:
+            return False
+
+    def keys(self, *path):
+        """Chaves indexadas do objeto em `path` (vazio para valores abaixo da profundidade do índice)"""
+        if path == self.players_path:
+            return self.player_keys()
+        return list(self._node(*path).get("keys", {}))
+
+    def raw(self, *path):
+        """Bytes do valor em `path`, direto do mmap"""
+        start, end = self._node(*path)["span"]
+        return self._data[start:end]
+
+    def get(self, *path):
+        """Valor em `path`, decodificando só o trecho dele"""
+        return json_backend.loads(self.raw(*path))
+
+    def player_keys(self):
+        """Chaves dos jogadores, na ordem do dump (dentro de 'players' no stats3_raw, no nível superior no stats2_raw)"""
+        if self._players is None:
+            return list(self._tree_node(*self.players_path).get("keys", {}))
+        entries = []
+        for line in self._players[self._players_start:].splitlines():
+            key, node = line.split(b"\t", 1)
+            entries.append((json.loads(node)["span"][0], json.loads(key)))
+        return [key for _, key in sorted(entries)]
+
+    def player(self, key, *sections):
+        """Dados de um jogador; com `sections`, só essas seções (as ausentes ficam de fora)"""
+        if not sections:
+            return self.get(*self.players_path, key)
+        entry = self._node(*self.players_path, key).get("keys", {})
+        return {section: json_backend.loads(self._data[slice(*entry[section]["span"])])
+                for section in sections if section in entry}
+
+    def iter_players(self, *sections):
+        """(chave, dados) de cada jogador, um por vez (ver player)"""
+        for key in self.player_keys():
+            yield key, self.player(key, *sections)
+
+    def tournament(self):
+        """Bloco tournament_raw_data do stats3_raw (None se o dump não tem)"""
+        if ("tournament_info", "tournament_raw_data") not in self:
+            return None
+        return self.get("tournament_info", "tournament_raw_data")
+
+    def close(self):
+        if self._index_file is not None:
+            self._players.close()
+            self._index_file.close()
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_index(path):
+    """(Re)gera o índice do dump, se estiver desatualizado, e retorna quantos jogadores ele tem"""
+    with RawDump(path) as dump:
+        return len(dump.player_keys())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexa dumps brutos e lê um jogador ou o bloco do torneio")
+    parser.add_argument("path", help="dump bruto (ex.: dados/raw/stats3_raw.json)")
+    parser.add_argument("--player", help="chave do jogador a mostrar (ex.: Jannik_Sinner_47275)")
+    parser.add_argument("--section", nargs="*", default=[], help="só essas seções do jogador")
+    parser.add_argument("--tournament", action="store_true", help="mostra o bloco tournament_raw_data")
+    args = parser.parse_args()
+
+    with RawDump(args.path) as raw_dump:
+        if args.player:
+            print(json.dumps(raw_dump.player(args.player, *args.section), indent=2, ensure_ascii=False))
+        elif args.tournament:
+            print(json.dumps(raw_dump.tournament(), indent=2, ensure_ascii=False))
+        else:
+            print(f"{len(raw_dump.player_keys())} jogadores indexados em {raw_dump.index_path}")
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "dados/cache/http_cache.sqlite")
+CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+CACHE_ENABLED = os.getenv("HTTP_CACHE", "1").lower() not in ("0", "false", "no", "nao", "não")
+
+# TTL (segundos) por endpoint, casado pelo caminho da URL. A primeira regra
+# que casar vale; endpoints sem regra não são guardados no cache.
+ENDPOINT_TTLS = [
+    (re.compile(r"/ranking/"), 60 * 60),                    # ranking: 1 h
+    (re.compile(r"/tournament/results/"), 6 * 60 * 60),     # resultados do torneio: 6 h
+    (re.compile(r"/player/surface-summary/"), 24 * 60 * 60),
+    (re.compile(r"/player/past-matches/"), 24 * 60 * 60),
+    (re.compile(r"/player_stats/"), 7 * 24 * 60 * 60),     # Ultimate Tennis, estatísticas da temporada
+    (re.compile(r"/tournaments$"), 6 * 60 * 60),
+    (re.compile(r"/events$"), 5 * 60),
+    (re.compile(r"/odds$"), 60),
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body BLOB NOT NULL,
+    headers TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+
+def ttl_for_url(url):
+    """Retorna o TTL configurado para a URL, ou None se o endpoint não é cacheado"""
+    path = urlsplit(url).path.rstrip("/")
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return None
+
+
+def cache_key(url, params=None):
+    """Chave do cache: URL + parâmetros ordenados (os headers, com a chave da API, ficam de fora)"""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache persistente de respostas HTTP em SQLite.
+
+    Cada entrada guarda o corpo, ETag/Last-Modified e o instante de
+    expiração. Entradas expiradas não são apagadas: continuam disponíveis
+    para revalidação condicional (If-None-Match / If-Modified-Since). Quando
+    o arquivo passa de `max_bytes`, as entradas acessadas há mais tempo são
+    removidas (LRU). O relógio pode ser trocado (ex.: simulação).
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def lookup(self, key):
+        """Retorna a entrada (dict) do cache, fresca ou expirada, ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, headers, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, body, headers, etag, last_modified, expires_at = row
+        return {
+            "url": url,
+            "body": body,
+            "headers": json.loads(headers),
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": expires_at,
+            "fresh": expires_at > self.clock()
+        }
+
+    def touch(self, key, ttl=None):
+        """Atualiza o último acesso (LRU) e, se ttl for informado, renova a validade"""
+        now = self.clock()
+        with self._lock:
+            if ttl is None:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            else:
+                self._conn.execute("UPDATE responses SET last_access = ?, expires_at = ? WHERE key = ?",
+                                   (now, now + ttl, key))
+            self._conn.commit()
+
+    def store(self, key, url, response, ttl):
+        """Guarda uma resposta 200 no cache e aplica a eviction por tamanho"""
+        body = response.content
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() in ("content-type", "etag", "last-modified")}
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, body, headers, etag, last_modified, stored_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, json.dumps(headers), response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), now, now + ttl, now, len(body))
+            )
+            self._conn.commit()
+            self.stores += 1
+        self.evict()
+
+    def evict(self):
+        """Remove as entradas menos usadas até o cache ficar abaixo de 90% de max_bytes"""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+            to_delete = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                to_delete.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+            self._conn.commit()
+            self.evictions += len(to_delete)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def summary(self):
+        """Resumo dos contadores da execução atual"""
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0
+        return (f"Cache HTTP: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), "
+                f"{self.revalidated} revalidadas, {self.stores} gravadas, {self.evictions} removidas")
+
+
+def build_cached_response(entry):
+    """Monta um requests.Response a partir de uma entrada do cache"""
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = entry["url"]
+    response._content = entry["body"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = "utf-8"
+    response.from_cache = True
+    return response
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Retorna o cache compartilhado (None se desabilitado com HTTP_CACHE=0)"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,332 @@
+"""
+Esquemas tipados dos payloads das APIs e dos dumps em dados/.
+
+Cada classe é um dataclass com slots e um from_dict que valida os tipos
+enquanto converte o dicionário decodificado: um campo fora do formato
+levanta SchemaError com o caminho dele (ex.: "markets[3].outcomes[0].bookmakers"),
+em vez de virar um .get(...) que devolve None lá na frente. Os contêineres
+que a API manda ora como lista, ora como dicionário indexado (markets,
+outcomes, events) aceitam os dois, como o código de antes.
+"""
+import argparse
+import os
+import sys
+from dataclasses import dataclass, field
+
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+
+_STR = (str,)
+_INT = (int,)
+_LIST = (list,)
+_ID = (int, str)
+_NUMBER = (int, float)
+_SCALAR = (str, int, float)
+
+
+class SchemaError(ValueError):
+    """Payload fora do formato esperado; a mensagem traz o caminho do campo"""
+
+
+def _path_text(path):
+    """Texto do caminho: os caminhos vão como cadeias (pai, chave/índice) e só viram texto no erro"""
+    parts = []
+    while isinstance(path, tuple):
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return path + "".join(reversed(parts))
+
+
+def _type_names(types):
+    return "/".join(t.__name__ for t in types)
+
+
+def _check(value, types, path, key, required=False):
+    """value (o campo `key` em `path`), se for None (e não obrigatório) ou de um dos tipos; senão SchemaError"""
+    if value is None:
+        if required:
+            raise SchemaError(f"{_path_text((path, key))}: campo obrigatório ausente")
+        return None
+    # Tipo exato: bool não passa por int
+    if type(value) not in types:
+        raise SchemaError(f"{_path_text((path, key))}: esperado {_type_names(types)}, veio {type(value).__name__}")
+    return value
+
+
+def _object(value, path):
+    if type(value) is not dict:
+        raise SchemaError(f"{_path_text(path)}: esperado objeto, veio {type(value).__name__}")
+    return value
+
+
+def _items(value, path):
+    """Itens de um contêiner em lista ou em dicionário indexado (None = vazio)"""
+    if value is None:
+        return []
+    if type(value) is dict:
+        return list(value.values())
+    if type(value) is list:
+        return value
+    raise SchemaError(f"{_path_text(path)}: esperado lista ou objeto, veio {type(value).__name__}")
+
+
+def valid_items(items, schema, path="items"):
+    """Pares (item, objeto tipado) dos itens de uma lista que passam no esquema; os demais ficam de fora"""
+    for i, item in enumerate(items):
+        try:
+            yield item, schema.from_dict(item, (path, i))
+        except SchemaError:
+            continue
+
+
+# --- tennis-api (stats3/stats2): resultados do torneio, surface summary e past matches ---
+
+# Campos que Match e PlayerRef leem de cada jogo/jogador (a leitura rápida
+# dos resultados do torneio em api/stats3.py usa os mesmos conjuntos)
+MATCH_FIELDS = frozenset({"id", "date", "roundId", "player1Id", "player2Id", "tournamentId",
+                          "match_winner", "result", "player1", "player2"})
+PLAYER_FIELDS = frozenset({"id", "name", "countryAcr"})
+
+
+@dataclass(slots=True)
+class PlayerRef:
+    id: int | str | None
+    name: str | None
+    country: str | None = None
+
+    @classmethod
+    def from_dict(cls, data, path="player"):
+        data = _object(data, path)
+        return cls(_check(data.get("id"), _ID, path, "id"),
+                   _check(data.get("name"), _STR, path, "name"),
+                   _check(data.get("countryAcr"), _STR, path, "countryAcr"))
+
+
+@dataclass(slots=True)
+class Match:
+    id: int | str
+    date: str | None
+    round_id: int | None
+    tournament_id: int | None
+    player1_id: int | None
+    player2_id: int | None
+    winner_id: int | None
+    result: str | None
+    player1: PlayerRef | None
+    player2: PlayerRef | None
+
+    @classmethod
+    def from_dict(cls, data, path="match"):
+        data = _object(data, path)
+        player1, player2 = data.get("player1"), data.get("player2")
+        return cls(
+            _check(data.get("id"), _ID, path, "id", required=True),
+            _check(data.get("date"), _STR, path, "date"),
+            _check(data.get("roundId"), _INT, path, "roundId"),
+            _check(data.get("tournamentId"), _INT, path, "tournamentId"),
+            _check(data.get("player1Id"), _INT, path, "player1Id"),
+            _check(data.get("player2Id"), _INT, path, "player2Id"),
+            _check(data.get("match_winner"), _INT, path, "match_winner"),
+            _check(data.get("result"), _STR, path, "result"),
+            PlayerRef.from_dict(player1, (path, "player1")) if player1 is not None else None,
+            PlayerRef.from_dict(player2, (path, "player2")) if player2 is not None else None,
+        )
+
+
+@dataclass(slots=True)
+class TournamentResults:
+    """Resposta de tournament/results: jogos por chave (singles, doubles, qualifying...)"""
+    draws: dict[str, list[Match]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, payload, path="tournament"):
+        path = (path, "data")
+        data = _object(_object(payload, path[0]).get("data") or {}, path)
+        return cls({key: [Match.from_dict(match, ((path, key), i))
+                          for i, match in enumerate(_check(matches, _LIST, path, key) or [])]
+                    for key, matches in data.items()})
+
+
+@dataclass(slots=True)
+class SurfaceRecord:
+    year: int | None
+    court_id: int | None
+    court: str | None
+    wins: int | None
+    losses: int | None
+
+
+@dataclass(slots=True)
+class SurfaceSummary:
+    """Vitórias e derrotas por ano e quadra (surface_summary, em lista ou em {'data': [...]})"""
+    records: list[SurfaceRecord] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, payload, path="surface_summary"):
+        years = payload.get("data") if type(payload) is dict else payload
+        records = []
+        for i, year_item in enumerate(_check(years, _LIST, path, "data") or []):
+            year_path = ((path, "data"), i)
+            year_item = _object(year_item, year_path)
+            year = _check(year_item.get("year"), _INT, year_path, "year")
+            for j, surface in enumerate(_check(year_item.get("surfaces"), _LIST, year_path, "surfaces") or []):
+                surface_path = ((year_path, "surfaces"), j)
+                surface = _object(surface, surface_path)
+                records.append(SurfaceRecord(year,
+                                             _check(surface.get("courtId"), _INT, surface_path, "courtId"),
+                                             _check(surface.get("court"), _STR, surface_path, "court"),
+                                             _check(surface.get("courtWins"), _INT, surface_path, "courtWins"),
+                                             _check(surface.get("courtLosses"), _INT, surface_path, "courtLosses")))
+        return cls(records)
+
+
+@dataclass(slots=True)
+class PastMatches:
+    """Resposta de past-matches ('data' como lista de jogos ou como {'matches': [...]})"""
+    matches: list[Match] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, payload, path="past_matches"):
+        data = _object(payload, path).get("data")
+        key = "data"
+        if type(data) is dict:
+            data, path, key = data.get("matches"), (path, "data"), "matches"
+        return cls([Match.from_dict(match, ((path, key), i))
+                    for i, match in enumerate(_check(data, _LIST, path, key) or [])])
+
+
+# --- API de odds: torneios, eventos e mercados ---
+
+@dataclass(slots=True)
+class OddsTournament:
+    tournament_id: int | str
+    name: str
+    category: str | None
+
+    @classmethod
+    def from_dict(cls, data, path="tournament"):
+        data = _object(data, path)
+        return cls(_check(data.get("tournamentId"), _ID, path, "tournamentId", required=True),
+                   _check(data.get("name", ""), _STR, path, "name"),
+                   _check(data.get("categoryName"), _STR, path, "categoryName"))
+
+
+@dataclass(slots=True)
+class Event:
+    event_id: int | str
+    status: str | None
+    date: str | None
+    time: str | None
+    participant1: str | None
+    participant1_id: int | str | None
+    participant2: str | None
+    participant2_id: int | str | None
+    bookmaker_count: int | None
+    start_time: int | float | None
+
+    @classmethod
+    def from_dict(cls, data, path="event"):
+        data = _object(data, path)
+        return cls(
+            _check(data.get("eventId"), _ID, path, "eventId", required=True),
+            _check(data.get("eventStatus"), _STR, path, "eventStatus"),
+            _check(data.get("date"), _STR, path, "date"),
+            _check(data.get("time"), _STR, path, "time"),
+            _check(data.get("participant1"), _STR, path, "participant1"),
+            _check(data.get("participant1Id"), _ID, path, "participant1Id"),
+            _check(data.get("participant2"), _STR, path, "participant2"),
+            _check(data.get("participant2Id"), _ID, path, "participant2Id"),
+            _check(data.get("bookmakerCount"), _INT, path, "bookmakerCount"),
+            _check(data.get("startTime"), _NUMBER, path, "startTime"),
+        )
+
+
+@dataclass(slots=True)
+class OddsOutcome:
+    name: str | int | float | None
+    prices: dict[str, float | None]
+
+    @classmethod
+    def from_dict(cls, data, path="outcome"):
+        data = _object(data, path)
+        bookmakers = data.get("bookmakers", {})
+        if type(bookmakers) is not dict:
+            _object(bookmakers, (path, "bookmakers"))
+        # Um outcome por casa: a checagem fica em linha e o caminho só é montado no erro
+        prices = {}
+        for bookmaker, quote in bookmakers.items():
+            price = quote.get("price") if type(quote) is dict else _object(quote, ((path, "bookmakers"), bookmaker))
+            if price is not None and type(price) not in _NUMBER:
+                _check(price, _NUMBER, ((path, "bookmakers"), bookmaker), "price")
+            prices[bookmaker] = price
+        return cls(_check(data.get("outcomeName", "N/A"), _SCALAR, path, "outcomeName"), prices)
+
+
+@dataclass(slots=True)
+class OddsMarket:
+    name: str | None
+    short_name: str | None
+    handicap: str | int | float | None
+    odds_type: str | None
+    outcomes: list[OddsOutcome]
+
+    @classmethod
+    def from_dict(cls, data, path="market"):
+        data = _object(data, path)
+        name = _check(data.get("marketName", "N/A"), _STR, path, "marketName")
+        outcomes_path = (path, "outcomes")
+        return cls(name,
+                   _check(data.get("marketNameShort", name), _STR, path, "marketNameShort"),
+                   _check(data.get("handicap"), _SCALAR, path, "handicap"),
+                   _check(data.get("oddsType", "N/A"), _STR, path, "oddsType"),
+                   [OddsOutcome.from_dict(outcome, (outcomes_path, i))
+                    for i, outcome in enumerate(_items(data.get("outcomes"), outcomes_path))])
+
+
+@dataclass(slots=True)
+class EventOdds:
+    """Resposta de get_odds de um evento: mercados com os outcomes e o preço de cada casa"""
+    markets: list[OddsMarket] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, payload, path="odds"):
+        markets = _object(payload, path).get("markets")
+        path = (path, "markets")
+        return cls([OddsMarket.from_dict(market, (path, i)) for i, market in enumerate(_items(markets, path))])
+
+    def lines(self, bookmaker="bet365"):
+        """Uma linha por outcome, no formato de process_odds_data (odds None se a casa não cotou)"""
+        return [{"market": market.name, "short": market.short_name, "handicap": market.handicap,
+                 "odds_type": market.odds_type, "outcome": outcome.name, "odds": outcome.prices.get(bookmaker)}
+                for market in self.markets for outcome in market.outcomes]
+
+
+# Esquema de cada seção dos dumps brutos (stats3_raw/stats2_raw)
+PLAYER_SECTIONS = {"surface_summary": SurfaceSummary, "past_matches": PastMatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valida um dump bruto (stats3_raw/stats2_raw) contra os esquemas")
+    parser.add_argument("path", nargs="?", default="dados/raw/stats3_raw.json")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        raw = json_backend.load(f)
+    errors = 0
+    if isinstance(raw.get("tournament_info"), dict):
+        try:
+            TournamentResults.from_dict(raw["tournament_info"].get("tournament_raw_data") or {})
+        except SchemaError as e:
+            errors += 1
+            print(f"tournament_info: {e}")
+    for player_key, player_data in raw.get("players", raw).items():
+        for section, schema in PLAYER_SECTIONS.items():
+            if isinstance(player_data, dict) and player_data.get(section) is not None:
+                try:
+                    schema.from_dict(player_data[section])
+                except SchemaError as e:
+                    errors += 1
+                    print(f"{player_key}: {e}")
+    print(f"{errors} erro(s) de esquema em {args.path} (backend JSON: {json_backend.BACKEND})")
@@ -1,30 +1,38 @@
 import requests
-import json
 import pandas as pd
 import os
+import sys
 import time
+import argparse
 from dotenv import load_dotenv
 
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_client, json_backend
+from api.http_client import ULTIMATE_TENNIS_HOST, rapidapi_headers
+from api.ndjson_stream import NDJSONWriter, completed_keys, write_json_from_ndjson
+
 # Carregue as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 STATS_RAPIDAPI_KEY = os.getenv("STATS_RAPIDAPI_KEY", os.getenv("RAPIDAPI_KEY"))
+ULTIMATE_TENNIS_HEADERS = rapidapi_headers(STATS_RAPIDAPI_KEY, ULTIMATE_TENNIS_HOST)
+ULTIMATE_TENNIS_BASE_URL = os.getenv("ULTIMATE_TENNIS_BASE_URL", f"https://{ULTIMATE_TENNIS_HOST}")
+OUTPUT_FILENAME = 'dados/raw/stats_raw.json'
+DEFAULT_STREAM_PATH = 'dados/raw/stats_raw.ndjson'
 
 def get_player_stats_ultimate_tennis(player_id, season="2024", surface="clay"):
     """
     Busca todos os dados de um jogador na Ultimate Tennis API
     """
-    url = f"https://ultimate-tennis1.p.rapidapi.com/player_stats/atp/{player_id}/{season}/{surface}"
-    headers = {
-        "x-rapidapi-key": STATS_RAPIDAPI_KEY,
-        "x-rapidapi-host": "ultimate-tennis1.p.rapidapi.com"
-    }
+    url = f"{ULTIMATE_TENNIS_BASE_URL}/player_stats/atp/{player_id}/{season}/{surface}"
     
     try:
         print(f"🔍 Buscando dados para jogador ID: {player_id}")
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=ULTIMATE_TENNIS_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         
         # Retorna a resposta completa da API
         if data:
@@ -41,9 +49,12 @@ def get_player_stats_ultimate_tennis(player_id, season="2024", surface="clay"):
         print(f"  ❌ Erro ao decodificar JSON para jogador {player_id}: {e}")
         return None
 
-def collect_all_players_data():
+def collect_all_players_data(stream_path=None):
     """
     Coleta dados de todos os jogadores do stats.csv e salva em JSON
+
+    Com stream_path, cada jogador é gravado em NDJSON assim que é coletado
+    e uma nova execução com o mesmo stream_path retoma de onde parou.
     """
     # Verificar se o arquivo stats.csv existe
     if not os.path.exists('dados/stats.csv'):
@@ -68,6 +79,15 @@ def collect_all_players_data():
     consecutive_failures = 0
     total_processed = 0
     total_success = 0
+    aborted = False
+    
+    stream_writer = None
+    done_player_ids = set()
+    if stream_path:
+        done_player_ids = completed_keys(stream_path, 'key')
+        if done_player_ids:
+            print(f"♻️ Retomando {stream_path}: {len(done_player_ids)} jogadores já coletados serão pulados")
+        stream_writer = NDJSONWriter(stream_path)
     
     print(f"\\n🚀 Iniciando coleta de dados para {len(df_original)} jogadores...")
     
@@ -79,6 +99,9 @@ def collect_all_players_data():
             print(f"⚠️ ID do jogador na linha {index} está vazio, pulando...")
             continue
         
+        if str(player_id) in done_player_ids:
+            continue
+        
         total_processed += 1
         
         # Buscar dados na API
@@ -93,6 +116,7 @@ def collect_all_players_data():
                 print(f"\\n🛑 ERRO: 5 falhas consecutivas detectadas!")
                 print(f"Parando execução - possível problema no código ou API")
                 print(f"Último jogador que falhou: {player_id}")
+                aborted = True
                 break
             
             continue
@@ -102,27 +126,42 @@ def collect_all_players_data():
         total_success += 1
         
         # Armazenar dados completos com ID como chave
-        all_players_data[str(player_id)] = {
+        player_record = {
             'player_id': player_id,
             'collected_at': time.strftime('%Y-%m-%d %H:%M:%S'),
             'api_response': player_data
         }
-        
-        # Pequeno delay para evitar rate limiting
-        time.sleep(0.5)
+        if stream_writer:
+            stream_writer.write({'key': str(player_id), 'data': player_record})
+        else:
+            all_players_data[str(player_id)] = player_record
     
     # Salvar os dados em JSON
-    if all_players_data:
-        output_filename = 'dados/raw/stats_raw.json'
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_players_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"\\n Arquivo {output_filename} criado com sucesso!")
+    players_saved = len(all_players_data)
+    if stream_writer:
+        stream_writer.close()
+        players_saved = write_json_from_ndjson(stream_path, OUTPUT_FILENAME)
+        if aborted:
+            print(f"♻️ Coleta interrompida: rode de novo com --stream {stream_path} para retomar")
+        else:
+            os.remove(stream_path)
+    elif all_players_data:
+        with open(OUTPUT_FILENAME, 'w', encoding='utf-8') as f:
+            json_backend.dump(all_players_data, f, indent=True)
+    
+    if players_saved:
+        print(f"\\n Arquivo {OUTPUT_FILENAME} criado com sucesso!")
         print(f" Estatísticas da coleta:")
         print(f"  • Total processados: {total_processed}")
         print(f"  • Total sucessos: {total_success}")
         print(f"  • Total falhas: {total_processed - total_success}")
-        print(f"  • Jogadores no JSON: {len(all_players_data)}")
+        print(f"  • Jogadores no JSON: {players_saved}")
+        cache_summary = http_client.cache_summary()
+        if cache_summary:
+            print(f"  • {cache_summary}")
+        quota_summary = http_client.quota_summary()
+        if quota_summary:
+            print(f"  • {quota_summary}")
         
         # Mostrar exemplo de um jogador
         if all_players_data:
@@ -136,5 +175,9 @@ def collect_all_players_data():
         print(f"\\n❌ Nenhum dado foi coletado com sucesso!")
 
 if __name__ == "__main__":
-        collect_all_players_data()
+        parser = argparse.ArgumentParser(description="Coleta estatísticas dos jogadores do stats.csv")
+        parser.add_argument("--stream", nargs="?", const=DEFAULT_STREAM_PATH,
+                            help="grava cada jogador em NDJSON durante a coleta e retoma de lá se interrompida")
+        args = parser.parse_args()
+        collect_all_players_data(stream_path=args.stream)
         print("\\n🏁 Coleta finalizada!")
\ No newline at end of file
@@ -1,29 +1,37 @@
 import requests
-import json
 import os
+import sys
 import time
+import argparse
 from dotenv import load_dotenv
 
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_client, json_backend
+from api.http_client import TENNIS_API_HOST, rapidapi_headers
+from api.past_matches_sync import PastMatchesStore, sync_player_past_matches
+from api.ndjson_stream import NDJSONWriter, completed_keys, write_json_from_ndjson
+
 # Carregue as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+TENNIS_API_HEADERS = rapidapi_headers(RAPIDAPI_KEY, TENNIS_API_HOST)
+TENNIS_API_BASE_URL = os.getenv("TENNIS_API_BASE_URL", f"https://{TENNIS_API_HOST}")
+OUTPUT_FILENAME = 'dados/raw/stats2_raw.json'
+DEFAULT_STREAM_PATH = 'dados/raw/stats2_raw.ndjson'
 
 def get_top50_rankings():
     """
     Busca o ranking completo dos top 50 jogadores ATP
     """
-    url = "https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/ranking/singles/"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/ranking/singles/"
     try:
         print("🔍 Buscando ranking dos top 50 jogadores ATP...")
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         
         # Extrair os top 50 jogadores
         ranking_data = data.get('data', [])
@@ -43,16 +51,11 @@ def get_player_surface_summary(player_id):
     """
     Busca o resumo completo por superfície de um jogador
     """
-    url = f"https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/player/surface-summary/{player_id}"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/player/surface-summary/{player_id}"
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         return data  # Retorna resposta completa da API
         
     except requests.exceptions.RequestException as e:
@@ -62,20 +65,15 @@ def get_player_surface_summary(player_id):
         print(f"  ❌ Erro JSON surface-summary para jogador {player_id}: {e}")
         return None
 
-def get_player_past_matches(player_id):
+def get_player_past_matches(player_id, use_cache=True):
     """
     Busca TODOS os jogos passados de um jogador (sem limite)
     """
-    url = f"https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/player/past-matches/{player_id}"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/player/past-matches/{player_id}"
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS, use_cache=use_cache)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         return data  # Retorna resposta completa da API
         
     except requests.exceptions.RequestException as e:
@@ -85,9 +83,15 @@ def get_player_past_matches(player_id):
         print(f"  ❌ Erro JSON past-matches para jogador {player_id}: {e}")
         return None
 
-def collect_all_top50_data():
+def collect_all_top50_data(incremental=False, stream_path=None):
     """
     Coleta dados completos de todos os top 50 jogadores e salva em JSON
+
+    Com incremental=True os jogos passados são sincronizados no store por
+    jogador (api/past_matches_sync.py) em vez de baixados e gravados inteiros.
+
+    Com stream_path, cada jogador é gravado em NDJSON assim que é coletado
+    e uma nova execução com o mesmo stream_path retoma de onde parou.
     """
     # Buscar ranking dos top 50
     top50_players = get_top50_rankings()
@@ -96,11 +100,22 @@ def collect_all_top50_data():
         print("❌ Não foi possível obter o ranking dos top 50")
         return
     
+    past_matches_store = PastMatchesStore() if incremental else None
+    
     # Dicionário para armazenar todos os dados organizados por jogador
     all_players_data = {}
     consecutive_failures = 0
     total_processed = 0
     total_success = 0
+    aborted = False
+    
+    stream_writer = None
+    done_player_ids = set()
+    if stream_path:
+        done_player_ids = completed_keys(stream_path, 'player_id')
+        if done_player_ids:
+            print(f"♻️ Retomando {stream_path}: {len(done_player_ids)} jogadores já coletados serão pulados")
+        stream_writer = NDJSONWriter(stream_path)
     
     print(f"\\n🚀 Iniciando coleta completa para {len(top50_players)} jogadores...")
     
@@ -113,6 +128,9 @@ def collect_all_top50_data():
             print(f"⚠️ Dados incompletos para jogador: {player_entry}")
             continue
         
+        if str(player_id) in done_player_ids:
+            continue
+        
         print(f"\\n📊 Coletando: {player_name} (ID: {player_id})")
         total_processed += 1
         
@@ -139,8 +157,15 @@ def collect_all_top50_data():
         
         # Buscar past matches (TODOS os dados)
         print(f"  🔍 Buscando past matches...")
-        past_matches = get_player_past_matches(player_id)
-        if past_matches:
+        if incremental:
+            past_matches = sync_player_past_matches(player_id, lambda pid: get_player_past_matches(pid, use_cache=False),
+                                                    past_matches_store)
+        else:
+            past_matches = get_player_past_matches(player_id)
+        if past_matches and incremental:
+            player_data['past_matches_sync'] = past_matches
+            print(f"  ✅ Past matches sincronizados (+{past_matches['new_matches']} novos, {past_matches['total_matches']} jogos)")
+        elif past_matches:
             player_data['past_matches'] = past_matches
             # Contar quantos matches foram coletados
             matches_count = 0
@@ -164,6 +189,7 @@ def collect_all_top50_data():
                 print(f"\\n🛑 ERRO: 5 falhas consecutivas detectadas!")
                 print(f"Parando execução - possível problema no código ou API")
                 print(f"Último jogador que falhou: {player_name} (ID: {player_id})")
+                aborted = True
                 break
             
             continue
@@ -174,29 +200,49 @@ def collect_all_top50_data():
         
         # Armazenar dados do jogador (usando nome como chave para facilitar)
         player_key = f"{player_name}_{player_id}"
-        all_players_data[player_key] = player_data
+        if stream_writer:
+            stream_writer.write({'key': player_key, 'player_id': player_id, 'data': player_data})
+        else:
+            all_players_data[player_key] = player_data
         
         print(f"  ✅ Dados completos coletados para {player_name}")
-        
-        # Delay para evitar rate limiting
-        time.sleep(1)
     
     # Salvar os dados em JSON
-    if all_players_data:
-        output_filename = 'dados/raw/stats2_raw.json'
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_players_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"\\n✅ Arquivo {output_filename} criado com sucesso!")
+    players_saved = len(all_players_data)
+    if stream_writer:
+        stream_writer.close()
+        players_saved = write_json_from_ndjson(stream_path, OUTPUT_FILENAME)
+        if aborted:
+            print(f"♻️ Coleta interrompida: rode de novo com --stream {stream_path} para retomar")
+        else:
+            os.remove(stream_path)
+    elif all_players_data:
+        with open(OUTPUT_FILENAME, 'w', encoding='utf-8') as f:
+            json_backend.dump(all_players_data, f, indent=True)
+    
+    if players_saved:
+        print(f"\\n✅ Arquivo {OUTPUT_FILENAME} criado com sucesso!")
         print(f"📈 Estatísticas da coleta:")
         print(f"  • Total processados: {total_processed}")
         print(f"  • Total sucessos: {total_success}")
         print(f"  • Total falhas: {total_processed - total_success}")
-        print(f"  • Jogadores no JSON: {len(all_players_data)}")
+        print(f"  • Jogadores no JSON: {players_saved}")
+        cache_summary = http_client.cache_summary()
+        if cache_summary:
+            print(f"  • {cache_summary}")
+        quota_summary = http_client.quota_summary()
+        if quota_summary:
+            print(f"  • {quota_summary}")
             
     else:
         print(f"\\n Nenhum dado foi coletado com sucesso!")
 
 if __name__ == "__main__":
-        collect_all_top50_data()
+        parser = argparse.ArgumentParser(description="Coleta dados dos top 50 jogadores ATP")
+        parser.add_argument("--incremental", action="store_true",
+                            help="sincroniza só os jogos novos no store por jogador (dados/sync/past_matches)")
+        parser.add_argument("--stream", nargs="?", const=DEFAULT_STREAM_PATH,
+                            help="grava cada jogador em NDJSON durante a coleta e retoma de lá se interrompida")
+        args = parser.parse_args()
+        collect_all_top50_data(incremental=args.incremental, stream_path=args.stream)
         print("\\n🏁 Coleta finalizada!")
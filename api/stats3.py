@@ -1,31 +1,44 @@
 import requests
-import json
 import pandas as pd
 import os
+import sys
 import time
+import asyncio
+import argparse
 from dotenv import load_dotenv
 
+# Permite importar os módulos do projeto (api.*) ao rodar como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_client, json_backend
+from api.http_client import TENNIS_API_HOST, rapidapi_headers
+from api.async_collector import collect_players_async, DEFAULT_MAX_CONCURRENCY
+from api.past_matches_sync import PastMatchesStore, sync_player_past_matches
+from api.player_names import NameResolver
+from api.ndjson_stream import NDJSONWriter, completed_keys, write_json_from_ndjson
+from api.raw_dump import write_index
+from api.schemas import MATCH_FIELDS, PLAYER_FIELDS
+
 # Carregue as variáveis de ambiente do arquivo .env
 load_dotenv()
 
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+TENNIS_API_HEADERS = rapidapi_headers(RAPIDAPI_KEY, TENNIS_API_HOST)
+TENNIS_API_BASE_URL = os.getenv("TENNIS_API_BASE_URL", f"https://{TENNIS_API_HOST}")
 TOURNAMENT_ID = "20340"  # ID do último torneio
+OUTPUT_FILENAME = 'dados/raw/stats3_raw.json'
+DEFAULT_STREAM_PATH = 'dados/raw/stats3_raw.ndjson'
 
 def get_tournament_results():
     """
     Busca todos os resultados do torneio para extrair IDs dos jogadores
     """
-    url = f"https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/tournament/results/{TOURNAMENT_ID}"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/tournament/results/{TOURNAMENT_ID}"
     try:
         print(f"🔍 Buscando resultados do torneio ID: {TOURNAMENT_ID}...")
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         
         print(f"✅ Dados do torneio coletados com sucesso")
         return data
@@ -37,64 +50,135 @@ def get_tournament_results():
         print(f"❌ Erro ao decodificar JSON do torneio: {e}")
         return None
 
-def extract_player_ids_from_tournament(tournament_data):
+# Formato da resposta de tournament/results: data.<chave>[] com um jogo por
+# item (os campos de schemas.Match) e os jogadores (ou duplas) em
+# player1/player2 (os campos de schemas.PlayerRef); os demais campos do
+# jogo e do jogador são escalares
+TOURNAMENT_DRAW_KEYS = frozenset({'singles', 'doubles', 'qualifying', 'doublesQualifying'})
+# Listas de jogos de outros formatos, com os jogadores nestas chaves
+MATCH_LIST_KEYS = frozenset({'matches', 'results', 'rounds', 'participants'})
+MATCH_PLAYER_KEYS = ('homeTeam', 'awayTeam', 'participant1', 'participant2')
+
+
+def _scan_tournament_draws(tournament_data):
     """
-    Extrai todos os IDs únicos de jogadores do torneio
+    Leitura direta do formato conhecido: só olha player1/player2 de cada
+    jogo, sem percorrer o resto. Retorna players_info, ou None se o payload
+    tem algum campo fora do formato (aí vale a busca genérica).
     """
-    player_ids = set()
-    players_info = {}
-    
-    def extract_from_matches(matches_data):
-        if isinstance(matches_data, list):
-            for match in matches_data:
-                if isinstance(match, dict):
-                    # Extrair jogadores do match
-                    for key in ['homeTeam', 'awayTeam', 'participant1', 'participant2']:
-                        if key in match:
-                            player_data = match[key]
-                            if isinstance(player_data, dict):
-                                player_id = player_data.get('id')
-                                player_name = player_data.get('name')
-                                if player_id:
-                                    player_ids.add(str(player_id))
-                                    players_info[str(player_id)] = {
-                                        'id': player_id,
-                                        'name': player_name,
-                                        'found_in': 'tournament_results'
-                                    }
-    
-    def recursive_search(data, path=""):
-        """Busca recursivamente por dados de jogadores em toda a estrutura"""
+    if not isinstance(tournament_data, dict) or tournament_data.keys() != {'data'}:
+        return None
+    draws = tournament_data['data']
+    if not isinstance(draws, dict) or not draws.keys() <= TOURNAMENT_DRAW_KEYS:
+        return None
+    found = {}
+    for draw_key, matches in draws.items():
+        if not isinstance(matches, list):
+            return None
+        for index, match in enumerate(matches):
+            if not isinstance(match, dict) or not match.keys() <= MATCH_FIELDS:
+                return None
+            match_player = None
+            for key in ('player1', 'player2'):
+                player = match.get(key)
+                if player is None:
+                    continue
+                if not isinstance(player, dict) or not player.keys() <= PLAYER_FIELDS:
+                    return None
+                player_id, player_name = player.get('id'), player.get('name')
+                if player_id and player_name:
+                    # O mesmo id dos dois lados do jogo também fica para a busca genérica
+                    if str(player_id) == match_player:
+                        return None
+                    match_player = str(player_id)
+                    found[match_player] = (player_id, player_name, draw_key, index, key)
+    # O caminho só é montado para a última ocorrência de cada jogador
+    return {player_key: {'id': player_id, 'name': player_name, 'found_in': f"data.{draw_key}[{index}].{key}"}
+            for player_key, (player_id, player_name, draw_key, index, key) in found.items()}
+
+
+def _path_segment(entry):
+    key = entry[2]
+    return f"[{key}]" if isinstance(key, int) else f".{key}"
+
+
+def _format_path(entry, prefixes):
+    """
+    Caminho 'data.singles[3].player1' de um nó da busca genérica, subindo
+    pelos pais. O trecho até a lista de jogos (dois níveis acima do
+    jogador) fica em `prefixes`, já que é o mesmo para todos os jogadores
+    dela.
+    """
+    suffix = []
+    for _ in range(2):
+        if entry[1] is None:
+            break
+        suffix.append(_path_segment(entry))
+        entry = entry[1]
+    prefix = prefixes.get(id(entry))
+    if prefix is None:
+        parts = []
+        node = entry
+        while node[1] is not None:
+            parts.append(_path_segment(node))
+            node = node[1]
+        prefix = prefixes[id(entry)] = ''.join(reversed(parts))
+    path = prefix + ''.join(reversed(suffix))
+    return path[1:] if path.startswith('.') else path or 'tournament_data'
+
+
+def _walk_tournament(tournament_data):
+    """
+    Busca genérica e iterativa (sem limite de recursão) em todo o payload:
+    todo objeto com id e nome é um jogador, e as listas em MATCH_LIST_KEYS
+    têm jogadores em MATCH_PLAYER_KEYS mesmo sem nome. A ordem de visita é
+    a da busca recursiva original, então, quando um jogador aparece mais de
+    uma vez, vale a última ocorrência.
+    """
+    found = {}
+    # Cada item da pilha, (nó, item do pai, chave no pai, está em MATCH_LIST_KEYS),
+    # serve também de elo do caminho, que só vira texto para o resultado
+    stack = [(tournament_data, None, None, False)]
+    while stack:
+        entry = stack.pop()
+        data, _, _, match_list = entry
         if isinstance(data, dict):
-            # Verificar se é um objeto de jogador
             if 'id' in data and 'name' in data:
-                player_id = data.get('id')
-                player_name = data.get('name')
+                player_id, player_name = data['id'], data['name']
                 if player_id and player_name:
-                    player_ids.add(str(player_id))
-                    players_info[str(player_id)] = {
-                        'id': player_id,
-                        'name': player_name,
-                        'found_in': path or 'tournament_data'
-                    }
-            
-            # Continuar busca recursiva
-            for key, value in data.items():
-                new_path = f"{path}.{key}" if path else key
-                if key in ['matches', 'results', 'rounds', 'participants']:
-                    extract_from_matches(value)
-                recursive_search(value, new_path)
-                
+                    found[str(player_id)] = (player_id, player_name, entry)
+            for key, value in reversed(data.items()):
+                if isinstance(value, (dict, list)):
+                    stack.append((value, entry, key, key in MATCH_LIST_KEYS))
         elif isinstance(data, list):
-            for i, item in enumerate(data):
-                new_path = f"{path}[{i}]" if path else f"[{i}]"
-                recursive_search(item, new_path)
-    
-    # Buscar em toda a estrutura do torneio
-    recursive_search(tournament_data)
-    
-    print(f"🎾 Encontrados {len(player_ids)} jogadores únicos no torneio")
-    return list(player_ids), players_info
+            if match_list:
+                for match in data:
+                    if not isinstance(match, dict):
+                        continue
+                    for key in MATCH_PLAYER_KEYS:
+                        player = match.get(key)
+                        if isinstance(player, dict) and player.get('id'):
+                            found[str(player['id'])] = (player['id'], player.get('name'), None)
+            for index in range(len(data) - 1, -1, -1):
+                value = data[index]
+                if isinstance(value, (dict, list)):
+                    stack.append((value, entry, index, False))
+    prefixes = {}
+    return {player_key: {'id': player_id, 'name': player_name,
+                         'found_in': _format_path(entry, prefixes) if entry is not None else 'tournament_results'}
+            for player_key, (player_id, player_name, entry) in found.items()}
+
+
+def extract_player_ids_from_tournament(tournament_data):
+    """
+    Extrai todos os IDs únicos de jogadores do torneio
+    """
+    players_info = _scan_tournament_draws(tournament_data)
+    if players_info is None:
+        players_info = _walk_tournament(tournament_data)
+
+    print(f"🎾 Encontrados {len(players_info)} jogadores únicos no torneio")
+    return list(players_info), players_info
 
 def filter_players_from_stats_csv(tournament_player_ids, players_info):
     """
@@ -111,16 +195,18 @@ def filter_players_from_stats_csv(tournament_player_ids, players_info):
         
         # Verificar se tem coluna NomeJogador para fazer matching por nome
         if 'NomeJogador' in df_stats.columns:
-            stats_names = set(df_stats['NomeJogador'].dropna().str.lower().str.strip())
+            stats_names = NameResolver({name: name for name in df_stats['NomeJogador'].dropna()})
             
             filtered_players = []
             filtered_info = {}
             
             for player_id in tournament_player_ids:
                 player_info = players_info.get(player_id, {})
-                player_name = player_info.get('name', '').lower().strip()
+                player_name = player_info.get('name', '')
                 
-                if player_name in stats_names:
+                # Só chaves exatas (acentos, ordem e pontuação ignorados): a busca
+                # aproximada poderia trazer outro jogador com nome parecido
+                if stats_names.resolve(player_name, fuzzy=False):
                     filtered_players.append(player_id)
                     filtered_info[player_id] = player_info
                     print(f"  ✅ Match encontrado: {player_info.get('name')} (ID: {player_id})")
@@ -140,16 +226,11 @@ def get_player_surface_summary(player_id):
     """
     Busca o resumo completo por superfície de um jogador
     """
-    url = f"https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/player/surface-summary/{player_id}"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/player/surface-summary/{player_id}"
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         return data
         
     except requests.exceptions.RequestException as e:
@@ -159,20 +240,15 @@ def get_player_surface_summary(player_id):
         print(f"  ❌ Erro JSON surface-summary para jogador {player_id}: {e}")
         return None
 
-def get_player_past_matches(player_id):
+def get_player_past_matches(player_id, use_cache=True):
     """
     Busca TODOS os jogos passados de um jogador
     """
-    url = f"https://tennis-api-atp-wta-itf.p.rapidapi.com/tennis/v2/atp/player/past-matches/{player_id}"
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": "tennis-api-atp-wta-itf.p.rapidapi.com"
-    }
-    
+    url = f"{TENNIS_API_BASE_URL}/tennis/v2/atp/player/past-matches/{player_id}"
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=TENNIS_API_HEADERS, use_cache=use_cache)
         response.raise_for_status()
-        data = response.json()
+        data = json_backend.response_json(response)
         return data
         
     except requests.exceptions.RequestException as e:
@@ -182,9 +258,24 @@ def get_player_past_matches(player_id):
         print(f"  ❌ Erro JSON past-matches para jogador {player_id}: {e}")
         return None
 
-def collect_tournament_players_data():
+def collect_tournament_players_data(async_mode=False, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                                    requests_per_second=None, incremental=False, stream_path=None):
     """
     Função principal que coleta dados de todos os jogadores do torneio
+
+    Com async_mode=True os dois endpoints de cada jogador são buscados em
+    paralelo (até max_concurrency requisições simultâneas), limitados pelo
+    token bucket do host em vez do sleep fixo. requests_per_second substitui
+    o limite padrão do host definido em api/http_client.py.
+
+    Com incremental=True os jogos passados vão para o store por jogador de
+    api/past_matches_sync.py (só os jogos novos são gravados e jogadores
+    sincronizados recentemente são pulados); no JSON fica apenas o resumo
+    em 'past_matches_sync'.
+
+    Com stream_path, cada jogador é gravado em NDJSON assim que é coletado;
+    se a coleta cair, rodar de novo com o mesmo stream_path pula os
+    jogadores já gravados. O stats3_raw.json é gerado do stream no final.
     """
     # Buscar dados do torneio
     tournament_data = get_tournament_results()
@@ -220,10 +311,43 @@ def collect_tournament_players_data():
     consecutive_failures = 0
     total_processed = 0
     total_success = 0
+    aborted = False
+    
+    stream_writer = None
+    if stream_path:
+        done_player_ids = completed_keys(stream_path, 'player_id')
+        if done_player_ids:
+            filtered_player_ids = [pid for pid in filtered_player_ids if str(pid) not in done_player_ids]
+            print(f"♻️ Retomando {stream_path}: {len(done_player_ids)} jogadores já coletados serão pulados")
+        stream_writer = NDJSONWriter(stream_path)
     
     print(f"\\n🚀 Iniciando coleta detalhada para {len(filtered_player_ids)} jogadores filtrados...")
     
+    fetch_past_matches = get_player_past_matches
+    if incremental:
+        past_matches_store = PastMatchesStore()
+        
+        def fetch_past_matches(player_id):
+            return sync_player_past_matches(player_id, lambda pid: get_player_past_matches(pid, use_cache=False),
+                                            past_matches_store)
+    
+    fetched_data = {}
+    if async_mode:
+        if requests_per_second:
+            http_client.set_rate_limit(TENNIS_API_HOST, requests_per_second, burst=max_concurrency)
+        rate = http_client.HOST_RATE_LIMITS.get(TENNIS_API_HOST, {}).get("rate", "sem limite")
+        print(f"⚡ Modo assíncrono: até {max_concurrency} requisições simultâneas, {rate} req/s")
+        fetched_data = asyncio.run(collect_players_async(
+            filtered_player_ids,
+            get_player_surface_summary,
+            fetch_past_matches,
+            max_concurrency=max_concurrency
+        ))
+    
     for player_id in filtered_player_ids:
+        if async_mode and player_id not in fetched_data:
+            continue
+        
         player_info = filtered_players_info.get(player_id, {})
         player_name = player_info.get('name', f'Player_{player_id}')
         
@@ -238,19 +362,29 @@ def collect_tournament_players_data():
             'past_matches': None
         }
         
-        # Buscar surface summary
-        print(f"  🔍 Buscando surface summary...")
-        surface_summary = get_player_surface_summary(player_id)
+        if async_mode:
+            surface_summary, past_matches = fetched_data[player_id]
+        else:
+            # Buscar surface summary
+            print(f"  🔍 Buscando surface summary...")
+            surface_summary = get_player_surface_summary(player_id)
         if surface_summary:
             player_data['surface_summary'] = surface_summary
             print(f"  ✅ Surface summary coletado")
         else:
             print(f"  ⚠️ Surface summary não disponível")
         
-        # Buscar past matches
-        print(f"  🔍 Buscando past matches...")
-        past_matches = get_player_past_matches(player_id)
-        if past_matches:
+        if not async_mode:
+            # Buscar past matches
+            print(f"  🔍 Buscando past matches...")
+            past_matches = fetch_past_matches(player_id)
+        if past_matches and incremental:
+            player_data['past_matches_sync'] = past_matches
+            if past_matches['skipped']:
+                print(f"  ✅ Past matches já sincronizados ({past_matches['total_matches']} jogos)")
+            else:
+                print(f"  ✅ Past matches sincronizados (+{past_matches['new_matches']} novos, {past_matches['total_matches']} jogos)")
+        elif past_matches:
             player_data['past_matches'] = past_matches
             # Contar matches
             matches_count = 0
@@ -270,6 +404,7 @@ def collect_tournament_players_data():
             if consecutive_failures >= 5:
                 print(f"\\n🛑 ERRO: 5 falhas consecutivas detectadas!")
                 print(f"Parando execução - possível problema no código ou API")
+                aborted = True
                 break
             continue
         
@@ -279,31 +414,68 @@ def collect_tournament_players_data():
         
         # Armazenar dados do jogador
         player_key = f"{player_name}_{player_id}".replace(" ", "_")
-        all_players_data['players'][player_key] = player_data
+        if stream_writer:
+            stream_writer.write({'key': player_key, 'player_id': player_id, 'data': player_data})
+        else:
+            all_players_data['players'][player_key] = player_data
         
         print(f"  ✅ Dados completos coletados para {player_name}")
-        
-        # Delay para evitar rate limiting
-        time.sleep(1)
     
     # Salvar os dados em JSON
-    if all_players_data['players']:
-        output_filename = 'dados/raw/stats3_raw.json'
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_players_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"\\n Arquivo {output_filename} criado com sucesso!")
+    players_saved = len(all_players_data['players'])
+    if stream_writer:
+        stream_writer.close()
+        players_saved = write_json_from_ndjson(stream_path, OUTPUT_FILENAME,
+                                               header={'tournament_info': all_players_data['tournament_info']},
+                                               container_key='players')
+        if aborted:
+            print(f"♻️ Coleta interrompida: rode de novo com --stream {stream_path} para retomar")
+        else:
+            os.remove(stream_path)
+    elif all_players_data['players']:
+        with open(OUTPUT_FILENAME, 'w', encoding='utf-8') as f:
+            json_backend.dump(all_players_data, f, indent=True)
+    if players_saved:
+        # Índice de posições do dump: leitores carregam um jogador sem decodificar o arquivo inteiro
+        write_index(OUTPUT_FILENAME)
+    
+    if players_saved:
+        print(f"\\n Arquivo {OUTPUT_FILENAME} criado com sucesso!")
         print(f" Estatísticas da coleta:")
         print(f"  • Torneio ID: {TOURNAMENT_ID}")
         print(f"  • Jogadores no torneio: {all_players_data['tournament_info']['total_players_in_tournament']}")
         print(f"  • Jogadores filtrados: {len(filtered_player_ids)}")
         print(f"  • Total processados: {total_processed}")
         print(f"  • Total sucessos: {total_success}")
-        print(f"  • Jogadores no JSON: {len(all_players_data['players'])}")
+        print(f"  • Jogadores no JSON: {players_saved}")
+        cache_summary = http_client.cache_summary()
+        if cache_summary:
+            print(f"  • {cache_summary}")
+        quota_summary = http_client.quota_summary()
+        if quota_summary:
+            print(f"  • {quota_summary}")
         
     else:
         print(f"\\n Nenhum dado foi coletado com sucesso!")
 
 if __name__ == "__main__":
-        collect_tournament_players_data()
+        parser = argparse.ArgumentParser(description="Coleta dados dos jogadores do torneio")
+        parser.add_argument("--async", dest="async_mode", action="store_true",
+                            help="busca os jogadores em paralelo com asyncio")
+        parser.add_argument("--max-concurrency", type=int,
+                            default=int(os.getenv("STATS3_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+                            help="máximo de requisições simultâneas no modo assíncrono")
+        parser.add_argument("--incremental", action="store_true",
+                            help="sincroniza só os jogos novos no store por jogador (dados/sync/past_matches)")
+        parser.add_argument("--stream", nargs="?", const=DEFAULT_STREAM_PATH,
+                            help="grava cada jogador em NDJSON durante a coleta e retoma de lá se interrompida")
+        parser.add_argument("--rps", type=float,
+                            default=float(os.getenv("STATS3_REQUESTS_PER_SECOND", 0)) or None,
+                            help="requisições por segundo no modo assíncrono (padrão: limite do host)")
+        args = parser.parse_args()
+        collect_tournament_players_data(async_mode=args.async_mode,
+                                        max_concurrency=args.max_concurrency,
+                                        requests_per_second=args.rps,
+                                        incremental=args.incremental,
+                                        stream_path=args.stream)
         print("\\n🏁 Coleta finalizada!")
@@ -0,0 +1,75 @@
+"""
+Benchmark da coleta de jogadores do stats3.py: sequencial x assíncrona.
+
+Sobe um servidor local (benchmarks/mock_api.py) com latência simulada e
+aponta TENNIS_API_BASE_URL para ele. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_async_collector.py --players 217 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Mede a rede, não o cache em disco
+os.environ["HTTP_CACHE"] = "0"
+# Não soma as requisições ao servidor local no uso real da cota
+os.environ["RAPIDAPI_QUOTA_PATH"] = os.path.join(tempfile.mkdtemp(), "api_quota.json")
+
+from api import http_client, stats3
+from api.async_collector import collect_players_async
+from benchmarks.mock_api import MockAPIServer
+
+
+def run_sequential(player_ids):
+    for player_id in player_ids:
+        stats3.get_player_surface_summary(player_id)
+        stats3.get_player_past_matches(player_id)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=217)
+    parser.add_argument("--latency", type=float, default=0.05, help="latência simulada por requisição (s)")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=100, help="limite de requisições por segundo do host")
+    args = parser.parse_args()
+
+    player_ids = [str(10000 + i) for i in range(args.players)]
+
+    with MockAPIServer(latency=args.latency) as server:
+        stats3.TENNIS_API_BASE_URL = server.base_url
+        # O sequencial não é limitado; o assíncrono usa o token bucket do host
+        http_client.set_rate_limit(http_client.TENNIS_API_HOST, None)
+
+        start = time.perf_counter()
+        run_sequential(player_ids)
+        sequential_time = time.perf_counter() - start
+
+        http_client.set_rate_limit(http_client.TENNIS_API_HOST, args.rps, burst=args.max_concurrency)
+        start = time.perf_counter()
+        results = asyncio.run(collect_players_async(
+            player_ids,
+            stats3.get_player_surface_summary,
+            stats3.get_player_past_matches,
+            max_concurrency=args.max_concurrency
+        ))
+        async_time = time.perf_counter() - start
+
+    assert len(results) == len(player_ids)
+    # A coleta original ainda dorme 1 s por jogador depois das duas requisições
+    original_time = sequential_time + len(player_ids) * 1.0
+
+    print(f"Jogadores: {args.players} | latência simulada: {args.latency * 1000:.0f} ms")
+    print(f"Sequencial (com sleep(1) original, estimado): {original_time:8.2f} s")
+    print(f"Sequencial (sem sleep):                       {sequential_time:8.2f} s")
+    print(f"Assíncrono ({args.max_concurrency} simultâneas, {args.rps:g} req/s):      {async_time:8.2f} s")
+    print(f"Speedup vs sequencial sem sleep: {sequential_time / async_time:.1f}x")
+    print(f"Speedup vs coleta original:      {original_time / async_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
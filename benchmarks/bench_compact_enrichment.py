@@ -0,0 +1,83 @@
+"""
+Benchmark do modo compacto do pipeline de odds (api/odds.py --compact).
+
+Monta N eventos sintéticos com jogadores reais do stats_clean.json e as
+linhas de odds do arquivo coletado, e compara o tamanho e o tempo de
+serialização (json.dump indent=2, como o pipeline grava) do formato atual,
+com a entrada completa do stats_clean em cada participante, com o
+compacto: eventos com player_id + tabela de features por jogador.
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_compact_enrichment.py --events 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("RAPIDAPI_KEY", "chave-de-teste")
+os.environ.setdefault("RAPIDAPI_HOST", "odds.stub.local")
+
+from api import odds
+from api.enrichment import build_players_table, referenced_player_ids
+
+
+def synthetic_events(stats_clean, odds_lines, n_events, compact, seed=0):
+    rng = random.Random(seed)
+    players = list(stats_clean.values())
+    tournament = {"tournamentId": 2579, "name": "French Open Men Singles", "categoryName": "ATP"}
+    events = []
+    for i in range(n_events):
+        p1_stats, p2_stats = rng.sample(players, 2)
+        event_item = {
+            "eventId": f"id{i}", "eventStatus": "pre-game", "date": "2025-06-04", "time": "11:20:00",
+            "participant1": p1_stats["name"], "participant1Id": 1000 + i,
+            "participant2": p2_stats["name"], "participant2Id": 2000 + i,
+            "bookmakerCount": 10, "startTime": 1749036000
+        }
+        events.append(odds.build_event_info(tournament, event_item, p1_stats, p2_stats, odds_lines, compact=compact))
+    return events
+
+
+def timed_dump(obj):
+    start = time.perf_counter()
+    text = json.dumps(obj, indent=2, ensure_ascii=False)
+    return len(text.encode("utf-8")), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=500)
+    args = parser.parse_args()
+
+    with open("dados/clean/stats_clean.json", "r", encoding="utf-8") as f:
+        stats_clean = json.load(f)
+    with open(odds.OUTPUT_FILENAME, "r", encoding="utf-8") as f:
+        odds_lines = json.load(f)[0]["odds_bet365"]
+    player_stats_map = {data["player_id"]: data for data in stats_clean.values()}
+
+    full_events = synthetic_events(stats_clean, odds_lines, args.events, compact=False)
+    full_bytes, full_time = timed_dump(full_events)
+
+    start = time.perf_counter()
+    compact_events = synthetic_events(stats_clean, odds_lines, args.events, compact=True)
+    players_table = build_players_table(player_stats_map, referenced_player_ids(compact_events))
+    features_time = time.perf_counter() - start
+    events_bytes, events_time = timed_dump(compact_events)
+    table_bytes, table_time = timed_dump(players_table)
+    compact_bytes = events_bytes + table_bytes
+    compact_time = events_time + table_time
+
+    print(f"Eventos: {args.events} | jogadores distintos: {len(players_table)}")
+    print(f"Completo:  {full_bytes / 2**20:8.2f} MiB | serialização {full_time * 1000:8.1f} ms")
+    print(f"Compacto:  {compact_bytes / 2**20:8.2f} MiB | serialização {compact_time * 1000:8.1f} ms "
+          f"(eventos {events_bytes / 2**20:.2f} MiB + tabela {table_bytes / 2**20:.2f} MiB; "
+          f"montagem das features {features_time * 1000:.1f} ms)")
+    print(f"Redução: {full_bytes / compact_bytes:.1f}x no tamanho, {full_time / compact_time:.1f}x no tempo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark da camada de dados do dashboard (dash.py).
+
+Gera um store Parquet sintético com milhares de jogadores (estatísticas,
+surface summary e jogos) e um histórico de odds com muitas coletas, e mede:
+a carga inicial das tabelas indexadas, o tempo de montar a visão de um
+jogador ao trocar de jogador (sem cache por jogador, o pior caso) contra
+ler e filtrar o Parquet a cada troca, e o tempo da série de movimento das
+linhas com e sem downsampling. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_dash.py --players 5000 --matches 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dash
+from analise import parquet_store
+from api.odds_history import OddsHistory
+from api.player_ids import PlayerIdMap
+from benchmarks.bench_odds_history import sample_lines
+
+COURTS = ["Clay", "Hard", "I.hard", "Grass"]
+
+
+def synthetic_tables(n_players, n_matches, years=20, seed=1):
+    rng = np.random.default_rng(seed)
+    atp_ids = [f"A{i:05d}" for i in range(n_players)]
+    tennis_ids = np.arange(10000, 10000 + n_players)
+    names = [f"Player {i:05d}" for i in range(n_players)]
+    players = pd.DataFrame({"source": "stats_clean", "player_id": atp_ids, "name": names})
+    stats = {column: rng.integers(20, 90, n_players) for column in
+             ("Aces", "DoubleFaults", "FirstServePercentage", "ServicePointsWonPercentage")}
+    service = pd.DataFrame({"player_id": atp_ids, "name": names, "surface": "Clay", **stats})
+    returns = pd.DataFrame({"player_id": atp_ids, "name": names, "surface": "Clay",
+                            "ReturnPointsWonPercentage": rng.integers(25, 50, n_players)})
+    summary = pd.DataFrame({
+        "source": "stats3",
+        "player_id": np.repeat(tennis_ids.astype(str), years * len(COURTS)),
+        "name": np.repeat(names, years * len(COURTS)),
+        "year": np.tile(np.repeat(np.arange(2025 - years + 1, 2026), len(COURTS)), n_players),
+        "court_id": 0,
+        "court": np.tile(COURTS, n_players * years),
+        "wins": rng.integers(0, 30, n_players * years * len(COURTS)),
+        "losses": rng.integers(0, 20, n_players * years * len(COURTS)),
+    })
+    player1 = rng.integers(0, n_players, n_matches)
+    player2 = (player1 + rng.integers(1, n_players, n_matches)) % n_players
+    matches = pd.DataFrame({
+        "match_id": np.arange(n_matches).astype(str),
+        "date": pd.to_datetime("2005-01-01", utc=True) + pd.to_timedelta(np.sort(rng.integers(0, 20 * 365, n_matches)),
+                                                                         unit="D"),
+        "round_id": 1,
+        "tournament_id": rng.integers(1, 500, n_matches),
+        "player1_id": tennis_ids[player1],
+        "player2_id": tennis_ids[player2],
+        "winner_id": tennis_ids[player1],
+        "result": "6-4 6-4",
+        "player1_name": np.array(names)[player1],
+        "player2_name": np.array(names)[player2],
+        "player1_country": "N/A",
+        "player2_country": "N/A",
+    })
+    id_map = PlayerIdMap(None)
+    for name, atp_id, tennis_id in zip(names, atp_ids, tennis_ids):
+        id_map.link(name, atp_id=atp_id, tennis_api_id=tennis_id)
+    tables = {"players": players, "service_stats": service, "return_stats": returns,
+              "surface_summary": summary, "matches": matches}
+    return {name: df.sort_values(parquet_store.TABLES[name], kind="stable") for name, df in tables.items()}, id_map
+
+
+def per_call_ms(func, items):
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99), max(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da camada de dados do dashboard")
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--matches", type=int, default=200000)
+    parser.add_argument("--switches", type=int, default=200, help="trocas de jogador medidas")
+    parser.add_argument("--events", type=int, default=20, help="eventos no histórico de odds")
+    parser.add_argument("--polls", type=int, default=2880, help="coletas por evento (uma por minuto)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        tables, id_map = synthetic_tables(args.players, args.matches)
+        parquet_store.write_store(tables, store_dir)
+        print(f"Store sintético: {args.players} jogadores, {len(tables['surface_summary']):,} linhas de surface "
+              f"summary, {args.matches:,} jogos")
+
+        start = time.perf_counter()
+        player_tables = {
+            "service": dash.read_stats_table("service_stats", store_dir),
+            "returns": dash.read_stats_table("return_stats", store_dir),
+            "summary": dash.read_indexed_table("surface_summary", dash.SURFACE_SUMMARY_COLUMNS, ["player_id"],
+                                               store_dir),
+            "matches": dash.read_indexed_table("matches", dash.MATCH_COLUMNS, ["player1_id", "player2_id"],
+                                               store_dir),
+        }
+        players = parquet_store.read_table("players", columns=list(dash.PLAYER_COLUMNS), store_dir=store_dir)
+        directory = dash.player_directory(players, id_map)
+        print(f"Carga inicial (tabelas indexadas + lista de jogadores): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        random.seed(1)
+        picks = [directory.iloc[i] for i in random.sample(range(len(directory)), args.switches)]
+        p50, p99, worst = per_call_ms(lambda player: dash.player_view(player, **player_tables), picks)
+        print(f"Troca de jogador (índice em memória): p50 {p50:.1f} ms | p99 {p99:.1f} ms | máx {worst:.1f} ms")
+
+        def filtered_read(player):
+            tennis_id = int(player["tennis_api_id"])
+            parquet_store.read_table("service_stats", filters=[("player_id", "==", player["atp_id"])],
+                                     store_dir=store_dir)
+            parquet_store.read_table("surface_summary", columns=list(dash.SURFACE_SUMMARY_COLUMNS),
+                                     filters=[("player_id", "==", str(tennis_id))], store_dir=store_dir)
+            parquet_store.read_table("matches", columns=list(dash.MATCH_COLUMNS),
+                                     filters=[[("player1_id", "==", tennis_id)], [("player2_id", "==", tennis_id)]],
+                                     store_dir=store_dir)
+
+        def full_read(player):
+            tennis_id = int(player["tennis_api_id"])
+            summary = parquet_store.read_table("surface_summary", store_dir=store_dir)
+            summary[summary["player_id"] == str(tennis_id)]
+            matches = parquet_store.read_table("matches", store_dir=store_dir)
+            matches[(matches["player1_id"] == tennis_id) | (matches["player2_id"] == tennis_id)]
+
+        p50, _, worst = per_call_ms(filtered_read, picks[:20])
+        print(f"Troca lendo o Parquet com filtros: p50 {p50:.1f} ms | máx {worst:.1f} ms")
+        p50, _, worst = per_call_ms(full_read, picks[:10])
+        print(f"Troca lendo as tabelas inteiras: p50 {p50:.1f} ms | máx {worst:.1f} ms")
+
+        history_path = os.path.join(store_dir, "odds_history.sqlite")
+        history = OddsHistory(history_path)
+        lines = {f"ev{i}": sample_lines(40) for i in range(args.events)}
+        start_at = time.time() - args.polls * 60
+        for event_id, event_lines in lines.items():
+            for poll in range(args.polls):
+                for line in event_lines:
+                    if random.random() < 0.05:
+                        line["odds"] = round(max(1.01, line["odds"] * random.uniform(0.95, 1.05)), 2)
+                history.record(event_id, event_lines, seen_at=start_at + poll * 60,
+                               start_time=start_at + args.polls * 60)
+        print(f"Histórico: {args.events} eventos x {args.polls} coletas, {history.stats()['price_rows']:,} mudanças")
+
+        for label, max_points in (("sem downsampling", args.polls), (f"{dash.MAX_CHART_POINTS} pontos",
+                                                                      dash.MAX_CHART_POINTS)):
+            p50, _, worst = per_call_ms(lambda event_id: dash.line_movement_view(history, event_id, None, max_points),
+                                        list(lines))
+            series, _ = dash.line_movement_view(history, "ev0", None, max_points)
+            print(f"Movimento das linhas ({label}): {series.size:,} valores no gráfico, "
+                  f"p50 {p50:.1f} ms | máx {worst:.1f} ms")
+        history.close()
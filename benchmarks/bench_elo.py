@@ -0,0 +1,119 @@
+"""
+Benchmark do Elo (analise/elo.py) com jogos sintéticos.
+
+Compara o replay completo do EloEngine (arrays NumPy) com uma versão de
+referência em dicts de dicts (laço sobre listas), e mede a atualização incremental de um
+lote pequeno de jogos novos sobre o estado já calculado. Rodar a partir
+da raiz do projeto:
+
+    python benchmarks/bench_elo.py --matches 100000 --players 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import elo
+
+
+def synthetic_matches(n_matches, n_players, n_tournaments=200, seed=42, first_match_id=0):
+    """Tabela de jogos no formato de parquet_store.match_rows, com vencedor sorteado pelo nível do jogador"""
+    rng = np.random.default_rng(seed)
+    strength = rng.normal(0, 1, n_players)
+    player1 = rng.integers(0, n_players, n_matches)
+    player2 = (player1 + rng.integers(1, n_players, n_matches)) % n_players
+    p1_wins = rng.random(n_matches) < 1 / (1 + np.exp(strength[player2] - strength[player1]))
+    winner = np.where(p1_wins, player1, player2)
+    start = pd.Timestamp("2015-01-01", tz="UTC")
+    dates = start + pd.to_timedelta(np.sort(rng.integers(0, 10 * 365 * 24, n_matches)), unit="h")
+    return pd.DataFrame({
+        'match_id': (np.arange(n_matches) + first_match_id).astype(str),
+        'date': dates,
+        'tournament_id': rng.integers(0, n_tournaments, n_matches),
+        'player1_id': player1 + 10000,
+        'player2_id': player2 + 10000,
+        'winner_id': winner + 10000,
+        'result': "6-4 6-4",
+    })
+
+
+def synthetic_surfaces(n_tournaments=200):
+    return {tournament_id: elo.SURFACES[tournament_id % len(elo.SURFACES)] for tournament_id in range(n_tournaments)}
+
+
+def reference_elo(matches, surfaces):
+    """
+    Mesmo cálculo com estado em dicts ({jogador: {...}}), para comparação:
+    um laço simples sobre as colunas em listas
+    """
+    players = {}
+    ordered = matches.sort_values(['date', 'match_id'], kind='stable')
+    for player1, player2, winner, tournament_id in zip(ordered['player1_id'].tolist(), ordered['player2_id'].tolist(),
+                                                       ordered['winner_id'].tolist(),
+                                                       ordered['tournament_id'].tolist()):
+        loser = player2 if winner == player1 else player1
+        surface = surfaces.get(tournament_id)
+        keys = ['overall'] + ([surface] if surface in elo.SURFACES else [])
+        for key in keys:
+            w = players.setdefault(winner, {}).setdefault(key, {'rating': elo.INITIAL_RATING, 'matches': 0})
+            l = players.setdefault(loser, {}).setdefault(key, {'rating': elo.INITIAL_RATING, 'matches': 0})
+            delta = 1.0 - elo.expected_score(w['rating'], l['rating'])
+            w['rating'] += elo.k_factor(w['matches']) * delta
+            l['rating'] -= elo.k_factor(l['matches']) * delta
+            w['matches'] += 1
+            l['matches'] += 1
+    return players
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do Elo geral/por superfície")
+    parser.add_argument("--matches", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--incremental", type=int, default=1000, help="jogos novos no teste incremental")
+    parser.add_argument("--reference", type=int, default=20000,
+                        help="jogos usados na versão de referência (dicts); 0 para pular")
+    args = parser.parse_args()
+
+    surfaces = synthetic_surfaces()
+    matches = synthetic_matches(args.matches, args.players)
+    new_matches = synthetic_matches(args.incremental, args.players, seed=7, first_match_id=args.matches)
+    new_matches['date'] = matches['date'].max() + pd.to_timedelta(np.arange(len(new_matches)), unit="min")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = os.path.join(tmp, "elo_state.npz")
+        engine = elo.EloEngine(state_path)
+        full_time, _ = timed(lambda: engine.update(matches, surfaces))
+        save_time, _ = timed(engine.save)
+        print(f"Replay completo: {args.matches} jogos, {len(engine)} jogadores em {full_time:.2f} s "
+              f"({args.matches / full_time:,.0f} jogos/s); save {save_time * 1000:.0f} ms")
+
+        load_time, reloaded = timed(lambda: elo.EloEngine(state_path))
+        incremental_time, processed = timed(lambda: reloaded.update(new_matches, surfaces))
+        print(f"Incremental: load {load_time * 1000:.0f} ms + {processed} jogos novos em {incremental_time * 1000:.0f} ms")
+
+        full = elo.EloEngine(None)
+        full.update(pd.concat([matches, new_matches], ignore_index=True), surfaces)
+        same = np.allclose(full.ratings_frame()['elo'], reloaded.ratings_frame()['elo'])
+        print(f"Incremental == replay completo: {same}")
+
+    if args.reference:
+        subset = matches.iloc[:args.reference]
+        engine = elo.EloEngine(None)
+        array_time, _ = timed(lambda: engine.update(subset, surfaces))
+        dict_time, players = timed(lambda: reference_elo(subset, surfaces))
+        same = all(abs(players[player_id]['overall']['rating'] - engine.rating(player_id)) < 1e-6
+                   for player_id in players)
+        print(f"Referência ({args.reference} jogos): dicts {dict_time:.2f} s x arrays {array_time:.2f} s "
+              f"({dict_time / array_time:.1f}x); mesmos ratings: {same}")
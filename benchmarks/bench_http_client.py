@@ -0,0 +1,71 @@
+"""
+Benchmark do cliente HTTP compartilhado (api/http_client.py) x requests.get.
+
+Faz o mesmo número de GETs contra um servidor local sem latência e compara
+requisições por segundo e quantas conexões TCP o servidor precisou abrir.
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_http_client.py --requests 2000 --threads 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Mede a rede, não o cache em disco
+os.environ["HTTP_CACHE"] = "0"
+# Não soma as requisições ao servidor local no uso real da cota
+os.environ["RAPIDAPI_QUOTA_PATH"] = os.path.join(tempfile.mkdtemp(), "api_quota.json")
+
+from api import http_client
+from benchmarks.mock_api import MockAPIServer
+
+HEADERS = http_client.rapidapi_headers("chave-de-teste", "stub.local")
+
+
+def run(get_func, url, total, threads):
+    def fetch(i):
+        # Parâmetro distinto por GET: chamadas iguais simultâneas seriam deduplicadas pela cota
+        response = get_func(url, headers=HEADERS, params={"request": i})
+        response.raise_for_status()
+        return response.json()
+
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(fetch, range(total)))
+    else:
+        for i in range(total):
+            fetch(i)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    with MockAPIServer(latency=0) as server:
+        url = f"{server.base_url}/tennis/v2/atp/player/past-matches/47275"
+        results = {}
+        for label, get_func in [("requests.get", requests.get), ("http_client.get", http_client.get)]:
+            server.connection_count = 0
+            elapsed = run(get_func, url, args.requests, args.threads)
+            results[label] = (elapsed, server.connection_count)
+
+    print(f"{args.requests} GETs, {args.threads} thread(s)")
+    for label, (elapsed, connections) in results.items():
+        print(f"  {label:16s} {args.requests / elapsed:8.0f} req/s  {connections:5d} conexões abertas")
+    base = results["requests.get"][0]
+    pooled = results["http_client.get"][0]
+    print(f"Ganho do cliente com pool: {base / pooled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
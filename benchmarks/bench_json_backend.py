@@ -0,0 +1,133 @@
+"""
+Benchmark do backend JSON (api/json_backend.py) e dos esquemas tipados (api/schemas.py).
+
+Para cada arquivo JSON em dados/, mede com o json da biblioteca padrão e
+com o orjson: a decodificação (MB/s), a gravação no formato dos dumps
+(indent=2) e, nos dumps brutos, decodificação + validação de todas as
+seções no esquema (resultados do torneio, surface summary, past matches).
+As respostas de odds são remontadas a partir das linhas do arquivo de
+eventos coletados e processadas pelo esquema (process_odds_data) e pela
+leitura campo a campo de antes. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_json_backend.py --repeat 5
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.odds import _process_odds_data_lenient, process_odds_data
+from api.schemas import PLAYER_SECTIONS, TournamentResults
+
+BACKENDS = ["stdlib"] + (["orjson"] if json_backend.orjson is not None else [])
+EVENTS_PATH = "dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json"
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def validate_dump(raw):
+    """Valida as seções de todos os jogadores (e o torneio) de um dump bruto; retorna quantas seções"""
+    count = 0
+    if isinstance(raw.get("tournament_info"), dict):
+        TournamentResults.from_dict(raw["tournament_info"].get("tournament_raw_data") or {})
+        count += 1
+    for player_data in raw.get("players", raw).values():
+        if not isinstance(player_data, dict):
+            continue
+        for section, schema in PLAYER_SECTIONS.items():
+            if player_data.get(section) is not None:
+                schema.from_dict(player_data[section])
+                count += 1
+    return count
+
+
+def odds_payloads(events):
+    """Respostas de get_odds remontadas a partir das linhas odds_bet365 de cada evento"""
+    payloads = []
+    for event in events:
+        markets = {}
+        for line in event.get("odds_bet365") or []:
+            key = (line["market"], line["handicap"])
+            market = markets.setdefault(key, {"marketName": line["market"], "marketNameShort": line["short"],
+                                              "handicap": line["handicap"], "oddsType": line["odds_type"],
+                                              "outcomes": {}})
+            market["outcomes"][str(len(market["outcomes"]) + 1)] = {
+                "outcomeName": line["outcome"], "bookmakers": {"bet365": {"price": line["odds"]}}}
+        payloads.append({"markets": {str(i): market for i, market in enumerate(markets.values())}})
+    return payloads
+
+
+def with_backend(name, func):
+    previous, json_backend.BACKEND = json_backend.BACKEND, name
+    try:
+        return func()
+    finally:
+        json_backend.BACKEND = previous
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do backend JSON e dos esquemas tipados")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--odds-copies", type=int, default=200, help="cópias das respostas de odds processadas")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob("dados/**/*.json", recursive=True))
+    width = max(len(path) for path in paths)
+    print(f"{'arquivo':<{width}s} {'MB':>5s} " + " ".join(f"{f'decodificar {b}':>18s} {f'gravar {b}':>13s}"
+                                                   for b in BACKENDS))
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+        size = len(content) / 1e6
+        cells = []
+        for backend in BACKENDS:
+            data = with_backend(backend, lambda: json_backend.loads(content))
+            decode = best_time(lambda: with_backend(backend, lambda: json_backend.loads(content)), args.repeat)
+            encode = best_time(lambda: with_backend(backend, lambda: json_backend.dumps(data, indent=True)),
+                               args.repeat)
+            cells.append(f"{size / decode:13.0f} MB/s {size / encode:8.0f} MB/s")
+        print(f"{path:<{width}s} {size:5.2f} " + " ".join(cells))
+
+    print()
+    for path in ("dados/raw/stats3_raw.json", "dados/raw/stats2_raw.json"):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            content = f.read()
+        size = len(content) / 1e6
+        for backend in BACKENDS:
+            sections = validate_dump(with_backend(backend, lambda: json_backend.loads(content)))
+            elapsed = best_time(lambda: with_backend(backend, lambda: validate_dump(json_backend.loads(content))),
+                                args.repeat)
+            print(f"Decodificar + validar {path} ({backend}): {elapsed * 1000:6.1f} ms, {size / elapsed:5.1f} MB/s, "
+                  f"{sections / elapsed:,.0f} seções/s")
+
+    if os.path.exists(EVENTS_PATH):
+        with open(EVENTS_PATH, "rb") as f:
+            payloads = odds_payloads(json_backend.load(f)) * args.odds_copies
+        bodies = [json_backend.dumps(payload).encode("utf-8") for payload in payloads]
+        lines = sum(len(process_odds_data(payload)) for payload in payloads[:len(payloads) // args.odds_copies])
+        print(f"\nOdds: {len(bodies)} respostas de get_odds ({lines} linhas por cópia dos eventos coletados)")
+        for backend in BACKENDS:
+            for label, process in (("esquema tipado", process_odds_data),
+                                   ("leitura campo a campo", _process_odds_data_lenient)):
+                def run():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        for body in bodies:
+                            process(json_backend.loads(body))
+                elapsed = best_time(lambda: with_backend(backend, run), args.repeat)
+                print(f"  {backend:<7s} + {label:<22s}: {len(bodies) / elapsed:8,.0f} respostas/s")
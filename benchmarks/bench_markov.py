@@ -0,0 +1,68 @@
+"""
+Benchmark do motor exato (analise/markov.py) x Monte Carlo (analise/simulation.py).
+
+Mede o tempo de calcular a distribuição de uma partida sem cache, com o
+cache de games/sets já preenchido e já em cache, o tempo de precificar
+cada linha Over/Under de total de games e a diferença para a simulação.
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_markov.py --pairs 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import markov, simulation
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do motor exato de probabilidades")
+    parser.add_argument("--pairs", type=int, default=200, help="pares de probabilidades de saque distintos")
+    parser.add_argument("--sims", type=int, default=100000, help="simulações da comparação com o Monte Carlo")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    pairs = np.round(rng.uniform(0.55, 0.72, (args.pairs, 2)), 2)
+
+    for cache in (markov._match, markov._set_scores, markov._game_from, markov._tiebreak_from):
+        cache.cache_clear()
+    start = time.perf_counter()
+    for p1, p2 in pairs:
+        markov.match_distribution(p1, p2, 3)
+    cold = (time.perf_counter() - start) / args.pairs
+    # Games e sets já em cache: só a combinação dos sets na partida
+    markov._match.cache_clear()
+    start = time.perf_counter()
+    for p1, p2 in pairs:
+        markov.match_distribution(p1, p2, 3)
+    warm_sets = (time.perf_counter() - start) / args.pairs
+    cached = per_call(lambda: markov.match_distribution(*pairs[0], 3), 10000)
+    print(f"Partida (melhor de 3): sem cache {cold * 1000:.2f} ms, só a partida {warm_sets * 1000:.2f} ms, "
+          f"em cache {cached * 1e6:.1f} µs")
+
+    result = markov.match_distribution(*pairs[0], 3)
+    lines = [line + 0.5 for line in range(16, 36)]
+    line_time = per_call(lambda: [simulation.line_probability(result["total_games"], "Total Games Over Under", line,
+                                                              "Over") for line in lines], 200) / len(lines)
+    print(f"Linha Over/Under precificada em {line_time * 1e6:.1f} µs")
+
+    start = time.perf_counter()
+    simulated = simulation.simulate_match(*pairs[0], 3, n_sims=args.sims, seed=1)
+    mc_time = time.perf_counter() - start
+    worst = max(abs(simulation.line_probability(result["total_games"], "Total Games Over Under", line, "Over")
+                    - simulation.line_probability(simulated["total_games"], "Total Games Over Under", line, "Over"))
+                for line in lines)
+    print(f"Monte Carlo ({args.sims} simulações): {mc_time * 1000:.0f} ms por partida; "
+          f"maior diferença nas linhas Over: {worst:.4f}; vitória {result['match_win']:.4f} x {simulated['match_win']:.4f}")
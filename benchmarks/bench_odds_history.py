@@ -0,0 +1,98 @@
+"""
+Benchmark do histórico de odds (api/odds_history.py).
+
+Simula a coleta a cada minuto de uma chave inteira de torneio: cada
+evento tem as linhas de odds de um evento real (mercados de vencedor,
+sets e games) e, a cada coleta, uma fração pequena delas muda de preço.
+Mede o tempo de gravação por coleta, o tamanho do arquivo comparado com
+guardar todos os snapshots, o tempo das consultas de abertura/fechamento
+e a compactação. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_odds_history.py --events 127 --hours 24
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.odds_history import OddsHistory
+
+
+def sample_lines(lines_per_event):
+    """Linhas de odds de exemplo (mercados e handicaps de um evento real)"""
+    lines = []
+    for market, handicaps, outcomes in (
+        ("Winner", ["0"], ["1", "2"]),
+        ("First Set Winner", ["0"], ["1", "2"]),
+        ("Game Handicap", ["-3.5", "-2.5", "2.5", "3.5"], ["1", "2"]),
+        ("Total Games Over Under", ["20.5", "21.5", "22.5", "23.5"], ["Over", "Under"]),
+        ("Total Games First Set", [f"{n}.5" for n in range(6, 13)], ["Over", "Under"]),
+    ):
+        for handicap in handicaps:
+            for outcome in outcomes:
+                lines.append({"market": market, "handicap": handicap, "outcome": outcome,
+                              "odds": round(random.uniform(1.05, 6.0), 2)})
+    return lines[:lines_per_event]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do histórico de odds")
+    parser.add_argument("--events", type=int, default=127, help="eventos da chave (127 = chave de 128)")
+    parser.add_argument("--hours", type=float, default=24, help="horas de coleta a cada minuto")
+    parser.add_argument("--lines", type=int, default=40, help="linhas de odds por evento")
+    parser.add_argument("--change-rate", type=float, default=0.02, help="fração das linhas que muda por coleta")
+    args = parser.parse_args()
+
+    random.seed(1)
+    polls = int(args.hours * 60)
+    events = {f"ev{i}": sample_lines(args.lines) for i in range(args.events)}
+    start = time.time() - polls * 60
+    snapshot_bytes = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        odds_history = OddsHistory(os.path.join(tmp, "odds_history.sqlite"), retention_days=1)
+        record_time = 0.0
+        for poll in range(polls):
+            seen_at = start + poll * 60
+            for event_id, lines in events.items():
+                for line in lines:
+                    if random.random() < args.change_rate:
+                        line["odds"] = round(max(1.01, line["odds"] * random.uniform(0.95, 1.05)), 2)
+                if poll % 60 == 0:
+                    snapshot_bytes += len(json.dumps(lines))
+                t0 = time.perf_counter()
+                odds_history.record(event_id, lines, seen_at=seen_at, start_time=start + polls * 60)
+                record_time += time.perf_counter() - t0
+        # snapshots medidos uma vez por hora; extrapola para todas as coletas
+        snapshot_bytes *= 60
+        stats = odds_history.stats()
+        observations = odds_history.lines_seen
+        print(f"{polls} coletas x {args.events} eventos x {args.lines} linhas = {observations:,} observações")
+        print(f"Gravação: {record_time / (polls * args.events) * 1e6:.0f} µs por evento/coleta "
+              f"({record_time / polls * 1000:.1f} ms por coleta da chave inteira)")
+        print(f"Linhas guardadas: {stats['price_rows']:,} ({stats['price_rows'] / observations:.1%} das observações); "
+              f"arquivo {stats['bytes'] / 2**20:.1f} MiB x ~{snapshot_bytes / 2**20:.0f} MiB em snapshots JSON")
+
+        odds_history.compact(now=start + polls * 60)
+        compact_stats = odds_history.stats()
+        print(f"Depois de compactar (WAL truncado): {compact_stats['bytes'] / 2**20:.1f} MiB")
+
+        t0 = time.perf_counter()
+        for event_id in events:
+            movement = odds_history.line_movement(event_id)
+        query_time = (time.perf_counter() - t0) / len(events)
+        t0 = time.perf_counter()
+        for event_id in events:
+            odds_history.line_movement(event_id, "Winner")
+        market_time = (time.perf_counter() - t0) / len(events)
+        print(f"Abertura/fechamento/movimento: {query_time * 1000:.1f} ms por evento "
+              f"({len(movement)} linhas); só Winner {market_time * 1000:.1f} ms")
+
+        removed = odds_history.compact(now=start + polls * 60 + 2 * 24 * 60 * 60)
+        print(f"Retenção: {removed} eventos removidos; {odds_history.stats()['bytes'] / 2**20:.2f} MiB restantes")
+        odds_history.close()
@@ -0,0 +1,137 @@
+"""
+Benchmark do modelo compacto das linhas de odds (api/odds_lines.py).
+
+Gera respostas de get_odds com os mercados dos eventos coletados (ou um
+conjunto fixo, se o arquivo não existe) e preços sorteados, até o número
+de linhas pedido, e compara as linhas como lista de dicts
+(process_odds_data) com o OddsLines (process_odds_lines): memória retida
+por 100 mil linhas (tracemalloc), tempo de processamento, exportação
+idêntica e o tempo de um filtro (Winner com odds >= 1.5) e de um
+agrupamento (maior preço por mercado/handicap/outcome) sobre todas as
+linhas. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_odds_lines.py --lines 100000 500000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import json_backend
+from api.odds import process_odds_data, process_odds_lines
+from api.odds_lines import OddsLines
+
+EVENTS_PATH = "dados/clean/collected_tennis_data_atp_singles_pregame_with_stats.json"
+DEFAULT_MARKETS = [("Winner", "Winner", "0", "2Way", ["1", "2"]),
+                   ("First Set Winner", "1st Set Winner", "0", "2Way", ["1", "2"]),
+                   ("Total Games", "Total Games", "22.5", "Over/Under", ["Over", "Under"]),
+                   ("Game Handicap", "Game Handicap", "-3.5", "Handicap", ["1", "2"]),
+                   ("Set Betting", "Set Betting", "0", "CorrectScore", ["2:0", "2:1", "1:2", "0:2"])]
+
+
+def market_templates():
+    """(mercado, nome curto, handicap, tipo, outcomes) dos eventos coletados"""
+    if not os.path.exists(EVENTS_PATH):
+        return DEFAULT_MARKETS
+    markets = {}
+    with open(EVENTS_PATH, "rb") as f:
+        for event in json_backend.load(f):
+            for line in event.get("odds_bet365") or []:
+                key = (line["market"], line["short"], line["handicap"], line["odds_type"])
+                outcomes = markets.setdefault(key, [])
+                if line["outcome"] not in outcomes:
+                    outcomes.append(line["outcome"])
+    return [(*key, outcomes) for key, outcomes in markets.items()] or DEFAULT_MARKETS
+
+
+def synthetic_bodies(n_lines, seed=0):
+    """Corpos JSON de respostas de get_odds somando n_lines linhas"""
+    rng = random.Random(seed)
+    templates = market_templates()
+    bodies, total = [], 0
+    while total < n_lines:
+        markets = {}
+        for i, (name, short, handicap, odds_type, outcomes) in enumerate(templates):
+            markets[str(i)] = {"marketName": name, "marketNameShort": short, "handicap": handicap,
+                               "oddsType": odds_type, "outcomes": {
+                                   str(j + 1): {"outcomeName": outcome,
+                                                "bookmakers": {"bet365": {"price": round(rng.uniform(1.01, 30), 2)}}}
+                                   for j, outcome in enumerate(outcomes)}}
+            total += len(outcomes)
+        bodies.append(json_backend.dumps({"markets": markets}).encode("utf-8"))
+    return bodies
+
+
+def build(process, bodies):
+    """Processa todas as respostas guardando as linhas de cada evento; (eventos, MB retidos, segundos)"""
+    gc.collect()
+    tracemalloc.start()
+    events = [process(json_backend.loads(body)) for body in bodies]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    start = time.perf_counter()
+    events = [process(json_backend.loads(body)) for body in bodies]
+    return events, retained, time.perf_counter() - start
+
+
+def best_time(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def filter_dicts(lines):
+    return [line for line in lines if line["market"] == "Winner" and line["odds"] is not None and line["odds"] >= 1.5]
+
+
+def best_prices_dicts(lines):
+    best = {}
+    for line in lines:
+        odds = line["odds"]
+        if odds is None:
+            continue
+        key = (line["market"], line["handicap"], line["outcome"])
+        if key not in best or odds > best[key]:
+            best[key] = odds
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do modelo compacto das linhas de odds")
+    parser.add_argument("--lines", type=int, nargs="+", default=[100000, 500000])
+    args = parser.parse_args()
+
+    for n_lines in args.lines:
+        bodies = synthetic_bodies(n_lines)
+        dict_events, dict_mb, dict_s = build(process_odds_data, bodies)
+        compact_events, compact_mb, compact_s = build(process_odds_lines, bodies)
+        n = sum(len(lines) for lines in dict_events)
+        assert all(lines.to_dicts() == expected for lines, expected in zip(compact_events, dict_events))
+        assert json_backend.dumps(compact_events) == json_backend.dumps(dict_events)
+
+        flat = [line for lines in dict_events for line in lines]
+        compact = OddsLines.concat(compact_events)
+        filtered_dicts, filter_dicts_ms = best_time(lambda: filter_dicts(flat))
+        filtered, filter_ms = best_time(lambda: compact.filter(market="Winner", min_odds=1.5))
+        assert filtered.to_dicts() == filtered_dicts
+        best_dicts, group_dicts_ms = best_time(lambda: best_prices_dicts(flat))
+        best, group_ms = best_time(lambda: compact.best_prices())
+        assert best == best_dicts
+
+        print(f"{n} linhas em {len(bodies)} eventos (exportação idêntica)")
+        print(f"  memória por 100k linhas: dicts {dict_mb * 1e5 / n:6.1f} MB | OddsLines {compact_mb * 1e5 / n:6.1f} MB")
+        print(f"  processamento:           dicts {n / dict_s:9,.0f} linhas/s | OddsLines {n / compact_s:9,.0f} linhas/s")
+        print(f"  filtro Winner >= 1.5:    dicts {filter_dicts_ms:7.1f} ms | OddsLines {filter_ms:7.1f} ms "
+              f"({len(filtered)} linhas)")
+        print(f"  maior preço por linha:   dicts {group_dicts_ms:7.1f} ms | OddsLines {group_ms:7.1f} ms "
+              f"({len(best)} grupos)")
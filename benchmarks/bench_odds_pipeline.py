@@ -0,0 +1,69 @@
+"""
+Benchmark do pipeline de odds em modo headless (api/odds.py --headless).
+
+Sobe um servidor local que imita a API de odds com N eventos 'pre-game' e
+compara o pool com 1 worker (equivalente ao laço sequencial) e com vários
+workers, sob o mesmo rate limit. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_odds_pipeline.py --events 200 --workers 8 --rps 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Mede a rede, não o cache em disco
+os.environ["HTTP_CACHE"] = "0"
+# Não soma as requisições ao servidor local no uso real da cota
+os.environ["RAPIDAPI_QUOTA_PATH"] = os.path.join(tempfile.mkdtemp(), "api_quota.json")
+os.environ.setdefault("RAPIDAPI_KEY", "chave-de-teste")
+os.environ["RAPIDAPI_HOST"] = "odds.stub.local"
+# Os participantes falsos não devem entrar na tabela de IDs real
+os.environ["PLAYER_ID_MAP_PATH"] = os.path.join(tempfile.mkdtemp(), "player_id_map.json")
+# Nem no histórico de odds
+os.environ["ODDS_HISTORY"] = "0"
+
+from api import http_client, odds
+from benchmarks.mock_api import MockAPIServer, ODDS_PAYLOAD
+
+
+def build_payloads(n_events):
+    tournaments = {"1": {"tournamentId": 2579, "name": "French Open Men Singles", "categoryName": "ATP"}}
+    events = {
+        str(i): {
+            "eventId": f"id{i}", "eventStatus": "pre-game", "date": "2025-06-04", "time": "11:20:00",
+            "participant1": "Sinner, Jannik", "participant1Id": 1000 + i,
+            "participant2": "Rublev, Andrey", "participant2Id": 2000 + i,
+            "bookmakerCount": 10, "startTime": 1749036000
+        }
+        for i in range(n_events)
+    }
+    return {"/tournaments": tournaments, "/events": {"events": events}, "/odds": ODDS_PAYLOAD}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=20, help="rate limit do host de odds")
+    parser.add_argument("--latency", type=float, default=0.15, help="latência simulada por requisição (s)")
+    args = parser.parse_args()
+
+    results = {}
+    with MockAPIServer(latency=args.latency, payloads=build_payloads(args.events)) as server:
+        odds.ODDS_API_BASE_URL = server.base_url
+        for workers in (1, args.workers):
+            http_client.set_rate_limit("odds.stub.local", args.rps, burst=workers)
+            _, _, summary = odds.run_headless_pipeline(max_workers=workers)
+            results[workers] = summary
+
+    print("\n--- Comparação ---")
+    for workers, summary in results.items():
+        print(f"{workers:2d} worker(s): {summary['events_per_sec']:7.2f} eventos/s | "
+              f"p50 {summary['latency_p50_ms']:7.1f} ms | p99 {summary['latency_p99_ms']:7.1f} ms | "
+              f"{summary['api_calls']} requisições")
+
+
+if __name__ == "__main__":
+    main()
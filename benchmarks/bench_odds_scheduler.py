@@ -0,0 +1,168 @@
+"""
+Simulação do agendador de coletas de odds (api/odds_scheduler.py).
+
+Roda o OddsScheduler com relógio simulado e APIs falsas: um torneio com
+uma chave de N eventos cujos inícios se espalham por alguns dias, e que
+passam a 'live' no horário de início. Compara as requisições feitas com
+as de coletar todos os eventos no menor intervalo (uniforme) e mostra o
+efeito do orçamento por hora.
+
+A segunda parte roda o agendador com as buscas padrão, que passam pelo
+http_client e pelo cache HTTP (com o mesmo relógio simulado), contra um
+servidor local: confere que as requisições contadas são as que chegaram
+ao servidor e o intervalo real entre coletas nos 15 minutos antes do
+início, e compara com as buscas pelo cache (como o agendador fazia antes).
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_odds_scheduler.py --events 127 --days 3 --http-events 16
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Cache HTTP e cota da simulação em arquivos temporários (não tocam os reais)
+os.environ["HTTP_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "http_cache.sqlite")
+os.environ["RAPIDAPI_QUOTA_PATH"] = os.path.join(tempfile.mkdtemp(), "api_quota.json")
+os.environ.setdefault("RAPIDAPI_KEY", "chave-de-teste")
+os.environ["RAPIDAPI_HOST"] = "odds.stub.local"
+
+from api import http_client, odds, odds_scheduler
+from api.response_cache import get_cache
+from benchmarks.mock_api import MockAPIServer
+
+TOURNAMENT = {"tournamentId": 1, "name": "Simulated Open Men Singles", "categoryName": "ATP"}
+
+
+class SimulatedAPI:
+    """Relógio e endpoints falsos: eventos 'pre-game' até o início, 'live' depois"""
+
+    def __init__(self, n_events, days, seed=1):
+        rng = random.Random(seed)
+        self.now = 0.0
+        self.events = [{"eventId": f"ev{i}", "participant1": f"Player {2 * i}", "participant2": f"Player {2 * i + 1}",
+                        "startTime": rng.uniform(2 * 3600, days * 24 * 3600)} for i in range(n_events)]
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def get_tournaments(self):
+        return [TOURNAMENT], True
+
+    def get_events(self, tournament_id):
+        return {"events": [{**event, "eventStatus": "pre-game" if event["startTime"] > self.now else "live"}
+                           for event in self.events]}, True
+
+    def get_odds(self, event_id):
+        return {"markets": {}}, True
+
+
+class SimulatedServer(SimulatedAPI):
+    """
+    Os mesmos eventos servidos por HTTP. Cada resposta leva `response_time`
+    segundos do relógio simulado, como na API real: o cache HTTP grava a
+    entrada depois do instante em que a coleta foi agendada.
+    """
+
+    def __init__(self, n_events, days, response_time=0.5, seed=1):
+        super().__init__(n_events, days, seed)
+        self.response_time = response_time
+        self.odds_requests = {}
+
+    def _respond(self, payload):
+        self.now += self.response_time
+        return payload
+
+    def payloads(self):
+        return {
+            "/tournaments": lambda path: self._respond({"1": TOURNAMENT}),
+            "/events": lambda path: self._respond(self.get_events(TOURNAMENT["tournamentId"])[0]),
+            "/odds": lambda path: self._record_odds(re.search(r"eventId=([^&]+)", path).group(1)),
+        }
+
+    def _record_odds(self, event_id):
+        self.odds_requests.setdefault(event_id, []).append(self.now)
+        return self._respond({"markets": {}})
+
+    def final_gaps(self):
+        """Intervalos entre coletas recebidas de um mesmo evento nos 15 minutos antes do início"""
+        start_times = {event["eventId"]: event["startTime"] for event in self.events}
+        gaps = []
+        for event_id, times in self.odds_requests.items():
+            final = [t for t in times if start_times[event_id] - 15 * 60 <= t < start_times[event_id]]
+            gaps += [b - a for a, b in zip(final, final[1:])]
+        return gaps
+
+
+def simulate(n_events, days, budget_per_hour, step=60):
+    api = SimulatedAPI(n_events, days)
+    scheduler = odds_scheduler.OddsScheduler(budget_per_hour=budget_per_hour, clock=api.clock,
+                                             get_tournaments=api.get_tournaments, get_events=api.get_events,
+                                             get_odds=api.get_odds)
+    peak_hour, window = 0, []
+    while api.now < days * 24 * 3600:
+        made = scheduler.tick()
+        window = [(t, n) for t, n in window if t > api.now - 3600] + [(api.now, made)]
+        peak_hour = max(peak_hour, sum(n for _, n in window))
+        api.now += step
+    return scheduler.summary(), peak_hour
+
+
+def simulate_http(n_events, days, use_cache):
+    """Agendador com as buscas reais (http_client) contra o servidor simulado"""
+    api = SimulatedServer(n_events, days)
+    get_cache().clear()
+    get_cache().clock = api.clock
+    fetchers = {}
+    if use_cache:
+        # Como o agendador buscava antes: pelo cache HTTP, com os TTLs padrão dos endpoints
+        headers = odds.BASE_HEADERS_ODDS
+        fetchers = {"get_tournaments": lambda: odds.get_tournaments(headers=headers),
+                    "get_events": lambda tournament_id: odds.get_events(tournament_id, headers=headers),
+                    "get_odds": lambda event_id: odds.get_odds(event_id, headers=headers)}
+    with MockAPIServer(latency=0, payloads=api.payloads()) as server:
+        odds.ODDS_API_BASE_URL = server.base_url
+        http_client.set_rate_limit("odds.stub.local", None)
+        scheduler = odds_scheduler.OddsScheduler(clock=api.clock, **fetchers)
+        # O laço real: dorme até a próxima coleta agendada
+        scheduler.run(days * 24 * 3600, sleep=api.sleep)
+    received = sum(len(times) for times in api.odds_requests.values())
+    return scheduler.summary(), received, api.final_gaps()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulação do agendador de coletas de odds")
+    parser.add_argument("--events", type=int, default=127)
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--budgets", type=int, nargs="*", default=[10000, 300, 100],
+                        help="orçamentos de requisições por hora a comparar")
+    parser.add_argument("--http-events", type=int, default=16,
+                        help="eventos da simulação pelo http_client (0 pula essa parte)")
+    args = parser.parse_args()
+
+    for budget in args.budgets:
+        start = time.perf_counter()
+        summary, peak_hour = simulate(args.events, args.days, budget)
+        elapsed = time.perf_counter() - start
+        total = summary["tournaments_calls"] + summary["events_calls"] + summary["odds_calls"]
+        print(f"Orçamento {budget}/h: {total} requisições ({summary['odds_calls']} de odds, "
+              f"{summary['events_calls']} de eventos), pico de {peak_hour} na hora; "
+              f"uniforme faria {summary['uniform_odds_calls']} de odds -> {summary['saved_pct']}% economizadas; "
+              f"{summary['deferred_by_budget']} adiadas pelo orçamento; {summary['events_finished']} eventos "
+              f"encerrados; simulação em {elapsed:.1f} s")
+
+    if args.http_events:
+        print(f"\nPelo http_client ({args.http_events} eventos, {args.days} dias):")
+        for label, use_cache in (("sem cache (padrão)", False), ("pelo cache HTTP (antes)", True)):
+            summary, received, gaps = simulate_http(args.http_events, args.days, use_cache)
+            mean_gap = sum(gaps) / len(gaps) if gaps else 0.0
+            print(f"  {label:<24s}: {summary['odds_calls']} coletas de odds contadas, {received} recebidas pelo "
+                  f"servidor; intervalo nos 15 min finais: médio {mean_gap:5.1f} s, "
+                  f"máximo {max(gaps, default=0.0):5.1f} s")
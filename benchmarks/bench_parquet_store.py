@@ -0,0 +1,113 @@
+"""
+Benchmark de leitura: JSONs de dados/ x store Parquet (analise/parquet_store.py).
+
+Para cada consulta compara o tempo e a memória de carregar o JSON inteiro
+e extrair os dados com o de ler a tabela Parquet equivalente, com e sem
+projeção de colunas / filtro. Memória = pico do tracemalloc (objetos
+Python) + tamanho dos buffers Arrow do resultado. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_parquet_store.py --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import parquet_store
+
+
+def measure(func, repeat):
+    """Retorna (melhor tempo em s, pico de memória em bytes) de func()"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Os buffers do Arrow não passam pelo alocador do Python
+    arrow_bytes = result.nbytes if isinstance(result, pa.Table) else 0
+    del result
+    return best, peak + arrow_bytes
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def json_all_matches():
+    raw = load_json(parquet_store.STATS3_RAW_PATH)
+    raw2 = load_json(parquet_store.STATS2_RAW_PATH)
+    clean = load_json(parquet_store.STATS_CLEAN_PATH)
+    matches = {}
+    for player_data in list(raw['players'].values()) + list(raw2.values()) + list(clean.values()):
+        for match in (player_data.get('past_matches') or {}).get('data') or []:
+            matches[match['id']] = match
+    return matches
+
+
+def json_clay_service():
+    clean = load_json(parquet_store.STATS_CLEAN_PATH)
+    return {name: data['ServiceRecordStatsClay'] for name, data in clean.items()
+            if 'ServiceRecordStatsClay' in data}
+
+
+def json_winner_odds():
+    events = load_json(parquet_store.ODDS_PATH)
+    return [(event['event_id'], line['outcome'], line['odds'])
+            for event in events for line in event.get('odds_bet365') or []
+            if line['market'] == "Winner"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        start = time.perf_counter()
+        counts = parquet_store.build_store(store_dir)
+        build_time = time.perf_counter() - start
+
+        json_bytes = sum(os.path.getsize(p) for p in (parquet_store.STATS_CLEAN_PATH,
+                                                       parquet_store.STATS_RAW_PATH,
+                                                       parquet_store.STATS2_RAW_PATH,
+                                                       parquet_store.STATS3_RAW_PATH,
+                                                       parquet_store.ODDS_PATH))
+        parquet_bytes = sum(os.path.getsize(parquet_store.table_path(name, store_dir)) for name in counts)
+
+        def read(name, **kwargs):
+            return lambda: parquet_store.read_arrow(name, store_dir=store_dir, **kwargs)
+
+        cases = [
+            ("todos os jogos", json_all_matches, read("matches")),
+            ("jogos: 3 colunas, torneio 20340", json_all_matches,
+             read("matches", columns=["match_id", "date", "result"], filters=[("tournament_id", "==", 20340)])),
+            ("saque no saibro", json_clay_service, read("service_stats", filters=[("surface", "==", "Clay")])),
+            ("odds do mercado Winner", json_winner_odds,
+             read("odds_lines", columns=["event_id", "outcome", "odds"], filters=[("market", "==", "Winner")])),
+        ]
+
+        print(f"Store criado em {build_time:.2f} s: {counts}")
+        print(f"Tamanho em disco: JSON {json_bytes / 1024:.0f} KiB | Parquet {parquet_bytes / 1024:.0f} KiB\n")
+        print(f"{'consulta':34s} {'JSON ms':>9s} {'Parquet ms':>11s} {'JSON MiB':>9s} {'Parquet MiB':>12s}")
+        for label, json_func, parquet_func in cases:
+            json_time, json_mem = measure(json_func, args.repeat)
+            parquet_time, parquet_mem = measure(parquet_func, args.repeat)
+            print(f"{label:34s} {json_time * 1000:9.1f} {parquet_time * 1000:11.1f} "
+                  f"{json_mem / 2**20:9.2f} {parquet_mem / 2**20:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
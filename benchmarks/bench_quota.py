@@ -0,0 +1,112 @@
+"""
+Benchmark do gerenciador de cota da RapidAPI (api/quota.py) via api/http_client.py.
+
+Contra um servidor local com latência e um rate limit por host, mede:
+quantas requisições chegam ao servidor quando muitas threads pedem a mesma
+URL ao mesmo tempo (deduplicação), a ordem em que odds urgentes e recargas
+de histórico enfileiradas juntas são atendidas (prioridade) e o que
+acontece perto e no limite da cota (respostas antigas do cache no lugar de
+erro). Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_quota.py --threads 32 --rps 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Cache e arquivo de uso temporários, para não misturar com os reais
+TMP_DIR = tempfile.mkdtemp()
+os.environ["HTTP_CACHE_PATH"] = os.path.join(TMP_DIR, "http_cache.sqlite")
+os.environ["RAPIDAPI_QUOTA_PATH"] = os.path.join(TMP_DIR, "api_quota.json")
+
+from api import http_client, quota
+from benchmarks.mock_api import MockAPIServer
+
+HOST = "stub.local"
+HEADERS = http_client.rapidapi_headers("chave-de-teste", HOST)
+
+
+def deduplication(server, threads):
+    url = f"{server.base_url}/odds"
+    before = server.request_count
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: http_client.get(url, headers=HEADERS, params={"eventId": 1}, use_cache=False),
+                          range(threads)))
+    return server.request_count - before
+
+
+def priority_order(server, historical, urgent):
+    """Enfileira as recargas de histórico antes das odds urgentes e devolve a ordem de atendimento"""
+    order = []
+
+    def fetch(kind, i):
+        if kind == "odds":
+            url, priority = f"{server.base_url}/odds", quota.PRIORITY_CRITICAL
+        else:
+            url, priority = f"{server.base_url}/tennis/v2/atp/player/past-matches/{i}", None
+        http_client.get(url, headers=HEADERS, params={"eventId": i} if kind == "odds" else None,
+                        use_cache=False, priority=priority)
+        order.append(kind)
+
+    with ThreadPoolExecutor(max_workers=historical + urgent) as executor:
+        futures = [executor.submit(fetch, "historico", i) for i in range(historical)]
+        time.sleep(0.2)
+        futures += [executor.submit(fetch, "odds", i) for i in range(urgent)]
+        for future in futures:
+            future.result()
+    positions = [i for i, kind in enumerate(order) if kind == "odds"]
+    return sum(positions) / len(positions), len(order)
+
+
+def degradation(server, players):
+    """Histórico em cache (expirado), cota quase no fim: quem ainda vai à API e quem recebe o cache"""
+    manager = quota.get_quota()
+    urls = [f"{server.base_url}/tennis/v2/atp/player/past-matches/{i}" for i in range(players)]
+    for url in urls:
+        http_client.get(url, headers=HEADERS, ttl=0.01)
+    time.sleep(0.05)
+
+    used = manager.usage(HEADERS["x-rapidapi-key"], HOST)["month"]
+    # Sobra só a reserva: as recargas de histórico (baixa prioridade) ficam de fora
+    quota.HOST_QUOTAS[HOST] = {"day": None, "month": used + 5}
+    manager.reserve = 0.5
+    before = server.request_count
+    stale = sum(bool(getattr(http_client.get(url, headers=HEADERS), "stale", False)) for url in urls)
+    odds_ok, refused = 0, 0
+    for i in range(10):
+        try:
+            http_client.get(f"{server.base_url}/odds", headers=HEADERS, params={"eventId": 100 + i},
+                            priority=quota.PRIORITY_CRITICAL)
+            odds_ok += 1
+        except quota.QuotaExceeded:
+            refused += 1
+    return stale, odds_ok, refused, server.request_count - before
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do gerenciador de cota da RapidAPI")
+    parser.add_argument("--threads", type=int, default=32, help="threads pedindo a mesma URL")
+    parser.add_argument("--rps", type=float, default=20, help="rate limit do host (requisições/s)")
+    parser.add_argument("--historical", type=int, default=40)
+    parser.add_argument("--urgent", type=int, default=10)
+    args = parser.parse_args()
+
+    http_client.set_rate_limit(HOST, args.rps)
+    with MockAPIServer(latency=0.05) as server:
+        sent = deduplication(server, args.threads)
+        print(f"Deduplicação: {args.threads} chamadas iguais simultâneas -> {sent} requisição(ões) ao servidor")
+
+        mean_position, total = priority_order(server, args.historical, args.urgent)
+        print(f"Prioridade: {args.urgent} odds urgentes enfileiradas depois de {args.historical} recargas de "
+              f"histórico saíram em média na posição {mean_position:.1f} de {total} "
+              f"(sem prioridade: ~{args.historical + args.urgent / 2:.0f})")
+
+        stale, odds_ok, refused, sent = degradation(server, 20)
+        print(f"Perto do limite: {stale} de 20 recargas servidas do cache expirado, {odds_ok} odds urgentes "
+              f"enviadas e {refused} recusadas no limite; {sent} requisições chegaram ao servidor")
+
+    print(http_client.quota_summary())
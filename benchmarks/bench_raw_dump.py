@@ -0,0 +1,118 @@
+"""
+Benchmark do dump bruto indexado (api/raw_dump.py).
+
+Monta dumps sintéticos no formato do stats3_raw.json, replicando os
+jogadores do dump real (ou jogadores gerados, se ele não existir) até
+tamanhos crescentes, e mede para cada tamanho: o tempo de montar o índice,
+e o tempo e o pico de memória (tracemalloc) de ler um jogador e o bloco do
+torneio com json.load no arquivo inteiro e com RawDump. As páginas do
+arquivo mapeadas com mmap não são alocações do Python e não entram no
+pico; o que entra é o trecho decodificado e a entrada do índice. Rodar a partir da
+raiz do projeto:
+
+    python benchmarks/bench_raw_dump.py --sizes 200 1000 5000
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.raw_dump import INDEX_SUFFIX, RawDump
+
+RAW_PATH = "dados/raw/stats3_raw.json"
+
+
+def sample_dump():
+    if os.path.exists(RAW_PATH):
+        with open(RAW_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    matches = [{"id": i, "date": "2025-01-01T00:00:00.000Z", "result": "6-4 6-4",
+                "player1": {"id": 1, "name": "A"}, "player2": {"id": 2, "name": "B"}} for i in range(50)]
+    players = {f"Player_{i}": {"player_info": {"id": i, "name": f"Player {i}"}, "collected_at": "2025-01-01",
+                               "surface_summary": {"data": []}, "past_matches": {"data": matches}}
+               for i in range(100)}
+    return {"tournament_info": {"tournament_id": 1, "tournament_raw_data": {"data": {"singles": []}}},
+            "players": players}
+
+
+def write_dump(sample, n_players, path):
+    """Dump com n_players jogadores, copiando os do exemplo com chaves novas"""
+    templates = list(sample["players"].values())
+    players = {f"Player_{i}": templates[i % len(templates)] for i in range(n_players)}
+    dump = copy.copy(sample)
+    dump["players"] = players
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dump, f, indent=2, ensure_ascii=False)
+    return os.path.getsize(path)
+
+
+def measure(func):
+    """(resultado, ms, pico de memória em MB); o tempo é medido fora do tracemalloc, que o distorce"""
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def build(path):
+    """Abre o dump sem índice em disco, forçando montar o índice"""
+    if os.path.exists(path + INDEX_SUFFIX):
+        os.remove(path + INDEX_SUFFIX)
+    RawDump(path).close()
+
+
+def full_load(path, key):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["players"][key]
+
+
+def full_tournament(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["tournament_info"]["tournament_raw_data"]
+
+
+def indexed_load(path, key):
+    with RawDump(path) as dump:
+        return dump.player(key)
+
+
+def indexed_tournament(path):
+    with RawDump(path) as dump:
+        return dump.tournament()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do dump bruto indexado")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 5000], help="jogadores por dump")
+    args = parser.parse_args()
+
+    sample = sample_dump()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_players in args.sizes:
+            path = os.path.join(tmp_dir, f"stats3_raw_{n_players}.json")
+            size = write_dump(sample, n_players, path)
+            key = f"Player_{n_players // 2}"
+
+            _, build_ms, build_peak = measure(lambda: build(path))
+            expected, full_ms, full_peak = measure(lambda: full_load(path, key))
+            player, indexed_ms, indexed_peak = measure(lambda: indexed_load(path, key))
+            assert player == expected
+            _, tournament_full_ms, tournament_full_peak = measure(lambda: full_tournament(path))
+            _, tournament_ms, tournament_peak = measure(lambda: indexed_tournament(path))
+
+            print(f"{n_players:>6} jogadores, {size / 1e6:7.1f} MB | índice: {build_ms:6.0f} ms, "
+                  f"pico {build_peak:5.1f} MB")
+            print(f"  1 jogador  json.load: {full_ms:7.1f} ms, pico {full_peak:7.1f} MB | "
+                  f"RawDump: {indexed_ms:6.1f} ms, pico {indexed_peak:5.2f} MB")
+            print(f"  torneio    json.load: {tournament_full_ms:7.1f} ms, pico {tournament_full_peak:7.1f} MB | "
+                  f"RawDump: {tournament_ms:6.1f} ms, pico {tournament_peak:5.2f} MB")
@@ -0,0 +1,56 @@
+"""
+Benchmark do cache de respostas em disco (api/response_cache.py).
+
+Roda a coleta de surface summary + past matches duas vezes contra o
+servidor local: a primeira popula o cache, a segunda deve sair inteira do
+disco, sem nenhuma requisição chegando ao servidor. Rodar a partir da raiz:
+
+    python benchmarks/bench_response_cache.py --players 217 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_client, response_cache, stats3
+from benchmarks.mock_api import MockAPIServer
+
+
+def run(player_ids):
+    start = time.perf_counter()
+    for player_id in player_ids:
+        assert stats3.get_player_surface_summary(player_id) is not None
+        assert stats3.get_player_past_matches(player_id) is not None
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=217)
+    parser.add_argument("--latency", type=float, default=0.2, help="latência simulada por requisição (s)")
+    args = parser.parse_args()
+
+    player_ids = [str(10000 + i) for i in range(args.players)]
+    http_client.set_rate_limit(http_client.TENNIS_API_HOST, None)
+
+    with tempfile.TemporaryDirectory() as tmp, MockAPIServer(latency=args.latency) as server:
+        response_cache._cache = response_cache.ResponseCache(os.path.join(tmp, "cache.sqlite"))
+        stats3.TENNIS_API_BASE_URL = server.base_url
+
+        cold_time = run(player_ids)
+        cold_requests = server.request_count
+        warm_time = run(player_ids)
+        warm_requests = server.request_count - cold_requests
+        summary = http_client.cache_summary()
+
+    print(f"Jogadores: {args.players} | latência simulada: {args.latency * 1000:.0f} ms")
+    print(f"1ª execução (cache vazio): {cold_time:7.2f} s  {cold_requests:5d} requisições à API")
+    print(f"2ª execução (cache cheio): {warm_time:7.2f} s  {warm_requests:5d} requisições à API")
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark do simulador Monte Carlo (analise/simulation.py).
+
+Mede simulações por segundo do simulador vetorizado em um processo e com
+um pool de processos, e compara com uma simulação ponto a ponto em Python
+puro (referência da distribuição e da velocidade). Rodar a partir da raiz
+do projeto:
+
+    python benchmarks/bench_simulation.py --sims 1000000 --workers 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import simulation
+
+
+def reference_match(p1_serve, p2_serve, best_of, rng):
+    """Uma partida ponto a ponto; retorna (participant1 venceu, total de games)"""
+    serve = (p1_serve, p2_serve)
+    server = rng.randrange(2)
+    sets, total_games = [0, 0], 0
+    while max(sets) <= best_of // 2:
+        games = [0, 0]
+        while True:
+            if games == [6, 6]:
+                points, point_number = [0, 0], 0
+                while max(points) < 7 or abs(points[0] - points[1]) < 2:
+                    tiebreak_server = server if ((point_number + 1) // 2) % 2 == 0 else 1 - server
+                    won = rng.random() < serve[tiebreak_server]
+                    points[tiebreak_server if won else 1 - tiebreak_server] += 1
+                    point_number += 1
+                winner = 0 if points[0] > points[1] else 1
+            else:
+                points = [0, 0]
+                while max(points) < 4 or abs(points[0] - points[1]) < 2:
+                    won = rng.random() < serve[server]
+                    points[server if won else 1 - server] += 1
+                winner = server if points[server] > points[1 - server] else 1 - server
+            games[winner] += 1
+            total_games += 1
+            server = 1 - server
+            if max(games) == 7 or (max(games) >= 6 and abs(games[0] - games[1]) >= 2):
+                break
+        sets[0 if games[0] > games[1] else 1] += 1
+    return sets[0] > sets[1], total_games
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do simulador Monte Carlo")
+    parser.add_argument("--sims", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--reference", type=int, default=50000, help="partidas da referência em Python puro")
+    parser.add_argument("--p1-serve", type=float, default=0.65)
+    parser.add_argument("--p2-serve", type=float, default=0.62)
+    parser.add_argument("--best-of", type=int, default=3, choices=(3, 5))
+    args = parser.parse_args()
+    params = (args.p1_serve, args.p2_serve, args.best_of)
+
+    single_time, single = timed(lambda: simulation.simulate_match(*params, n_sims=args.sims, seed=1, workers=1))
+    print(f"Vetorizado, 1 processo: {args.sims / single_time:,.0f} simulações/s "
+          f"(vitória p1 {single['match_win']:.4f})")
+    pool_time, pooled = timed(lambda: simulation.simulate_match(*params, n_sims=args.sims, seed=1,
+                                                                workers=args.workers))
+    print(f"Vetorizado, {args.workers} processos: {args.sims / pool_time:,.0f} simulações/s; "
+          f"mesmo resultado com a mesma semente: {pooled['total_games'].equals(single['total_games'])}")
+
+    if args.reference:
+        rng = random.Random(1)
+        reference_time, matches = timed(lambda: [reference_match(*params, rng) for _ in range(args.reference)])
+        wins = sum(won for won, _ in matches) / args.reference
+        mean_games = sum(games for _, games in matches) / args.reference
+        expected_games = (single["total_games"].index * single["total_games"]).sum()
+        print(f"Ponto a ponto em Python: {args.reference / reference_time:,.0f} simulações/s "
+              f"(vitória p1 {wins:.4f}, games {mean_games:.2f} x {expected_games:.2f} no vetorizado)")
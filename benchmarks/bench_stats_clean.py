@@ -0,0 +1,122 @@
+"""
+Benchmark do build_stats_clean (analise/analise_dados.py) em dados sintéticos.
+
+Gera N jogadores no formato de stats_raw.json / stats2_raw.json / stats.csv,
+com parte das chaves do stats2 exigindo a busca parcial de nome ("Jr",
+nomes sem correspondência), e compara com a implementação original em
+laços (reproduzida abaixo), cuja busca parcial percorre todos os nomes.
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_stats_clean.py --sizes 500 1000 2000 4000 8000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise.analise_dados import build_stats_clean, normalize_name
+
+SURFACES = ["Clay", "Hard", "Grass"]
+
+
+def synthetic_sources(n_players, seed=0):
+    rng = random.Random(seed)
+    stats_raw, stats2_raw, csv_rows = {}, {}, []
+    for i in range(n_players):
+        player_id = f"P{i:05d}"
+        name = f"Player{i:05d} Surname{rng.randint(0, 10**6)}"
+        csv_rows.append({"IdJogador": player_id, "NomeJogador": name})
+        stats_raw[player_id] = {
+            "player_id": player_id,
+            "api_response": [
+                {"Surface": surface,
+                 "ReturnRecordStats": {"ReturnGamesWonPercentage": rng.randint(10, 40)},
+                 "ServiceRecordStats": {"ServiceGamesWonPercentage": rng.randint(60, 95)}}
+                for surface in SURFACES[:rng.randint(1, 3)]
+            ]
+        }
+        # 60% nome exato, 30% com sufixo (busca parcial), 10% sem correspondência
+        roll = rng.random()
+        stats2_name = name if roll < 0.6 else (f"{name} Jr" if roll < 0.9 else f"Unknown{i:05d}")
+        stats2_raw[f"{stats2_name}_{100000 + i}"] = {
+            "player_info": {"id": 100000 + i, "name": stats2_name},
+            "surface_summary": {"data": [
+                {"year": year, "surfaces": [{"court": "Clay", "courtWins": 1, "courtLosses": 1}]}
+                for year in (2025, 2024, 2023, 2022, 2021)
+            ]},
+            "past_matches": {"data": [{"id": str(i)}], "hasNextPage": False}
+        }
+    return stats_raw, stats2_raw, pd.DataFrame(csv_rows)
+
+
+def legacy_build_stats_clean(stats_raw, stats2_raw, stats_csv):
+    """Laços do analise_dados.py original (iterrows + busca parcial linear)"""
+    id_to_name = {}
+    for _, row in stats_csv.iterrows():
+        if pd.notna(row['IdJogador']) and pd.notna(row['NomeJogador']):
+            id_to_name[row['IdJogador']] = row['NomeJogador']
+    stats_clean = {}
+    for player_id, player_data in stats_raw.items():
+        if player_id not in id_to_name:
+            continue
+        player_name = id_to_name[player_id]
+        if player_name not in stats_clean:
+            stats_clean[player_name] = {"player_id": player_id, "name": player_name}
+        api_resp = player_data.get('api_response')
+        for surface_data in api_resp if isinstance(api_resp, list) else [api_resp]:
+            if isinstance(surface_data, dict) and 'Surface' in surface_data:
+                surface = surface_data['Surface']
+                if 'ReturnRecordStats' in surface_data:
+                    stats_clean[player_name][f"ReturnRecordStats{surface}"] = surface_data['ReturnRecordStats']
+                if 'ServiceRecordStats' in surface_data:
+                    stats_clean[player_name][f"ServiceRecordStats{surface}"] = surface_data['ServiceRecordStats']
+    name_mapping = {normalize_name(name): name for name in stats_clean}
+    for player_key, player_data in stats2_raw.items():
+        normalized_search = normalize_name(player_key.split('_')[0].strip())
+        matched_name = name_mapping.get(normalized_search)
+        if matched_name is None:
+            for norm_name, real_name in name_mapping.items():
+                if normalized_search in norm_name or norm_name in normalized_search:
+                    matched_name = real_name
+                    break
+        if not matched_name:
+            continue
+        filtered_items = [item for item in player_data['surface_summary']['data'] if item['year'] >= 2023]
+        if filtered_items:
+            stats_clean[matched_name]['surface_summary'] = filtered_items
+        stats_clean[matched_name]['past_matches'] = player_data['past_matches']
+    return stats_clean
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument("--skip-legacy-above", type=int, default=8000,
+                        help="não roda a versão original acima deste número de jogadores")
+    args = parser.parse_args()
+
+    print(f"{'jogadores':>9s} {'vetorizado s':>13s} {'µs/jogador':>11s} {'original s':>11s} {'µs/jogador':>11s}")
+    for size in args.sizes:
+        sources = synthetic_sources(size)
+        result, fast_time = timed(build_stats_clean, *sources)
+        legacy_cell = f"{'-':>11s} {'-':>11s}"
+        if size <= args.skip_legacy_above:
+            legacy_result, legacy_time = timed(legacy_build_stats_clean, *sources)
+            assert legacy_result == result
+            legacy_cell = f"{legacy_time:11.2f} {legacy_time / size * 1e6:11.1f}"
+        print(f"{size:9d} {fast_time:13.2f} {fast_time / size * 1e6:11.1f} {legacy_cell}")
+
+
+if __name__ == "__main__":
+    main()
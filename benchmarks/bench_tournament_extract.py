@@ -0,0 +1,144 @@
+"""
+Benchmark do extract_player_ids_from_tournament (api/stats3.py).
+
+Gera chaves sintéticas de torneio no formato de tournament/results
+(data.singles/doubles/qualifying[] com player1/player2) com milhares de
+jogos, a mesma chave com um campo fora do formato (que vai para a busca
+genérica) e um payload com rodadas aninhadas em muitos níveis, e compara
+com a implementação recursiva original (reproduzida abaixo): tempo,
+resultado igual e o RecursionError da original nos payloads profundos.
+Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_tournament_extract.py --matches 1000 10000 50000 --depth 500 5000 50000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.stats3 import extract_player_ids_from_tournament
+
+
+def legacy_extract(tournament_data):
+    """extract_player_ids_from_tournament original (recursiva, monta o caminho de todo nó)"""
+    player_ids = set()
+    players_info = {}
+
+    def extract_from_matches(matches_data):
+        if isinstance(matches_data, list):
+            for match in matches_data:
+                if isinstance(match, dict):
+                    for key in ['homeTeam', 'awayTeam', 'participant1', 'participant2']:
+                        if key in match:
+                            player_data = match[key]
+                            if isinstance(player_data, dict):
+                                player_id = player_data.get('id')
+                                player_name = player_data.get('name')
+                                if player_id:
+                                    player_ids.add(str(player_id))
+                                    players_info[str(player_id)] = {
+                                        'id': player_id,
+                                        'name': player_name,
+                                        'found_in': 'tournament_results'
+                                    }
+
+    def recursive_search(data, path=""):
+        if isinstance(data, dict):
+            if 'id' in data and 'name' in data:
+                player_id = data.get('id')
+                player_name = data.get('name')
+                if player_id and player_name:
+                    player_ids.add(str(player_id))
+                    players_info[str(player_id)] = {
+                        'id': player_id,
+                        'name': player_name,
+                        'found_in': path or 'tournament_data'
+                    }
+            for key, value in data.items():
+                new_path = f"{path}.{key}" if path else key
+                if key in ['matches', 'results', 'rounds', 'participants']:
+                    extract_from_matches(value)
+                recursive_search(value, new_path)
+        elif isinstance(data, list):
+            for i, item in enumerate(data):
+                new_path = f"{path}[{i}]" if path else f"[{i}]"
+                recursive_search(item, new_path)
+
+    recursive_search(tournament_data)
+    return list(player_ids), players_info
+
+
+def synthetic_draws(n_matches, n_players=None, seed=0):
+    """Payload de tournament/results com n_matches jogos distribuídos entre as chaves"""
+    rng = random.Random(seed)
+    n_players = n_players or max(2, n_matches // 2)
+    draws = {"singles": [], "doubles": [], "qualifying": [], "doublesQualifying": []}
+    for i in range(n_matches):
+        player1, player2 = rng.sample(range(1, n_players + 1), 2)
+        draws[rng.choice(list(draws))].append({
+            "id": str(5500000000 + i), "date": "2025-06-03T21:15:00.000Z", "roundId": rng.randint(1, 9),
+            "player1Id": player1, "player2Id": player2, "tournamentId": 20340, "match_winner": player1,
+            "result": "6-4 6-4",
+            "player1": {"id": player1, "name": f"Player {player1}", "countryAcr": "ESP"},
+            "player2": {"id": player2, "name": f"Player {player2}", "countryAcr": "USA"},
+        })
+    return {"data": draws}
+
+
+def off_schema(payload):
+    """A mesma chave com um objeto a mais num jogo: fica para a busca genérica"""
+    singles = payload["data"]["singles"]
+    singles[len(singles) // 2]["venue"] = {"court": {"id": 1, "name": "Philippe-Chatrier"}}
+    payload["data"]["results"] = [{"homeTeam": {"id": 999999, "name": None}}]
+    return payload
+
+
+def deep_rounds(depth, n_matches=100):
+    """Rodadas aninhadas em `depth` níveis ('previous' guarda a anterior), com os jogos na mais interna"""
+    matches = [{"participant1": {"id": 2 * i + 1, "name": f"Player {2 * i + 1}"},
+                "participant2": {"id": 2 * i + 2, "name": f"Player {2 * i + 2}"}} for i in range(n_matches)]
+    node = {"round": 0, "matches": matches}
+    for level in range(1, depth):
+        node = {"round": level, "previous": node}
+    return {"data": {"rounds": [node]}}
+
+
+def timed(func, payload, repeat=3):
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(payload)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+def compare(label, payload):
+    (ids, info), new_ms = timed(extract_player_ids_from_tournament, payload)
+    try:
+        (legacy_ids, legacy_info), legacy_ms = timed(legacy_extract, payload)
+        assert set(ids) == set(legacy_ids) and info == legacy_info
+        legacy_cell = f"{legacy_ms:9.1f} ms"
+    except RecursionError:
+        legacy_cell = f"{'RecursionError':>12s}"
+    print(f"{label:<38s} {len(ids):>7d} jogadores | novo {new_ms:8.1f} ms | original {legacy_cell}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da extração de jogadores do torneio")
+    parser.add_argument("--matches", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--depth", type=int, nargs="+", default=[500, 5000, 50000],
+                        help="níveis de rodadas aninhadas (a recursão original estoura perto de 1000)")
+    args = parser.parse_args()
+
+    for n_matches in args.matches:
+        compare(f"{n_matches} jogos (formato conhecido)", synthetic_draws(n_matches))
+        compare(f"{n_matches} jogos (fora do formato)", off_schema(synthetic_draws(n_matches)))
+    for depth in args.depth:
+        compare(f"{depth} rodadas aninhadas", deep_rounds(depth))
@@ -0,0 +1,80 @@
+"""
+Benchmark do scanner de apostas de valor (analise/value_bets.py).
+
+Gera eventos compactos sintéticos (participantes com player_id e tabela de
+features à parte) com linhas "Winner" e "First Set Winner" e compara o
+scan de todos os eventos de uma vez com o mesmo scan chamado evento a
+evento. Rodar a partir da raiz do projeto:
+
+    python benchmarks/bench_value_bets.py --events 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import value_bets
+
+
+def synthetic_events(n_events, n_players=300, seed=42):
+    """Eventos no formato compacto de api/odds.py e a tabela de features dos jogadores"""
+    rng = np.random.default_rng(seed)
+    players_table = {
+        f"P{i:04d}": {
+            "player_id": f"P{i:04d}",
+            "clay_service_points_won_pct": int(rng.integers(55, 72)),
+            "clay_return_points_won_pct": int(rng.integers(32, 45)),
+        }
+        for i in range(n_players)
+    }
+    events = []
+    for i in range(n_events):
+        p1, p2 = rng.choice(n_players, 2, replace=False)
+        odds_lines = []
+        for market in value_bets.MARKETS:
+            fair = rng.uniform(0.1, 0.9)
+            margin = rng.uniform(1.03, 1.08)
+            for outcome, prob in (("1", fair), ("2", 1 - fair)):
+                odds_lines.append({"market": market, "short": market, "handicap": "0", "odds_type": "2Way",
+                                   "outcome": outcome, "odds": round(1 / (prob * margin), 2)})
+        events.append({
+            "tournament_id": i % 50,
+            "tournament_name": "French Open Men Singles" if i % 10 == 0 else "Hamburg Open Men Singles",
+            "event_id": f"ev{i}",
+            "participant1": {"name_api": f"Player {p1}", "id_api": int(p1), "player_id": f"P{p1:04d}"},
+            "participant2": {"name_api": f"Player {p2}", "id_api": int(p2), "player_id": f"P{p2:04d}"},
+            "odds_bet365": odds_lines,
+        })
+    return events, players_table
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do scanner de apostas de valor")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--per-event", type=int, default=500,
+                        help="eventos usados no scan evento a evento (0 para pular)")
+    args = parser.parse_args()
+
+    events, players_table = synthetic_events(args.events)
+    batch_time, priced = timed(lambda: value_bets.scan_value_bets(events, players_table))
+    print(f"Batch: {args.events} eventos, {len(priced)} linhas em {batch_time * 1000:.0f} ms "
+          f"({batch_time / args.events * 1e6:.0f} µs/evento); {int(priced['value_bet'].sum())} apostas de valor")
+
+    if args.per_event:
+        subset = events[:args.per_event]
+        loop_time, parts = timed(lambda: [value_bets.scan_value_bets([event], players_table) for event in subset])
+        looped = pd.concat(parts, ignore_index=True)
+        same = np.allclose(looped["ev"], priced["ev"].iloc[:len(looped)])
+        print(f"Evento a evento ({args.per_event}): {loop_time / args.per_event * 1e6:.0f} µs/evento "
+              f"({loop_time / args.per_event / (batch_time / args.events):.0f}x mais lento); mesmos EVs: {same}")
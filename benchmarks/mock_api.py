@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Payloads mínimos no formato das respostas da tennis-api / odds-api
+SURFACE_SUMMARY_PAYLOAD = {
+    "data": [{"year": 2025, "surfaces": [{"courtId": 2, "court": "Clay", "courtWins": 18, "courtLosses": 6}]}]
+}
+PAST_MATCHES_PAYLOAD = {
+    "data": [{
+        "id": "5503841827", "date": "2025-06-02T21:20:00.000Z", "roundId": 7,
+        "player1Id": 47275, "player2Id": 29372, "tournamentId": 20340,
+        "match_winner": 47275, "result": "6-1 6-3 6-4",
+        "player1": {"id": 47275, "name": "Jannik Sinner", "countryAcr": "ITA"},
+        "player2": {"id": 29372, "name": "Andrey Rublev", "countryAcr": "RUS"}
+    }] * 20,
+    "hasNextPage": False
+}
+ODDS_PAYLOAD = {
+    "markets": {
+        "1": {"marketName": "Winner", "marketNameShort": "Winner", "handicap": "0", "oddsType": "2Way",
+              "outcomes": {"1": {"outcomeName": "1", "bookmakers": {"bet365": {"price": 1.5}}},
+                           "2": {"outcomeName": "2", "bookmakers": {"bet365": {"price": 2.6}}}}}
+    }
+}
+
+
+class MockAPIServer:
+    """
+    Servidor HTTP local que imita os endpoints da RapidAPI usados em api/.
+
+    `latency` simula o tempo de resposta da API real. Um payload pode ser
+    uma função, chamada com o caminho da requisição a cada resposta. O
+    servidor fala HTTP/1.1 para permitir conexões keep-alive e conta as
+    requisições recebidas em `request_count`.
+    """
+
+    def __init__(self, latency=0.05, payloads=None):
+        self.latency = latency
+        self.payloads = payloads or {
+            "surface-summary": SURFACE_SUMMARY_PAYLOAD,
+            "past-matches": PAST_MATCHES_PAYLOAD,
+            "/odds": ODDS_PAYLOAD,
+        }
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Sem isso o Nagle + delayed ACK adiciona ~40 ms por resposta em keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connection_count += 1
+
+            def do_GET(self):
+                with mock._lock:
+                    mock.request_count += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                payload = {"message": "not found"}
+                for fragment, candidate in mock.payloads.items():
+                    if fragment in self.path:
+                        payload = candidate(self.path) if callable(candidate) else candidate
+                        break
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,390 @@
+"""
+Dashboard dos dados coletados: jogadores, estatísticas por superfície,
+odds dos eventos e movimento das linhas.
+
+Os dados vêm do store Parquet (analise/parquet_store.py) e do histórico de
+odds (api/odds_history.py). Cada visão lê só as colunas que usa; as
+tabelas por jogador/evento ficam em memória com um índice por chave, então
+trocar de jogador não filtra a tabela inteira. Os caches são chaveados pelo
+mtime dos arquivos: regravar o store ou coletar odds novas invalida só o
+que mudou. Rodar a partir da raiz do projeto:
+
+    streamlit run dash.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Permite importar os módulos do projeto (api.*, analise.*) ao rodar com streamlit
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analise import parquet_store
+from analise.feature_store import FORM_WINDOW
+from api.odds_history import HISTORY_PATH, OddsHistory
+from api.player_ids import ID_MAP_PATH, PlayerIdMap
+
+STORE_DIR = parquet_store.STORE_DIR
+# Pontos por série nos gráficos e linhas nas tabelas de cada visão
+MAX_CHART_POINTS = int(os.getenv("DASH_MAX_CHART_POINTS", 300))
+MAX_TABLE_ROWS = int(os.getenv("DASH_MAX_TABLE_ROWS", 100))
+SURFACE_YEARS = 15
+
+# Colunas lidas de cada tabela do store
+PLAYER_COLUMNS = ("source", "player_id", "name")
+STATS_DROP_COLUMNS = ("player_id", "name")
+SURFACE_SUMMARY_COLUMNS = ("player_id", "year", "court", "wins", "losses")
+MATCH_COLUMNS = ("date", "tournament_id", "player1_id", "player2_id", "winner_id", "result",
+                 "player1_name", "player2_name")
+EVENT_COLUMNS = ("event_id", "tournament_name", "event_date", "event_time", "participant1", "participant2")
+ODDS_COLUMNS = ("event_id", "market", "handicap", "outcome", "odds")
+
+
+def file_mtime(path):
+    """mtime do arquivo (0 se não existe); vai nos argumentos das funções em cache para invalidá-las"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def sqlite_mtime(path):
+    """mtime de um banco SQLite em WAL: as gravações recentes mudam só o arquivo -wal"""
+    return max(file_mtime(path), file_mtime(path + "-wal"))
+
+
+def downsample(df, max_points=MAX_CHART_POINTS):
+    """Até max_points linhas igualmente espaçadas (a primeira e a última sempre ficam)"""
+    if len(df) <= max_points:
+        return df
+    positions = np.unique(np.linspace(0, len(df) - 1, max_points).round().astype(int))
+    return df.iloc[positions]
+
+
+def key_strings(column):
+    """Valores da coluna como string (IDs numéricos com lacunas viram float no pandas: 16744.0 -> '16744')"""
+    if column.dtype.kind == "f":
+        column = column.astype("Int64")
+    return column.astype(str)
+
+
+class IndexedTable:
+    """
+    Colunas de uma tabela do store com as posições das linhas por chave.
+
+    As posições de cada valor das colunas-chave são calculadas uma vez
+    (groupby().indices, com os valores como string); rows() devolve as
+    linhas de um jogador ou evento sem percorrer a tabela.
+    """
+
+    def __init__(self, df, keys):
+        self.df = df
+        self.indices = {}
+        for key in keys:
+            column = key_strings(df[key])
+            self.indices[key] = column.groupby(column, sort=False).indices
+
+    def rows(self, key, *values):
+        positions = [self.indices[key][str(value)] for value in values
+                     if value is not None and str(value) in self.indices[key]]
+        if not positions:
+            return self.df.iloc[:0]
+        return self.df.iloc[np.unique(np.concatenate(positions))]
+
+
+def read_indexed_table(name, columns, keys, store_dir=STORE_DIR):
+    """Lê as colunas da tabela do store (vazia se o arquivo não existe) e indexa pelas chaves"""
+    path = parquet_store.table_path(name, store_dir)
+    if not os.path.exists(path):
+        return IndexedTable(pd.DataFrame(columns=list(columns)), keys)
+    return IndexedTable(parquet_store.read_table(name, columns=list(columns), store_dir=store_dir), keys)
+
+
+def read_stats_table(name, store_dir=STORE_DIR):
+    """service_stats/return_stats inteiras (uma linha por jogador e superfície), indexadas por player_id"""
+    path = parquet_store.table_path(name, store_dir)
+    df = parquet_store.read_table(name, store_dir=store_dir) if os.path.exists(path) else pd.DataFrame(
+        columns=["player_id", "name", "surface"])
+    return IndexedTable(df, ["player_id"])
+
+
+def player_directory(players, id_map):
+    """
+    Um jogador por linha (nome, atp_id, tennis_api_id): os da tabela de IDs
+    mais os do store que ainda não estão nela. Duplas (nomes com '/') ficam
+    de fora.
+    """
+    rows = [{"name": row.get("name"), "atp_id": row.get("atp_id"), "tennis_api_id": row.get("tennis_api_id")}
+            for row in id_map.players]
+    known = {"stats_clean": set(id_map.index["atp_id"]), "stats3": set(id_map.index["tennis_api_id"])}
+    target = {"stats_clean": "atp_id", "stats3": "tennis_api_id"}
+    for source, player_id, name in players[list(PLAYER_COLUMNS)].itertuples(index=False):
+        if source in target and player_id not in known[source]:
+            rows.append({"name": name, "atp_id": None, "tennis_api_id": None, target[source]: player_id})
+            known[source].add(player_id)
+    directory = pd.DataFrame(rows, columns=["name", "atp_id", "tennis_api_id"]).dropna(subset=["name"])
+    directory = directory[~directory["name"].str.contains("/", regex=False)]
+    directory = directory.drop_duplicates("name").sort_values("name", kind="stable").reset_index(drop=True)
+    return directory.astype(object).where(directory.notna(), None)
+
+
+def player_view(player, service, returns, summary, matches, max_points=MAX_CHART_POINTS, max_rows=MAX_TABLE_ROWS):
+    """
+    Dados da visão de um jogador (dict com atp_id e tennis_api_id): estatísticas
+    de saque/devolução por superfície, vitórias por superfície e ano, últimos
+    jogos e a forma recente (vitórias nos últimos FORM_WINDOW jogos)
+    """
+    atp_id, tennis_api_id = player.get("atp_id"), player.get("tennis_api_id")
+    view = {}
+    for label, table in (("service", service), ("return", returns)):
+        stats = table.rows("player_id", atp_id)
+        view[label] = stats.drop(columns=list(STATS_DROP_COLUMNS)).set_index("surface").T
+
+    surface = summary.rows("player_id", atp_id, tennis_api_id).drop_duplicates(["year", "court"])
+    view["surface_wins"] = downsample(surface.pivot_table(index="year", columns="court", values="wins",
+                                                          aggfunc="sum", fill_value=0), max_points)
+    totals = surface.groupby("court")[["wins", "losses"]].sum()
+    totals["win_pct"] = (100 * totals["wins"] / (totals["wins"] + totals["losses"])).round(1)
+    view["surface_totals"] = totals.sort_values("wins", ascending=False)
+
+    player_matches = pd.concat([matches.rows("player1_id", tennis_api_id), matches.rows("player2_id", tennis_api_id)])
+    player_matches = player_matches[~player_matches.index.duplicated()].sort_values("date")
+    if player_matches.empty:
+        view["matches"] = pd.DataFrame(columns=["date", "opponent", "result", "won"])
+        view["form"] = pd.DataFrame(columns=["date", "form"])
+        return view
+    is_player1 = key_strings(player_matches["player1_id"]) == str(tennis_api_id)
+    won = key_strings(player_matches["winner_id"]) == str(tennis_api_id)
+    recent = pd.DataFrame({
+        "date": player_matches["date"],
+        "opponent": player_matches["player2_name"].where(is_player1, player_matches["player1_name"]),
+        "result": player_matches["result"],
+        "won": won,
+    })
+    view["matches"] = recent.iloc[::-1].head(max_rows).reset_index(drop=True)
+    form = pd.DataFrame({"date": recent["date"], "form": won.astype(float).rolling(FORM_WINDOW, min_periods=1).mean()})
+    view["form"] = downsample(form, max_points).reset_index(drop=True)
+    return view
+
+
+def surface_overview(summary, service, returns):
+    """Resultados por superfície nos últimos SURFACE_YEARS anos e as medianas das estatísticas por superfície"""
+    df = summary.df
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    recent = df[df["year"] >= df["year"].max() - SURFACE_YEARS + 1]
+    results = recent.assign(played=recent["wins"] + recent["losses"]).pivot_table(
+        index="year", columns="court", values="played", aggfunc="sum", fill_value=0)
+    medians = []
+    for label, table in (("Saque", service), ("Devolução", returns)):
+        if not table.df.empty:
+            numeric = table.df.drop(columns=list(STATS_DROP_COLUMNS)).groupby("surface").median(numeric_only=True)
+            medians.append(numeric.T.assign(tipo=label))
+    return results, pd.concat(medians) if medians else pd.DataFrame()
+
+
+def event_odds_view(odds_lines, event_id):
+    """Linhas de odds de um evento como tabela mercado/handicap x outcome, com a probabilidade implícita"""
+    lines = odds_lines.rows("event_id", event_id)
+    if lines.empty:
+        return pd.DataFrame()
+    lines = lines.assign(handicap=lines["handicap"].fillna(""), implied_prob=(100 / lines["odds"]).round(1))
+    return lines.pivot_table(index=["market", "handicap"], columns="outcome", values=["odds", "implied_prob"],
+                             aggfunc="last")
+
+
+def line_movement_view(history, event_id, market=None, max_points=MAX_CHART_POINTS):
+    """
+    Série de preços de cada linha do evento (uma coluna por handicap/outcome,
+    preço vigente a cada mudança, vazio enquanto a linha está fora do
+    mercado), com até max_points instantes, e o resumo de abertura/fechamento
+    """
+    prices = history.history(event_id, market)
+    summary = history.line_movement(event_id, market)
+    if prices.empty:
+        return pd.DataFrame(), summary
+    label = [" ".join(part for part in (m if market is None else "", "" if h in ("", "0") else h, o) if part)
+             for m, h, o in prices[["market", "handicap", "outcome"]].itertuples(index=False)]
+    # Linha retirada = -1 até o próximo preço, para o ffill não repetir o preço antigo
+    series = prices.assign(line=label, odds=prices["odds"].fillna(-1.0)).pivot_table(
+        index="seen_at", columns="line", values="odds", aggfunc="last").ffill()
+    series = downsample(series.mask(series < 0), max_points)
+    series.index = pd.to_datetime(series.index, unit="s", utc=True)
+    return series, summary
+
+
+# --- Camada em cache (chaveada pelo mtime dos arquivos) ---
+
+def store_mtimes(store_dir=STORE_DIR):
+    return tuple(file_mtime(parquet_store.table_path(name, store_dir)) for name in parquet_store.TABLES)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_player_tables(store_dir, mtimes):
+    return {
+        "service": read_stats_table("service_stats", store_dir),
+        "returns": read_stats_table("return_stats", store_dir),
+        "summary": read_indexed_table("surface_summary", SURFACE_SUMMARY_COLUMNS, ["player_id"], store_dir),
+        "matches": read_indexed_table("matches", MATCH_COLUMNS, ["player1_id", "player2_id"], store_dir),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_player_directory(store_dir, players_mtime, id_map_path, id_map_mtime):
+    players = parquet_store.read_table("players", columns=list(PLAYER_COLUMNS), store_dir=store_dir)
+    return player_directory(players, PlayerIdMap(id_map_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_player_view(store_dir, atp_id, tennis_api_id, mtimes):
+    tables = load_player_tables(store_dir, mtimes)
+    return player_view({"atp_id": atp_id, "tennis_api_id": tennis_api_id}, **tables)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_surface_overview(store_dir, mtimes):
+    tables = load_player_tables(store_dir, mtimes)
+    return surface_overview(tables["summary"], tables["service"], tables["returns"])
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_odds_tables(store_dir, events_mtime, odds_mtime):
+    events = read_indexed_table("events", EVENT_COLUMNS, [], store_dir).df
+    return events, read_indexed_table("odds_lines", ODDS_COLUMNS, ["event_id"], store_dir)
+
+
+@st.cache_resource(show_spinner=False)
+def open_history(path):
+    return OddsHistory(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_history_events(path, mtime):
+    return open_history(path).events()
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def load_event_markets(path, event_id, mtime):
+    return sorted(open_history(path).history(event_id)["market"].unique())
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def load_line_movement(path, event_id, market, mtime):
+    return line_movement_view(open_history(path), event_id, market)
+
+
+# --- Interface ---
+
+def players_tab(store_dir, mtimes):
+    directory = load_player_directory(store_dir, file_mtime(parquet_store.table_path("players", store_dir)),
+                                      ID_MAP_PATH, file_mtime(ID_MAP_PATH))
+    if directory.empty:
+        st.info("Nenhum jogador no store.")
+        return
+    position = st.selectbox("Jogador", directory.index, format_func=lambda i: directory.at[i, "name"])
+    player = directory.loc[position]
+    start = time.perf_counter()
+    view = load_player_view(store_dir, player["atp_id"], player["tennis_api_id"], mtimes)
+    st.caption(f"ATP {player['atp_id'] or '-'} · tennis-api {player['tennis_api_id'] or '-'} · "
+               f"dados em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("Saque")
+        st.dataframe(view["service"], width="stretch")
+    with right:
+        st.subheader("Devolução")
+        st.dataframe(view["return"], width="stretch")
+
+    st.subheader("Vitórias por superfície")
+    left, right = st.columns([2, 1])
+    with left:
+        if not view["surface_wins"].empty:
+            st.bar_chart(view["surface_wins"])
+    with right:
+        st.dataframe(view["surface_totals"], width="stretch")
+
+    st.subheader(f"Forma (vitórias nos últimos {FORM_WINDOW} jogos)")
+    if not view["form"].empty:
+        st.line_chart(view["form"], x="date", y="form")
+    st.dataframe(view["matches"], width="stretch", hide_index=True)
+
+
+def surfaces_tab(store_dir, mtimes):
+    results, medians = load_surface_overview(store_dir, mtimes)
+    st.subheader(f"Jogos por superfície (últimos {SURFACE_YEARS} anos, somando os jogadores)")
+    if not results.empty:
+        st.bar_chart(results)
+    st.subheader("Medianas das estatísticas por superfície")
+    st.dataframe(medians, width="stretch")
+
+
+def odds_tab(store_dir):
+    events, odds_lines = load_odds_tables(store_dir, file_mtime(parquet_store.table_path("events", store_dir)),
+                                          file_mtime(parquet_store.table_path("odds_lines", store_dir)))
+    if events.empty:
+        st.info("Nenhum evento no store. Rode api/odds.py e depois analise/parquet_store.py.")
+        return
+    position = st.selectbox("Evento", events.index, format_func=lambda i: (
+        f"{events.at[i, 'participant1']} x {events.at[i, 'participant2']} · {events.at[i, 'tournament_name']} "
+        f"({events.at[i, 'event_date']} {events.at[i, 'event_time']})"))
+    table = event_odds_view(odds_lines, events.at[position, "event_id"])
+    if table.empty:
+        st.info("Evento sem odds.")
+    else:
+        st.dataframe(table, width="stretch")
+
+
+def movement_tab(store_dir):
+    if not os.path.exists(HISTORY_PATH):
+        st.info("Sem histórico de odds. Rode api/odds_scheduler.py ou o pipeline de odds.")
+        return
+    mtime = sqlite_mtime(HISTORY_PATH)
+    history_events = load_history_events(HISTORY_PATH, mtime)
+    if history_events.empty:
+        st.info("Histórico de odds vazio.")
+        return
+    events, _ = load_odds_tables(store_dir, file_mtime(parquet_store.table_path("events", store_dir)),
+                                 file_mtime(parquet_store.table_path("odds_lines", store_dir)))
+    names = dict(zip(events["event_id"], events["participant1"] + " x " + events["participant2"]))
+    event_id = st.selectbox("Evento", history_events["event_id"], format_func=lambda e: names.get(e, e))
+    markets = load_event_markets(HISTORY_PATH, event_id, mtime)
+    if not markets:
+        st.info("Evento sem preços registrados.")
+        return
+    market = st.selectbox("Mercado", markets, index=markets.index("Winner") if "Winner" in markets else 0)
+    series, market_summary = load_line_movement(HISTORY_PATH, event_id, market, mtime)
+    if not series.empty:
+        st.line_chart(series)
+    st.dataframe(market_summary, width="stretch", hide_index=True)
+
+
+def main():
+    st.set_page_config(page_title="Tênis · dados e odds", layout="wide")
+    st.title("Tênis · dados e odds")
+    store_dir = STORE_DIR
+    if not os.path.exists(parquet_store.table_path("players", store_dir)):
+        st.warning(f"Store Parquet não encontrado em {store_dir}.")
+        if st.button("Gerar a partir dos JSONs de dados/"):
+            with st.spinner("Convertendo..."):
+                parquet_store.build_store(store_dir)
+            st.rerun()
+        return
+
+    mtimes = store_mtimes(store_dir)
+    players, surfaces, odds, movement = st.tabs(["Jogadores", "Superfícies", "Odds", "Movimento das linhas"])
+    with players:
+        players_tab(store_dir, mtimes)
+    with surfaces:
+        surfaces_tab(store_dir, mtimes)
+    with odds:
+        odds_tab(store_dir)
+    with movement:
+        movement_tab(store_dir)
+
+
+if __name__ == "__main__":
+    main()